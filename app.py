@@ -1,13 +1,38 @@
+import hmac
+import mimetypes
+import os
+import threading
+
 from flask import (
     Flask, render_template, request, redirect,
-    url_for, session, flash
+    url_for, session, flash, make_response, g, abort, jsonify, send_file,
+    current_app, has_app_context,
+)
+from werkzeug.local import LocalProxy
+
+from assets import IMMUTABLE_CACHE_CONTROL, AssetManifest
+from cart_store import CartSessionInterface, open_cart_store
+from catalog import SORT_ID, SORT_OPTIONS, SORT_PRICE, coerce_pid, open_catalog
+from config import Config, env_overrides
+from credentials import HasherBusy, PasswordHasher, VerificationLimiter
+from images import ImageCache, ImageUnavailable, image_token, sniff_content_type
+from inventory import open_inventory
+from orders import (
+    CONFIRMED, FAILED, FINAL_STATUSES, IDEMPOTENCY_KEY_MAX_LENGTH, PAID, RESERVED, STATUS_LABELS,
+    OrderPipeline, charge_payment, check_catalog, confirm_order, item_quantities, new_idempotency_key,
+    new_order, open_order_store,
+)
+from search import SearchIndex
+from users import open_user_repository
+from fragment_cache import FragmentCache
+from http_cache import (
+    apply_cache_headers, is_not_modified, last_modified_at, not_modified,
+    page_etag, templates_version,
 )
-
-app = Flask(__name__)
-app.secret_key = "dev-secret-key"
 
 # Selenium + pytest에서 공통으로 쓰는 기본 유저
-USERS = {
+# (평문 "password" 레코드는 첫 로그인 때 해시 레코드로 바뀝니다)
+DEFAULT_USERS = {
     "testuser": {"password": "password123"},
 }
 
@@ -95,17 +120,220 @@ PRODUCTS = [
 ]
 
 
+class lazy_service:
+    """
+    ShopServices 속성을 처음 접근할 때 한 번만 만드는 데코레이터.
+    여러 스레드가 동시에 처음 접근해도 저장소는 하나만 만들어집니다.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+
+    def __get__(self, shop, owner=None):
+        if shop is None:
+            return self
+        with shop._lock:
+            # 만든 뒤에는 인스턴스 속성이 이 descriptor보다 먼저 조회되므로 잠금 없이 읽힘
+            if self.name not in shop.__dict__:
+                shop.__dict__[self.name] = self.factory(shop)
+            return shop.__dict__[self.name]
+
+
+class ShopServices:
+    """
+    앱 인스턴스 하나가 쓰는 저장소와 캐시 묶음 (app.extensions["shop"]).
+    create_app()에서는 아무것도 만들지 않고, 각 저장소를 처음 사용할 때 설정에 따라 만듭니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.config = app.config
+        self._lock = threading.RLock()
+
+    @lazy_service
+    def catalog(self):
+        return open_catalog(PRODUCTS, db_path=self.config["CATALOG_DB"],
+                            cache_size=self.config["CATALOG_CACHE_SIZE"])
+
+    @lazy_service
+    def users(self):
+        return open_user_repository(self.config["USER_DB"], seed=DEFAULT_USERS)
+
+    @lazy_service
+    def cart_store(self):
+        return open_cart_store(self.config["CART_STORE"], ttl=self.config["CART_TTL"])
+
+    @lazy_service
+    def orders(self):
+        return open_order_store(self.config["ORDER_DB"])
+
+    @lazy_service
+    def inventory(self):
+        return open_inventory(self.config["INVENTORY_DB"], default_stock=self.config["INVENTORY_DEFAULT_STOCK"],
+                              ttl=self.config["INVENTORY_HOLD_TTL"])
+
+    @lazy_service
+    def order_pipeline(self):
+        # 재고는 주문 접수 때 차감하고, 결제 → 판매 상품 확인 → 주문 확정은 백그라운드에서 처리.
+        # 처리에 실패한 주문의 재고는 되돌립니다.
+        inventory = self.inventory
+        return OrderPipeline(self.orders, steps=[
+            (PAID, charge_payment(self.config["ORDER_PAYMENT_DELAY"])),
+            (RESERVED, check_catalog(self.catalog)),
+            (CONFIRMED, confirm_order),
+        ], workers=self.config["ORDER_WORKERS"], on_failure=lambda order: inventory.restock(item_quantities(order)),
+            recover_after=self.config["ORDER_RECOVER_AFTER"], recover_interval=self.config["ORDER_RECOVER_INTERVAL"])
+
+    @lazy_service
+    def passwords(self):
+        # 비밀번호 해시 비용 파라미터 (PASSWORD_HASH_ALGORITHM, PASSWORD_SCRYPT_N, ...)
+        return PasswordHasher.from_config(self.config)
+
+    @lazy_service
+    def login_limiter(self):
+        return VerificationLimiter(
+            rate=self.config["LOGIN_RATE_PER_MINUTE"] / 60,
+            burst=self.config["LOGIN_BURST"],
+        )
+
+    @lazy_service
+    def search(self):
+        # 상품 검색 역색인 (카탈로그 전체를 한 번 색인하고 이후에는 바뀐 상품만 갱신)
+        index = SearchIndex()
+        index.sync(self.catalog)
+        return index
+
+    @lazy_service
+    def images(self):
+        cache_dir = self.config["IMAGE_CACHE_DIR"] or os.path.join(self.app.instance_path, "image-cache")
+        return ImageCache(
+            cache_dir, origin=self.config["IMAGE_ORIGIN"], widths=self.config["IMAGE_WIDTHS"],
+            max_bytes=self.config["IMAGE_CACHE_MAX_BYTES"],
+        )
+
+    @lazy_service
+    def assets(self):
+        # 지문 경로로 빌드된 Bootstrap 등 정적 자산 목록 (없으면 static/vendor 사본)
+        return AssetManifest(self.config["ASSET_BUILD_DIR"] or os.path.join(self.app.static_folder, "dist"),
+                             vendor_dir=os.path.join(self.app.static_folder, "vendor"))
+
+    @lazy_service
+    def fragments(self):
+        # 상품 카드 / 상세 HTML 조각 캐시 (상품 ID + 카탈로그 version 기준, LRU)
+        return FragmentCache(self.app.jinja_env, maxsize=self.config["FRAGMENT_CACHE_SIZE"])
+
+    @lazy_service
+    def template_stamp(self):
+        # 템플릿이 바뀌면(배포) ETag도 달라지도록 템플릿 버전을 한 번 계산해 둡니다.
+        return templates_version(os.path.join(self.app.root_path, self.app.template_folder))
+
+    @property
+    def templates_version(self):
+        return self.template_stamp[0]
+
+    @property
+    def templates_mtime(self):
+        return self.template_stamp[1]
+
+    def shutdown(self):
+        """처리 중인 주문과 해시 작업을 마치고 백그라운드 스레드를 정리합니다."""
+        built = self.built()
+        if "order_pipeline" in built:
+            self.order_pipeline.shutdown()
+        if "passwords" in built:
+            self.passwords.shutdown()
+
+    def built(self):
+        """지금까지 만들어진 저장소 이름 목록 (테스트 / 진단용)."""
+        return sorted(name for name in vars(self) if isinstance(getattr(type(self), name, None), lazy_service))
+
+
+def services():
+    """현재 요청을 처리 중인 앱(앱 컨텍스트가 없으면 기본 app)의 저장소 묶음."""
+    return (current_app if has_app_context() else get_default_app()).extensions["shop"]
+
+
+# create_app()에서 앱 인스턴스마다 등록할 라우트 / 템플릿 전역 함수
+ROUTES = []
+TEMPLATE_GLOBALS = []
+
+
+def route(rule, **options):
+    """@app.route 대신 쓰는 데코레이터. 엔드포인트 이름은 함수 이름 그대로 등록됩니다."""
+    def decorator(view):
+        ROUTES.append((rule, view, options))
+        return view
+    return decorator
+
+
+def template_global(func):
+    TEMPLATE_GLOBALS.append(func)
+    return func
+
+
+def catalog_page_validators(*parts):
+    """카탈로그 페이지의 (ETag, Last-Modified)를 계산합니다."""
+    shop = services()
+    etag = page_etag(shop.catalog.version, shop.templates_version, shop.assets.digest, *parts)
+    last_modified = last_modified_at(shop.catalog.updated_at, shop.templates_mtime) if etag else None
+    return etag, last_modified
+
+
+@template_global
+def product_fragment(template_name, product, in_cart):
+    """캐시된 상품 HTML 조각을 반환합니다. 장바구니 포함 여부만 요청마다 달라집니다."""
+    shop = services()
+    return shop.fragments.render(template_name, product, in_cart, shop.catalog.version)
+
+
+@template_global
+def product_image_url(product, width):
+    """상품 이미지 주소. 프록시를 쓰면 원본이 바뀔 때 달라지는 ?v= 를 붙인 /img/<pid>/<width>."""
+    if not current_app.config["IMAGE_PROXY"]:
+        return product["image_url"]
+    return url_for("product_image", pid=product["id"], width=width, v=image_token(product["image_url"]))
+
+
+@template_global
+def product_image_srcset(product):
+    """허용된 모든 너비의 srcset 값 (프록시를 쓰지 않으면 빈 문자열)."""
+    if not current_app.config["IMAGE_PROXY"]:
+        return ""
+    return ", ".join(f"{product_image_url(product, width)} {width}w" for width in current_app.config["IMAGE_WIDTHS"])
+
+
+@template_global
+def asset_tag(name):
+    """정적 자산의 <link> / <script> 태그 (빌드된 파일이 있으면 /static/dist/<해시>/<이름>)."""
+    return services().assets.tag(name, lambda path: url_for("static_asset", filename=path),
+                                 lambda path: url_for("static", filename=path))
+
+
 def get_product(pid):
     """주어진 ID로 상품 정보를 찾아 반환합니다."""
-    try:
-        pid = int(pid)
-    except (TypeError, ValueError):
-        return None
+    return services().catalog.get(pid)
+
+
+def get_products(ids):
+    """
+    여러 상품 ID를 한 번에 조회해 (상품 목록, 합계 금액)을 반환합니다.
+    - ID는 여기서 한 번만 int로 변환하고, 변환할 수 없거나 없는 상품은 건너뜁니다.
+    - 조회는 카탈로그의 get_many 한 번으로 처리합니다 (SQLite면 WHERE id IN (...)).
+    - 상품 목록은 ids 순서를 따릅니다.
+    """
+    pids = [pid for pid in map(coerce_pid, ids) if pid is not None]
+    found = services().catalog.get_many(pids)
 
-    for product in PRODUCTS:
-        if product["id"] == pid:
-            return product
-    return None
+    items = []
+    total = 0
+    for pid in pids:
+        product = found.get(pid)
+        if product is not None:
+            items.append(product)
+            total += product["price"]
+    return items, total
 
 
 def product_in_cart(pid, cart=None):
@@ -125,14 +353,101 @@ def product_in_cart(pid, cart=None):
     return pid_str in cart
 
 
-@app.context_processor
-def inject_globals():
+def cart_product_ids(cart):
+    """장바구니 키(문자열 ID)를 int 상품 ID frozenset으로 한 번에 변환합니다."""
+    return frozenset(pid for pid in map(coerce_pid, cart) if pid is not None)
+
+
+EMPTY_CART_SUMMARY = {"count": 0, "subtotal": 0, "lines": 0, "version": None}
+
+
+def compute_cart_summary(cart):
+    """장바구니 전체를 다시 읽어 합계를 계산합니다 (카탈로그가 바뀌었을 때만 사용)."""
+    found = services().catalog.get_many(cart_product_ids(cart))
+    count = subtotal = 0
+    for pid_str, quantity in cart.items():
+        product = found.get(coerce_pid(pid_str))
+        if product is not None:
+            count += quantity
+            subtotal += product["price"] * quantity
+    return {"count": count, "subtotal": subtotal, "lines": len(cart), "version": services().catalog.version}
+
+
+def cart_summary():
+    """
+    장바구니 합계 {"count": 총 수량, "subtotal": 금액, ...}.
+    - 수량을 바꿀 때마다 변화량만 반영해 session["cart_summary"]에 저장해 두므로 보통은 그대로 읽기만 합니다.
+    - 카탈로그 version(가격)이 바뀌었거나 장바구니가 다른 경로로 바뀐 경우에만 다시 계산합니다.
+    """
     cart = session.get("cart", {})
+    if not cart:
+        return EMPTY_CART_SUMMARY
+    summary = session.get("cart_summary")
+    if summary is None or summary["version"] != services().catalog.version or summary["lines"] != len(cart):
+        summary = session["cart_summary"] = compute_cart_summary(cart)
+    return summary
+
+
+def set_cart_quantity(product, quantity):
+    """
+    상품 수량을 quantity로 바꾸고 합계에는 변화량만 더합니다. 0이면 장바구니에서 뺍니다.
+    재고 예약도 같은 수량으로 맞추며, 재고가 모자라면 아무것도 바꾸지 않고 False를 반환합니다.
+    """
+    cart = session.get("cart", {})
+    pid_str = str(product["id"])
+    previous = cart.get(pid_str, 0)
+    if quantity == previous:
+        return True
+
+    inventory = services().inventory
+    if quantity > 0 and not inventory.reserve(session["user_id"], product["id"], quantity):
+        return False
+    if quantity <= 0:
+        inventory.release(session["user_id"], product["id"])
+
+    summary = dict(cart_summary())
+    if quantity > 0:
+        cart[pid_str] = quantity
+    else:
+        cart.pop(pid_str, None)
+    delta = max(quantity, 0) - previous
+    summary.update(
+        count=summary["count"] + delta,
+        subtotal=summary["subtotal"] + delta * product["price"],
+        lines=len(cart),
+        version=services().catalog.version,
+    )
+    session["cart"] = cart
+    session["cart_summary"] = summary
+    return True
+
+
+def clear_cart():
+    session["cart"] = {}
+    session.pop("cart_summary", None)
+
+
+def lazy_global(name, compute):
+    """
+    템플릿이 처음 접근할 때 계산하고, 같은 요청 안에서는 결과를 재사용하는 지연 값.
+    (LocalProxy라 템플릿에서는 일반 값처럼 if / 출력 / in 검사에 쓸 수 있습니다.)
+    """
+    def resolve():
+        values = g.setdefault("_lazy_globals", {})
+        if name not in values:
+            values[name] = compute()
+        return values[name]
+    return LocalProxy(resolve)
+
+
+def inject_globals():
+    # 세션/장바구니는 템플릿이 실제로 사용할 때만 읽습니다.
     return {
-        "current_user": session.get("user_id"),
-        "cart_count": len(cart),
-        # 템플릿에서는 현재 cart snapshot을 기준으로 검사하도록 래핑
-        "product_in_cart": lambda pid: product_in_cart(pid, cart),
+        "current_user": lazy_global("current_user", lambda: session.get("user_id")),
+        "cart_count": lazy_global("cart_count", lambda: cart_summary()["count"]),
+        # 요청당 한 번만 만들어 두고, 템플릿에서는 `product.id in in_cart_ids`로 검사
+        "in_cart_ids": lazy_global("in_cart_ids", lambda: cart_product_ids(session.get("cart", {}))),
+        "product_in_cart": lambda pid: product_in_cart(pid),
     }
 
 
@@ -143,58 +458,258 @@ def require_login():
     return True
 
 
-@app.route("/")
+@route("/")
 def index():
-    return render_template("index.html", products=PRODUCTS)
-
-
-@app.route("/product/<int:pid>")
+    """
+    상품 목록 (페이지 단위).
+    - ?brand=&brand= / ?min_price=&max_price= : 브랜드(OR) / 가격 범위 필터
+    - ?sort=price : 낮은 가격순 (기본은 등록순)
+    - ?after=<id>&limit= : keyset 페이지네이션 (가격순이면 after_price까지 (가격, id) 커서)
+    - ?page=N            : N번째 페이지 (직접 이동용)
+    다음 페이지 링크는 항상 keyset 방식(마지막 상품 기준 커서)으로 만듭니다.
+    """
+    etag, last_modified = catalog_page_validators(current_app.config["CATALOG_PAGE_SIZE"])
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    limit = request.args.get("limit", type=int) or current_app.config["CATALOG_PAGE_SIZE"]
+    limit = max(1, min(limit, current_app.config["CATALOG_MAX_PAGE_SIZE"]))
+    page = max(request.args.get("page", 1, type=int), 1)
+    filters = {
+        "brands": [brand for brand in request.args.getlist("brand") if brand],
+        "min_price": request.args.get("min_price", type=int),
+        "max_price": request.args.get("max_price", type=int),
+    }
+    sort = request.args.get("sort", SORT_ID)
+    if sort not in SORT_OPTIONS:
+        sort = SORT_ID
+
+    after = request.args.get("after", type=int)
+    if sort == SORT_PRICE and after is not None:
+        after_price = request.args.get("after_price", type=int)
+        after = (after_price, after) if after_price is not None else None
+
+    # 한 개를 더 읽어서 다음 페이지가 있는지 판단
+    catalog = services().catalog
+    if after is not None:
+        products = catalog.filter(**filters, sort=sort, after=after, limit=limit + 1)
+    else:
+        products = catalog.filter(**filters, sort=sort, offset=(page - 1) * limit, limit=limit + 1)
+    has_next = len(products) > limit
+    products = products[:limit]
+
+    brand_counts, total = catalog.facet_counts(**filters)
+    for brand in filters["brands"]:
+        brand_counts.setdefault(brand, 0)
+
+    next_url = None
+    if has_next:
+        next_args = {"brand": filters["brands"], "min_price": filters["min_price"],
+                     "max_price": filters["max_price"], "after": products[-1]["id"]}
+        if sort != SORT_ID:
+            next_args["sort"] = sort
+            next_args["after_price"] = products[-1]["price"]
+        if "limit" in request.args:
+            next_args["limit"] = limit
+        next_url = url_for("index", **{key: value for key, value in next_args.items() if value not in (None, [])})
+
+    response = make_response(render_template(
+        "index.html",
+        products=products,
+        next_url=next_url,
+        is_first_page=after is None and page == 1,
+        brand_counts=dict(sorted(brand_counts.items())),
+        total=total,
+        filters=filters,
+        sort=sort,
+    ))
+    if next_url:
+        # 본문을 다 받기 전에 브라우저가 다음 페이지를 미리 알 수 있도록 헤더로도 전달
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return apply_cache_headers(response, etag, last_modified)
+
+
+@route("/product/<int:pid>")
 def product_detail(pid):
     product = get_product(pid)
     if not product:
         flash("상품이 존재하지 않습니다.", "danger")
         return redirect(url_for("index"))
-    return render_template("product_detail.html", product=product)
 
+    etag, last_modified = catalog_page_validators()
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    response = make_response(render_template("product_detail.html", product=product))
+    return apply_cache_headers(response, etag, last_modified)
 
-@app.route("/cart")
-def cart():
-    cart = session.get("cart", {})
-    items = []
-    total = 0
-    for pid_str in cart:
-        product = get_product(pid_str)
-        if product:
-            total += product["price"]
-            items.append(product)
-    return render_template("cart.html", items=items, total=total)
 
+def search_index():
+    """카탈로그 변경을 반영한 검색 색인."""
+    shop = services()
+    shop.search.sync(shop.catalog)
+    return shop.search
 
-@app.route("/cart/toggle/<int:pid>", methods=["POST"])
-def toggle_cart(pid):
-    if not require_login():
-        return redirect(url_for("login", next=request.referrer or url_for("index")))
 
+@route("/img/<int:pid>/<int:width>")
+def product_image(pid, width):
+    """
+    상품 이미지 썸네일. 처음 요청만 원본을 가져와 변환하고 이후에는 디스크 캐시에서 보냅니다.
+    ?v= 가 현재 원본과 맞으면 내용이 바뀌지 않으므로 1년 immutable로 캐시하게 합니다.
+    """
+    product = get_product(pid)
+    if not product:
+        abort(404)
+    images = services().images
+    if width not in images.widths:
+        # 허용 너비는 IMAGE_WIDTHS 설정에 따라 바뀌므로 영구(301)가 아닌 임시 리다이렉트.
+        # 쿼리 문자열은 캐시 무효화용 ?v= 만 넘깁니다 (나머지를 url_for에 넘기면 width / _external 등과 충돌).
+        return redirect(url_for("product_image", pid=pid, width=images.nearest_width(width), v=request.args.get("v")))
+
+    try:
+        digest, path = images.get(pid, product["image_url"], width)
+    except ImageUnavailable:
+        current_app.logger.warning("상품 %s 이미지를 가져오지 못했습니다.", pid)
+        if product["image_url"]:
+            return redirect(product["image_url"])
+        abort(404)
+
+    with open(path, "rb") as f:
+        mimetype = sniff_content_type(f.read(16))
+    response = send_file(path, mimetype=mimetype, etag=digest, conditional=True, last_modified=None)
+    if request.args.get("v") == image_token(product["image_url"]):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+@route("/static/dist/<path:filename>")
+def static_asset(filename):
+    """
+    assets.py build로 만든 지문 경로 자산. 경로에 내용 해시가 있으므로 1년 immutable로 캐시하고,
+    미리 만든 .br / .gz가 있으면 Accept-Encoding에 맞춰 그대로 보냅니다.
+    """
+    resolved = services().assets.resolve(filename, request.accept_encodings)
+    if resolved is None:
+        abort(404)
+    path, encoding = resolved
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_file(path, mimetype=mimetype, conditional=True, max_age=31536000)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        # ETag는 send_file이 실제로 보낸 파일(압축본) 기준으로 만들므로 인코딩마다 다름
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+@route("/search")
+def search():
+    """상품 검색 (?q=). 결과는 BM25 점수 순이며 상품 카드는 목록 페이지와 같은 조각 캐시를 씁니다."""
+    query = request.args.get("q", "").strip()
+    etag, last_modified = catalog_page_validators()
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    products = []
+    if query:
+        hits = search_index().search(query, limit=current_app.config["SEARCH_RESULT_LIMIT"])
+        found = services().catalog.get_many([pid for pid, _ in hits])
+        products = [found[pid] for pid, _ in hits if pid in found]
+    response = make_response(render_template("search.html", query=query, products=products))
+    return apply_cache_headers(response, etag, last_modified)
+
+
+@route("/search/suggest")
+def search_suggest():
+    """검색어 자동완성 (?q=접두어). JSON 문자열 배열을 반환합니다."""
+    prefix = request.args.get("q", "")
+    return jsonify(search_index().suggest(prefix, limit=current_app.config["SEARCH_SUGGEST_LIMIT"]))
+
+
+@route("/cart")
+def cart():
     cart = session.get("cart", {})
-    pid_str = str(pid)
+    items, _ = get_products(cart)
+    summary = cart_summary()
+    return render_template(
+        "cart.html",
+        items=items,
+        quantities={product["id"]: cart[str(product["id"])] for product in items},
+        total=summary["subtotal"],
+        max_quantity=current_app.config["CART_MAX_QUANTITY"],
+    )
+
+
+def change_cart_quantity(pid, quantity_for):
+    """장바구니 수량 변경 뷰 공통 처리. quantity_for(현재 수량)가 새 수량을 반환합니다."""
+    if not require_login():
+        return redirect(url_for("login", next=request.referrer or url_for("index")))
 
-    if pid_str in cart:
-        cart.pop(pid_str)
+    product = get_product(pid)
+    if not product:
+        flash("상품이 존재하지 않습니다.", "danger")
+        return redirect(request.referrer or url_for("index"))
+
+    current = session.get("cart", {}).get(str(pid), 0)
+    quantity = quantity_for(current)
+    if quantity is None:
+        flash("수량을 올바르게 입력해주세요.", "danger")
+        return redirect(request.referrer or url_for("cart"))
+    quantity = min(max(quantity, 0), current_app.config["CART_MAX_QUANTITY"])
+
+    if not set_cart_quantity(product, quantity):
+        flash("재고가 부족합니다.", "danger")
+    elif quantity == 0 and current:
         flash("장바구니에서 제거되었습니다.", "info")
-    else:
-        cart[pid_str] = 1
+    elif quantity and not current:
         flash("장바구니에 추가되었습니다.", "success")
+    return redirect(request.referrer or url_for("cart"))
+
+
+@route("/cart/toggle/<int:pid>", methods=["POST"])
+def toggle_cart(pid):
+    return change_cart_quantity(pid, lambda current: 0 if current else 1)
+
+
+@route("/cart/set/<int:pid>", methods=["POST"])
+def set_cart_item(pid):
+    return change_cart_quantity(pid, lambda current: request.form.get("quantity", type=int))
+
+
+@route("/cart/increment/<int:pid>", methods=["POST"])
+def increment_cart_item(pid):
+    return change_cart_quantity(pid, lambda current: current + 1)
 
-    session["cart"] = cart
-    return redirect(request.referrer or url_for("index"))
 
+@route("/cart/decrement/<int:pid>", methods=["POST"])
+def decrement_cart_item(pid):
+    return change_cart_quantity(pid, lambda current: current - 1)
 
-@app.route("/checkout", methods=["GET", "POST"])
+
+@route("/checkout", methods=["GET", "POST"])
 def checkout():
+    """
+    주문서 작성 / 제출.
+    - 주문서마다 idempotency_key(숨은 필드)를 넣어, 같은 주문서를 다시 제출하면
+      새 주문을 만들지 않고 처음 만든 주문의 상태 페이지로 보냅니다.
+    - 제출하면 주문을 저장하고 처리 큐에 넣기만 한 뒤 바로 응답합니다.
+    """
     if not require_login():
         return redirect(url_for("login", next=url_for("checkout")))
 
-    if not session.get("cart"):
+    user_id = session["user_id"]
+    orders = services().orders
+    submitted = request.method == "POST" and "cancel" not in request.form
+    key = request.form.get("idempotency_key", "")[:IDEMPOTENCY_KEY_MAX_LENGTH] if submitted else ""
+    if key:
+        existing = orders.find(user_id, key)
+        if existing is not None:
+            return redirect(url_for("order_status", order_id=existing["id"]))
+
+    cart = session.get("cart", {})
+    items, _ = get_products(cart)
+    if not items:
         flash("장바구니가 비어 있습니다.", "warning")
         return redirect(url_for("index"))
 
@@ -210,21 +725,111 @@ def checkout():
         if not (name and phone and address):
             flash("모든 필수 정보를 입력해주세요.", "danger")
         else:
-            session["cart"] = {}
+            order, created = orders.create(new_order(
+                user_id,
+                key or new_idempotency_key(),
+                [
+                    {"id": product["id"], "name": product["name"], "price": product["price"],
+                     "quantity": cart.get(str(product["id"]), 1)}
+                    for product in items
+                ],
+                {"name": name, "phone": phone, "address": address},
+            ))
+            if created:
+                # 장바구니 예약을 판매로 전환 (모자라면 주문을 실패로 기록하고 장바구니는 유지)
+                short = services().inventory.consume(user_id, item_quantities(order))
+                if short:
+                    names = ", ".join(item["name"] for item in order["items"] if item["id"] in short)
+                    orders.update(order["id"], status=FAILED, error=f"재고가 부족합니다: {names}")
+                    session.pop("checkout_key", None)
+                    flash(f"재고가 부족한 상품이 있어 주문하지 못했습니다: {names}", "danger")
+                    return redirect(url_for("cart"))
+                services().order_pipeline.submit(order["id"])
+            clear_cart()
+            session.pop("checkout_key", None)
             flash("결제가 완료되었습니다! 주문이 접수되었습니다.", "success")
-            return redirect(url_for("index"))
+            return redirect(url_for("order_status", order_id=order["id"]))
+
+    # 주문서 키는 주문이 만들어질 때까지 유지 (입력 오류로 다시 그려도 같은 키)
+    if "checkout_key" not in session:
+        session["checkout_key"] = new_idempotency_key()
+    summary = cart_summary()
+    return render_template("checkout.html", items=items, count=summary["count"], total=summary["subtotal"],
+                           idempotency_key=session["checkout_key"])
+
+
+@route("/orders/<order_id>")
+def order_status(order_id):
+    """주문 처리 상태. 처리 중이면 페이지가 잠시 후 스스로 새로고침됩니다."""
+    if not require_login():
+        return redirect(url_for("login", next=url_for("order_status", order_id=order_id)))
 
-    return render_template("checkout.html")
+    order = services().orders.get(order_id)
+    if order is None or order["user_id"] != session["user_id"]:
+        abort(404)
+    return render_template(
+        "order_status.html",
+        order=order,
+        status_label=STATUS_LABELS[order["status"]],
+        is_final=order["status"] in FINAL_STATUSES,
+    )
+
+
+def check_password(username, password):
+    """
+    사용자 비밀번호를 확인합니다.
+    - password_hash로 저장된 사용자는 해시로 검증하고,
+      예전 방식(password 평문) 사용자는 비교 후 해시 레코드로 바꿔 저장합니다.
+    - 해시 비용 설정이 바뀌었으면 로그인 성공 시 새 설정으로 다시 해시합니다.
+    - 없는 사용자도 더미 해시를 검증해 응답 시간으로 존재 여부가 드러나지 않게 합니다.
+    """
+    users = services().users
+    passwords = services().passwords
+    user = users.get(username)
+    if user is None:
+        passwords.verify(password, None)
+        return False
+
+    encoded = user.get("password_hash")
+    if encoded is not None:
+        if not passwords.verify(password, encoded):
+            return False
+    else:
+        legacy = user.get("password")
+        if legacy is None or not hmac.compare_digest(legacy.encode("utf-8"), password.encode("utf-8")):
+            return False
+
+    if encoded is None or passwords.needs_rehash(encoded):
+        record = {key: value for key, value in user.items() if key != "password"}
+        record["password_hash"] = passwords.hash(password)
+        users[username] = record
+    return True
 
 
-@app.route("/login", methods=["GET", "POST"])
+def hasher_busy(template_name):
+    """해시 풀이 밀려 있을 때의 응답 (503). 요청 스레드를 붙잡지 않고 잠시 뒤 다시 시도하게 합니다."""
+    flash("요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.", "warning")
+    response = make_response(render_template(template_name), 503)
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+@route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = request.form["username"].strip()
         password = request.form["password"].strip()
-        user = USERS.get(username)
 
-        if not user or user["password"] != password:
+        # 아이디만으로 제한하면 틀린 비밀번호를 보내 다른 사람의 계정을 잠글 수 있으므로 주소별로 따로 셈
+        if not services().login_limiter.allow((username, request.remote_addr)):
+            flash("로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요.", "danger")
+            return render_template("login.html"), 429
+
+        try:
+            ok = check_password(username, password)
+        except HasherBusy:
+            return hasher_busy("login.html")
+        if not ok:
             flash("아이디 또는 비밀번호가 올바르지 않습니다.", "danger")
         else:
             session["user_id"] = username
@@ -235,15 +840,16 @@ def login():
     return render_template("login.html")
 
 
-@app.route("/register", methods=["GET", "POST"])
+@route("/register", methods=["GET", "POST"])
 def register():
     if request.method == "POST":
         username = request.form["username"].strip()
         password = request.form["password"].strip()
         confirm = request.form["confirm"].strip()
+        users = services().users
 
         # 이미 존재하는 사용자 처리
-        if username in USERS:
+        if username in users:
             flash("이미 존재하는 사용자입니다. 로그인해주세요.", "info")
             return redirect(url_for("login"))
 
@@ -252,21 +858,89 @@ def register():
             flash("비밀번호가 일치하지 않습니다.", "danger")
             return render_template("register.html")
 
-        # 정상 회원가입
-        else:
-            USERS[username] = {"password": password}
-            flash("회원가입 성공! 이제 로그인해주세요.", "success")
+        try:
+            encoded = services().passwords.hash(password)
+        except HasherBusy:
+            return hasher_busy("register.html")
+
+        # 정상 회원가입 (동시에 같은 아이디로 가입하면 한쪽만 성공)
+        if not users.add(username, {"password_hash": encoded}):
+            flash("이미 존재하는 사용자입니다. 로그인해주세요.", "info")
             return redirect(url_for("login"))
 
+        flash("회원가입 성공! 이제 로그인해주세요.", "success")
+        return redirect(url_for("login"))
+
     return render_template("register.html")
 
 
-@app.route("/logout")
+@route("/logout")
 def logout():
+    # 장바구니가 함께 삭제되므로 예약해 둔 재고도 돌려놓음
+    user_id = session.get("user_id")
+    if user_id:
+        for pid in cart_product_ids(session.get("cart", {})):
+            services().inventory.release(user_id, pid)
     session.clear()
     flash("로그아웃되었습니다.", "info")
     return redirect(url_for("index"))
 
 
+def create_app(config=None):
+    """
+    WSGI 앱 팩토리.
+    설정은 Config 기본값 → 환경변수 → config 인자(설정 클래스 또는 dict) 순서로 덮어씁니다.
+    앱 인스턴스마다 카탈로그 / 사용자 / 장바구니 저장소와 캐시를 따로 가지며,
+    각 저장소는 처음 사용할 때 만들어집니다.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(env_overrides(Config))
+    if isinstance(config, type):
+        app.config.from_object(config)
+    elif config:
+        app.config.update(config)
+
+    shop = app.extensions["shop"] = ShopServices(app)
+    # 장바구니 내용은 서버 저장소에 두고 쿠키에는 장바구니 ID만 싣습니다.
+    app.session_interface = CartSessionInterface(lambda: shop.cart_store)
+
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    for func in TEMPLATE_GLOBALS:
+        app.add_template_global(func)
+    app.context_processor(inject_globals)
+    return app
+
+
+# 기존 `from app import app, USERS, ...` 사용 코드를 위한 기본 앱 인스턴스와 저장소.
+# import만으로는 만들지 않고, 처음 참조할 때 create_app()으로 만듭니다.
+_default_app = None
+_default_app_lock = threading.Lock()
+DEFAULT_APP_SERVICES = {
+    "USERS": "users",
+    "CATALOG": "catalog",
+    "FRAGMENTS": "fragments",
+    "PASSWORDS": "passwords",
+    "LOGIN_LIMITER": "login_limiter",
+}
+
+
+def get_default_app():
+    global _default_app
+    with _default_app_lock:
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+
+
+def __getattr__(name):
+    if name == "app":
+        return get_default_app()
+    if name in DEFAULT_APP_SERVICES:
+        return getattr(get_default_app().extensions["shop"], DEFAULT_APP_SERVICES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    get_default_app().run(debug=True)
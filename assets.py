@@ -0,0 +1,469 @@
+"""
+정적 자산(Bootstrap CSS / JS) 빌드와 조회.
+
+    python assets.py vendor [--from DIR]   # 고정한 버전의 Bootstrap을 static/vendor에 받아 둠 (SRI 검증, 커밋되어 있음)
+    python assets.py build [--purge]       # static/vendor → static/dist (지문 경로 + .gz / .br + manifest.json)
+
+- vendor: CDN(또는 --from 디렉터리)에서 VENDOR에 적힌 파일을 가져와 base.html이 쓰던 것과 같은
+  SRI 해시로 검증한 뒤 저장합니다. 받은 파일은 저장소에 커밋해 두면 배포 때 외부 접속이 필요 없습니다.
+- build: 내용 해시를 경로에 넣어(dist/<해시>/bootstrap.min.css) 파일 내용이 바뀌면 URL도 바뀌게 하므로
+  1년 immutable로 캐시할 수 있습니다. gzip(.gz)과 brotli(.br, brotli 모듈이 있을 때) 압축본을 미리 만들어
+  요청마다 압축하지 않고 그대로 보냅니다.
+- --purge: templates/에서 쓰는 class만 남긴 CSS를 만듭니다. 템플릿의 class를 바꾸면 다시 빌드해야 합니다.
+- 템플릿이 쓰는 주소는 빌드 결과(manifest.json) → static/vendor 사본 순서로 정하고,
+  둘 다 없을 때만 CDN 주소와 SRI를 씁니다. manifest.json이 바뀌면(재빌드) 다음 요청부터 새로 읽습니다.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.request
+
+from markupsafe import Markup
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 의존성 (없으면 .gz만 만듦)
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+VENDOR_DIR = os.path.join(STATIC_DIR, "vendor")
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+MANIFEST_NAME = "manifest.json"
+
+BOOTSTRAP_VERSION = "5.3.8"
+BOOTSTRAP_CDN = f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist"
+
+# 이름 → (CDN 주소, SRI 해시)
+VENDOR = {
+    "bootstrap.min.css": (
+        f"{BOOTSTRAP_CDN}/css/bootstrap.min.css",
+        "sha384-sRIl4kxILFvY47J16cr9ZwB07vP4J8+LH7qKQnuqkuIAvNWLzeN8tE5YBujZqJLB",
+    ),
+    "bootstrap.bundle.min.js": (
+        f"{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js",
+        "sha384-FKyoEForCGlyvwx9Hj09JcYn3nv7wiPVlz7YYwJrWVcXK/BmnVDxM+D2scQbITxI",
+    ),
+}
+
+# 템플릿에는 없지만 Bootstrap JS가 붙였다 떼는 class (purge해도 남겨 둠)
+SAFELIST = frozenset({
+    "show", "showing", "hiding", "collapsing", "collapsed", "collapse-horizontal", "fade", "active",
+    "disabled", "was-validated", "is-valid", "is-invalid",
+})
+
+FINGERPRINT_LENGTH = 12
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 미리 압축한 파일 확장자 (Accept-Encoding 이름 → 확장자), 앞에 있는 것을 우선 사용
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetError(Exception):
+    """자산을 받거나 빌드하지 못했을 때 발생합니다."""
+
+
+def sri_hash(data):
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode("ascii")
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+# ---- vendor ----
+
+def vendor(dest_dir, source_dir=None):
+    """VENDOR 파일을 CDN(또는 source_dir)에서 가져와 SRI를 확인하고 dest_dir에 저장합니다."""
+    os.makedirs(dest_dir, exist_ok=True)
+    written = []
+    for name, (url, integrity) in VENDOR.items():
+        if source_dir:
+            with open(os.path.join(source_dir, name), "rb") as f:
+                data = f.read()
+        else:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+        if sri_hash(data) != integrity:
+            raise AssetError(f"{name}의 SRI 해시가 맞지 않습니다 (Bootstrap {BOOTSTRAP_VERSION}이 아닙니다).")
+        _write_atomic(os.path.join(dest_dir, name), data)
+        written.append(name)
+    return written
+
+
+# ---- CSS purge ----
+
+_COMMENT_OR_STRING = re.compile(r"/\*.*?\*/|\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'", re.S)
+_AT_RULE_NAME = re.compile(r"@([\w-]+)")
+_CLASS_NAME = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+_NOT_OR_ATTRIBUTE = re.compile(r":not\([^()]*\)|\[[^\]]*\]")
+# 안쪽에 규칙이 들어가는 at-rule (@font-face, @keyframes 등은 통째로 둠)
+_NESTED_AT_RULES = frozenset({"media", "supports", "container", "layer", "document"})
+
+_CLASS_ATTRIBUTE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_JINJA = re.compile(r"\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.S)
+_JINJA_STRING = re.compile(r"""["']([\w\s-]+)["']""")
+_CLASS_TOKEN = re.compile(r"[A-Za-z_-][\w-]*")
+
+
+def _strip_comments(css):
+    """문자열은 그대로 두고 주석을 지웁니다. 맨 앞의 라이선스 주석(/*! ... */)은 남깁니다."""
+    kept_license = []
+
+    def replace(match):
+        text = match.group(0)
+        if text.startswith("/*"):
+            if text.startswith("/*!") and not kept_license:
+                kept_license.append(text)
+                return text
+            return ""
+        return text
+
+    return _COMMENT_OR_STRING.sub(replace, css)
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == "\\" else 1
+    return i + 1
+
+
+def _block_end(css, i):
+    """css[i]의 '{'와 짝이 맞는 '}' 다음 위치."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in "\"'":
+            i = _skip_string(css, i)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def parse_css(css, i=0):
+    """
+    CSS를 (prelude, body) 목록으로 나눕니다. ('}'를 만나면 멈추고 (목록, 다음 위치)를 반환)
+    body는 @charset 같은 문장이면 None, @media 등이면 하위 목록, 그 외에는 선언 문자열입니다.
+    """
+    nodes = []
+    start = i
+    while i < len(css):
+        char = css[i]
+        if char in "\"'":
+            i = _skip_string(css, i)
+        elif char == ";":
+            statement = css[start:i].strip()
+            if statement:
+                nodes.append((statement, None))
+            i += 1
+            start = i
+        elif char == "{":
+            prelude = css[start:i].strip()
+            at_rule = _AT_RULE_NAME.match(prelude)
+            if at_rule and at_rule.group(1).lower() in _NESTED_AT_RULES:
+                children, i = parse_css(css, i + 1)
+                nodes.append((prelude, children))
+            else:
+                end = _block_end(css, i)
+                nodes.append((prelude, css[i + 1:end - 1]))
+                i = end
+            start = i
+        elif char == "}":
+            return nodes, i + 1
+        elif css.startswith("/*!", i):
+            end = css.find("*/", i)
+            end = len(css) if end < 0 else end + 2
+            nodes.append((css[i:end], ""))
+            i = start = end
+        else:
+            i += 1
+    return nodes, i
+
+
+def split_selectors(prelude):
+    """쉼표로 나뉜 선택자 목록 (:not(.a, .b) 같은 괄호 안의 쉼표는 나누지 않음)."""
+    selectors = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return [selector for selector in selectors if selector]
+
+
+def selector_classes(selector):
+    """선택자가 요구하는 class 이름들 (:not() 안과 속성 선택자 안은 제외)."""
+    return set(_CLASS_NAME.findall(_NOT_OR_ATTRIBUTE.sub("", selector)))
+
+
+def purge_css(css, used, prefixes=()):
+    """
+    used(또는 prefixes로 시작하는) class만으로 이루어진 선택자의 규칙만 남깁니다.
+    class가 없는 선택자(body, :root, [hidden] 등)와 @font-face / @keyframes는 그대로 둡니다.
+    """
+    used = set(used) | SAFELIST
+    prefixes = tuple(prefixes)
+
+    def is_used(name):
+        return name in used or name.startswith(prefixes)
+
+    def purge(nodes):
+        out = []
+        for prelude, body in nodes:
+            if body is None:
+                out.append(prelude + ";")
+            elif prelude.startswith("/*"):
+                out.append(prelude)
+            elif isinstance(body, list):
+                inner = purge(body)
+                if inner:
+                    out.append(f"{prelude}{{{inner}}}")
+            elif prelude.startswith("@"):
+                out.append(f"{prelude}{{{body}}}")
+            else:
+                selectors = [s for s in split_selectors(prelude) if all(map(is_used, selector_classes(s)))]
+                if selectors:
+                    out.append(f"{','.join(selectors)}{{{body}}}")
+        return "".join(out)
+
+    nodes, _ = parse_css(_strip_comments(css))
+    return purge(nodes)
+
+
+def template_classes(template_dir=TEMPLATE_DIR):
+    """
+    템플릿 class 속성에 쓰인 (class 이름 set, 접두어 tuple).
+    alert-{{ category }}처럼 Jinja 식 앞에 붙은 이름은 접두어("alert-")로,
+    {{ 'active' if ... }} 안의 문자열은 class 이름으로 봅니다.
+    """
+    used, prefixes = set(), set()
+    for root, _, files in os.walk(template_dir):
+        for name in files:
+            if not name.endswith(".html"):
+                continue
+            with open(os.path.join(root, name), encoding="utf-8") as f:
+                html = f.read()
+            for match in _CLASS_ATTRIBUTE.finditer(html):
+                value = match.group(1) if match.group(1) is not None else match.group(2)
+                for expression in _JINJA.findall(value):
+                    for literal in _JINJA_STRING.findall(expression):
+                        used.update(literal.split())
+                for part in _JINJA.split(value):
+                    used.update(_CLASS_TOKEN.findall(part))
+                prefixes.update(re.findall(r"([\w-]+-)\{[{%]", value))
+    return used, tuple(sorted(prefixes))
+
+
+# ---- build ----
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp은 0600으로 만들므로 웹 서버가 읽을 수 있게
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def compressed_variants(data):
+    """{확장자: 압축된 바이트}. 작은 파일이나 압축해도 줄지 않는 경우는 만들지 않습니다."""
+    if len(data) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+def build(source_dir, dist_dir, purge=False, template_dir=TEMPLATE_DIR):
+    """
+    source_dir의 자산을 dist_dir/<내용 해시>/<이름>으로 복사하고 압축본과 manifest.json을 씁니다.
+    manifest는 {이름: dist_dir 기준 경로}이며, 마지막에 교체하므로 빌드 중에도 이전 manifest가 유효합니다.
+    """
+    names = sorted(name for name in os.listdir(source_dir) if not name.startswith(".")) \
+        if os.path.isdir(source_dir) else []
+    missing = [name for name in VENDOR if name not in names]
+    if missing:
+        raise AssetError(f"{source_dir}에 {', '.join(missing)}이(가) 없습니다. 먼저 `python assets.py vendor`를 실행하세요.")
+    if purge:
+        used, prefixes = template_classes(template_dir)
+
+    manifest = {}
+    for name in names:
+        with open(os.path.join(source_dir, name), "rb") as f:
+            data = f.read()
+        if purge and name.endswith(".css"):
+            data = purge_css(data.decode("utf-8"), used, prefixes).encode("utf-8")
+        path = f"{fingerprint(data)}/{name}"
+        target = os.path.join(dist_dir, path)
+        if not os.path.exists(target):
+            _write_atomic(target, data)
+            for suffix, body in compressed_variants(data).items():
+                _write_atomic(target + suffix, body)
+        manifest[name] = path
+
+    _write_atomic(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return manifest
+
+
+def clean(dist_dir, manifest):
+    """manifest에 없는 예전 빌드 디렉터리를 지웁니다."""
+    current = {path.split("/", 1)[0] for path in manifest.values()}
+    for entry in os.listdir(dist_dir):
+        if entry not in current and os.path.isdir(os.path.join(dist_dir, entry)):
+            shutil.rmtree(os.path.join(dist_dir, entry))
+
+
+# ---- 앱에서 사용 ----
+
+class AssetManifest:
+    """
+    빌드된 manifest.json을 읽어 자산 URL / 태그를 만듭니다.
+    manifest.json의 수정 시각 / 크기가 바뀌면(assets.py build) 다시 읽으므로 재시작하지 않아도 새 경로를 씁니다.
+    """
+
+    def __init__(self, dist_dir, vendor_dir=VENDOR_DIR):
+        self.dist_dir = dist_dir
+        self.vendored = frozenset(name for name in VENDOR if os.path.isfile(os.path.join(vendor_dir, name)))
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._state = self._empty_state()
+
+    def _empty_state(self):
+        # 빌드가 없을 때 페이지가 가리키는 곳(vendor 사본 / CDN)도 ETag에 반영되도록 digest에 넣음
+        source = "vendor" if self.vendored == frozenset(VENDOR) else "cdn"
+        return {}, frozenset(), f"{source}-{BOOTSTRAP_VERSION}"
+
+    def _current(self):
+        """(paths, files, digest). manifest.json이 바뀌었을 때만 다시 읽습니다."""
+        path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)  # build는 새 파일로 교체하므로 inode도 바뀜
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp:
+            return self._state
+        with self._lock:
+            if stamp != self._stamp:
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except FileNotFoundError:
+                    state = self._empty_state()
+                else:
+                    paths = json.loads(data)
+                    state = paths, frozenset(paths.values()), fingerprint(data)
+                self._state, self._stamp = state, stamp
+            return self._state
+
+    @property
+    def paths(self):
+        return self._current()[0]
+
+    @property
+    def files(self):
+        return self._current()[1]
+
+    @property
+    def digest(self):
+        """현재 manifest 내용의 해시 (빌드가 없으면 vendor / CDN 여부와 버전). 페이지 ETag에 들어갑니다."""
+        return self._current()[2]
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def tag(self, name, url_for_path, url_for_static):
+        """
+        <link> / <script> 태그. 빌드된 파일이 있으면 url_for_path(지문 경로)로,
+        없으면 url_for_static("vendor/<이름>")으로, vendor 사본도 없으면 CDN 주소와 SRI로 만듭니다.
+        """
+        paths = self.paths
+        if name in paths:
+            url, extra = url_for_path(paths[name]), ""
+        elif name in self.vendored:
+            url, extra = url_for_static(f"vendor/{name}"), ""
+        else:
+            url, integrity = VENDOR[name]
+            extra = f' integrity="{integrity}" crossorigin="anonymous"'
+        if name.endswith(".css"):
+            return Markup(f'<link href="{Markup.escape(url)}" rel="stylesheet"{extra}>')
+        return Markup(f'<script src="{Markup.escape(url)}"{extra}></script>')
+
+    def resolve(self, filename, accept_encoding):
+        """
+        요청한 지문 경로의 (실제 파일 경로, Content-Encoding 또는 None).
+        빌드 결과에 없는 경로면 None을 반환합니다.
+        """
+        if filename not in self.files:
+            return None
+        path = os.path.join(self.dist_dir, *filename.split("/"))
+        for encoding, suffix in ENCODINGS:
+            if accept_encoding[encoding] and os.path.exists(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="정적 자산 vendor / build")
+    commands = parser.add_subparsers(dest="command", required=True)
+    vendor_parser = commands.add_parser("vendor", help="Bootstrap 파일을 받아 static/vendor에 저장")
+    vendor_parser.add_argument("--from", dest="source_dir", help="CDN 대신 이 디렉터리의 파일을 사용")
+    build_parser = commands.add_parser("build", help="static/vendor → static/dist")
+    build_parser.add_argument("--purge", action="store_true", help="템플릿에서 쓰는 class만 남긴 CSS를 만듦")
+    build_parser.add_argument("--keep-old", action="store_true", help="예전 빌드 디렉터리를 지우지 않음")
+    args = parser.parse_args(argv)
+
+    vendor_dir = VENDOR_DIR
+    dist_dir = os.path.join(STATIC_DIR, "dist")
+    try:
+        if args.command == "vendor":
+            for name in vendor(vendor_dir, args.source_dir):
+                print(f"{name} → {os.path.relpath(os.path.join(vendor_dir, name), BASE_DIR)}")
+        else:
+            manifest = build(vendor_dir, dist_dir, purge=args.purge)
+            if not args.keep_old:
+                clean(dist_dir, manifest)
+            for name, path in manifest.items():
+                full = os.path.join(dist_dir, path)
+                sizes = ", ".join(
+                    f"{suffix[1:]} {os.path.getsize(full + suffix):,}B"
+                    for _, suffix in ENCODINGS if os.path.exists(full + suffix)
+                )
+                print(f"{name} → dist/{path} ({os.path.getsize(full):,}B{', ' + sizes if sizes else ''})")
+    except (AssetError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+카탈로그 / 장바구니 / 렌더링 핫패스 마이크로 벤치마크와 성능 회귀 검사.
+
+    python benchmarks/bench_hotpaths.py                                   # 표로 출력
+    python benchmarks/bench_hotpaths.py --save baseline.json              # 기준값 저장
+    python benchmarks/bench_hotpaths.py --compare baseline.json --threshold 0.25
+    python benchmarks/bench_hotpaths.py --sizes 10 1000 --carts 1 10 --only get_product render_cart
+
+측정 항목 (합성 상품 --sizes개 카탈로그, 장바구니 --carts개 상품)
+  get_product      상품 ID 하나 조회 (app.get_product)
+  product_in_cart  장바구니 포함 여부 (app.product_in_cart, 절반은 없는 상품)
+  cart_total       /cart 뷰의 합계 계산 (get_products + compute_cart_summary)
+  render_index     GET / 전체 (필터 / 패싯 / index.html 렌더링)
+  render_cart      GET /cart 전체 (cart.html 렌더링)
+
+- 각 항목은 한 번에 min-time초 이상 걸리도록 반복 횟수를 정한 뒤 --repeat번 재서, 가장 빠른 값(best)과
+  중앙값(median)을 1회당 마이크로초로 기록합니다. 비교는 잡음이 적은 best로 합니다.
+- --compare: 기준 파일보다 threshold(기본 25%) 넘게 느려진 항목이 있거나, 이번에 재야 했는데
+  결과에 없는 기준 항목(이름이 바뀌거나 없어진 핫패스)이 있으면 목록을 출력하고 종료 코드 1.
+  --sizes / --carts / --only로 고르지 않은 기준 항목은 비교하지 않습니다.
+  기준값은 같은 머신에서 만든 것과 비교해야 의미가 있으므로 저장소에 커밋하지 않습니다.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import compute_cart_summary, create_app, get_product, get_products, product_in_cart  # noqa: E402
+from benchmarks.synthetic import synthetic_products  # noqa: E402
+from config import TestingConfig  # noqa: E402
+
+CATALOG_SIZES = (10, 1_000, 10_000, 100_000)
+CART_SIZES = (1, 10, 100, 500)
+PROBES = 256
+CASES = ("get_product", "product_in_cart", "cart_total", "render_index", "render_cart")
+
+
+def measure(func, per_call=1, repeat=5, min_time=0.05):
+    """func 1회(또는 per_call 연산) 당 걸린 시간을 (best, median, loops) 마이크로초 단위로 반환합니다."""
+    func()  # 템플릿 컴파일 / 캐시 채우기는 측정에서 뺌
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append(time.perf_counter() - started)
+    scale = 1e6 / (loops * per_call)
+    return min(timings) * scale, statistics.median(timings) * scale, loops
+
+
+def make_app(size, backend, workdir):
+    config = dict(vars(TestingConfig))
+    if backend == "sqlite":
+        config["CATALOG_DB"] = os.path.join(workdir, f"catalog-{size}.db")
+    app = create_app(config)
+    app.extensions["shop"].catalog.reload(synthetic_products(size))
+    return app
+
+
+def make_cart(size, lines, rng):
+    """카탈로그에 있는 상품 lines개(카탈로그보다 크면 전체)로 만든 장바구니 {"pid": 수량}."""
+    pids = rng.sample(range(1, size + 1), min(lines, size))
+    return {str(pid): rng.randint(1, 3) for pid in pids}
+
+
+def logged_in_client(app, cart=None):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = "testuser"
+        if cart is not None:
+            sess["cart"] = cart
+    return client
+
+
+def bench_catalog(app, size, carts, only, rng, **timing):
+    """카탈로그 크기 하나에 대한 항목들. {이름: (best, median, loops)}"""
+    results = {}
+    probes = [rng.randint(1, size) for _ in range(PROBES)]
+
+    def wanted(case):
+        return not only or case in only
+
+    with app.app_context():
+        if wanted("get_product"):
+            def lookup():
+                for pid in probes:
+                    get_product(pid)
+            results[f"get_product[catalog={size}]"] = measure(lookup, per_call=PROBES, **timing)
+
+        for lines in carts:
+            cart = make_cart(size, lines, rng)
+            if wanted("product_in_cart"):
+                # 절반은 장바구니에 있는 상품, 절반은 없는 상품
+                in_cart = list(cart) or ["1"]
+                mixed = [rng.choice(in_cart) if i % 2 else str(size + i) for i in range(PROBES)]
+
+                def membership():
+                    for pid in mixed:
+                        product_in_cart(pid, cart)
+                results[f"product_in_cart[catalog={size},cart={lines}]"] = measure(
+                    membership, per_call=PROBES, **timing)
+            if wanted("cart_total"):
+                def total():
+                    get_products(cart)
+                    compute_cart_summary(cart)
+                results[f"cart_total[catalog={size},cart={lines}]"] = measure(total, **timing)
+
+    if wanted("render_index"):
+        client = app.test_client()
+
+        def render_index():
+            assert client.get("/").status_code == 200
+        results[f"render_index[catalog={size}]"] = measure(render_index, **timing)
+
+    if wanted("render_cart"):
+        for lines in carts:
+            client = logged_in_client(app, make_cart(size, lines, rng))
+
+            def render_cart():
+                assert client.get("/cart").status_code == 200
+            results[f"render_cart[catalog={size},cart={lines}]"] = measure(render_cart, **timing)
+    return results
+
+
+def run_suite(sizes=CATALOG_SIZES, carts=CART_SIZES, only=(), backend="memory", repeat=5, min_time=0.05,
+              seed=0, progress=None):
+    """모든 항목을 측정해 {"meta": ..., "results": {이름: {"best_us", "median_us", "loops"}}}를 반환합니다."""
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            app = make_app(size, backend, workdir)
+            try:
+                for name, (best, median, loops) in bench_catalog(
+                        app, size, carts, only, rng, repeat=repeat, min_time=min_time).items():
+                    results[name] = {"best_us": round(best, 3), "median_us": round(median, 3), "loops": loops}
+                    if progress:
+                        progress(name, results[name])
+            finally:
+                app.extensions["shop"].shutdown()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": backend,
+            "sizes": list(sizes),
+            "carts": list(carts),
+            "only": list(only),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def selected(name, meta):
+    """이름이 case[catalog=N,cart=M]인 항목을 meta의 sizes / carts / only 설정으로 측정했어야 하는지 여부."""
+    case, _, params = name.partition("[")
+    params = dict(param.split("=", 1) for param in params.rstrip("]").split(",") if param)
+    if meta.get("only") and case not in meta["only"]:
+        return False
+    if "catalog" in params and "sizes" in meta and int(params["catalog"]) not in meta["sizes"]:
+        return False
+    if "cart" in params and "carts" in meta and int(params["cart"]) not in meta["carts"]:
+        return False
+    return True
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    기준값보다 threshold 비율 넘게 느려진 항목 [(이름, 기준 best, 현재 best, 변화율)].
+    이번 실행에서 재야 했는데 결과에 없는 기준 항목은 (이름, 기준 best, None, None)으로 함께 반환합니다.
+    현재 결과에만 있는 새 항목은 비교하지 않습니다.
+    """
+    regressions = []
+    meta = current.get("meta", {})
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            if selected(name, meta):
+                regressions.append((name, base["best_us"], None, None))
+            continue
+        if not base["best_us"]:
+            continue
+        change = result["best_us"] / base["best_us"] - 1
+        if change > threshold:
+            regressions.append((name, base["best_us"], result["best_us"], change))
+    return regressions
+
+
+def print_result(name, result):
+    print(f"{name:<52}{result['best_us']:>12.2f}{result['median_us']:>12.2f}{result['loops']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(CATALOG_SIZES), help="카탈로그 상품 수")
+    parser.add_argument("--carts", type=int, nargs="+", default=list(CART_SIZES), help="장바구니 상품 수")
+    parser.add_argument("--only", nargs="+", choices=CASES, default=(), help="이 항목만 측정")
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory", help="카탈로그 저장소")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="한 번 잴 때 최소 시간(초)")
+    parser.add_argument("--save", default=None, help="결과를 기준값 JSON으로 저장")
+    parser.add_argument("--compare", default=None, help="이 기준값 JSON과 비교")
+    parser.add_argument("--threshold", type=float, default=0.25, help="허용하는 느려짐 비율 (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<52}{'best µs':>12}{'median µs':>12}{'loops':>10}")
+    current = run_suite(sizes=args.sizes, carts=args.carts, only=args.only, backend=args.backend,
+                        repeat=args.repeat, min_time=args.min_time, progress=print_result)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+        print(f"\n기준값 저장: {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{args.threshold:.0%} 넘게 느려졌거나 결과에 없는 항목 {len(regressions)}개:")
+            for name, before, after, change in regressions:
+                if after is None:
+                    print(f"  {name}: {before:.2f} µs → 결과 없음 (이름이 바뀌었거나 없어진 항목)")
+                else:
+                    print(f"  {name}: {before:.2f} → {after:.2f} µs (+{change:.0%})")
+            return 1
+        print(f"\n기준값 대비 {args.threshold:.0%} 넘게 느려진 항목 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
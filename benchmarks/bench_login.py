@@ -0,0 +1,57 @@
+"""
+로그인(비밀번호 검증) 처리량 벤치마크.
+
+비용 설정별로 동시 로그인 요청 수를 바꿔 가며 초당 로그인 수를 측정합니다.
+
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --requests 64 --concurrency 1 4 16
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credentials import PBKDF2, SCRYPT, PasswordHasher  # noqa: E402
+
+COST_SETTINGS = [
+    ("scrypt n=2^12", {"algorithm": SCRYPT, "scrypt_n": 2 ** 12}),
+    ("scrypt n=2^14", {"algorithm": SCRYPT, "scrypt_n": 2 ** 14}),
+    ("scrypt n=2^15", {"algorithm": SCRYPT, "scrypt_n": 2 ** 15}),
+    ("pbkdf2 100k", {"algorithm": PBKDF2, "pbkdf2_iterations": 100_000}),
+    ("pbkdf2 600k", {"algorithm": PBKDF2, "pbkdf2_iterations": 600_000}),
+]
+
+
+def logins_per_second(hasher, encoded, requests, concurrency):
+    """요청 스레드 concurrency개가 총 requests번 verify를 호출할 때의 처리량."""
+    with ThreadPoolExecutor(max_workers=concurrency) as request_threads:
+        started = time.perf_counter()
+        results = list(request_threads.map(lambda _: hasher.verify("password123", encoded), range(requests)))
+        elapsed = time.perf_counter() - started
+    assert all(results)
+    return requests / elapsed, elapsed / requests * concurrency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32, help="설정당 로그인 횟수")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="동시 요청 스레드 수")
+    parser.add_argument("--workers", type=int, default=None, help="해시 풀 크기 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    print(f"CPU {os.cpu_count()}개, 해시 풀 {args.workers or os.cpu_count()}개")
+    print(f"{'cost':<16}{'concurrency':>12}{'logins/s':>12}{'latency ms':>12}")
+    for label, params in COST_SETTINGS:
+        hasher = PasswordHasher(workers=args.workers, cache_size=0, **params)  # 매번 해시 비용을 잼
+        encoded = hasher.hash("password123")
+        for concurrency in args.concurrency:
+            rate, latency = logins_per_second(hasher, encoded, args.requests, concurrency)
+            print(f"{label:<16}{concurrency:>12}{rate:>12.1f}{latency * 1000:>12.1f}")
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
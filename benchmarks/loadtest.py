@@ -0,0 +1,338 @@
+"""
+쇼핑 흐름 부하 테스트.
+
+가상 사용자(VU) N명이 각자 쿠키를 따로 가지고 다음 흐름을 반복하며,
+경로별 처리량과 p50 / p95 / p99 지연 시간을 보고합니다.
+
+    POST /login → GET / → POST /cart/toggle/<pid> → GET /cart → GET /checkout → POST /checkout
+
+    python benchmarks/loadtest.py --users 16 --iterations 20                 # 프로세스 안 WSGI 호출
+    python benchmarks/loadtest.py --target server --threads 8 --users 32     # 로컬 HTTP 서버를 띄워서
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --duration 60  # 이미 떠 있는 서버 (serve.py)
+
+- --target wsgi / server는 이 프로세스에서 create_app()으로 앱을 만들고 합성 상품 --catalog-size개로
+  카탈로그를 채운 뒤, 사용자 계정을 미리 만들어 둡니다 (재고는 넉넉하게).
+- --url은 외부 서버를 그대로 쓰므로 사용자는 /register로 만들고, 장바구니에 담을 상품 ID는 서버의
+  상품 목록(GET /, rel="next"를 따라 최대 --discover-pages쪽)에서 읽습니다 (--product-ids로 직접 지정 가능).
+  워커 수를 정할 때는 serve.py --workers를 바꿔 가며 --url로 측정하세요.
+- 주문 화면에 주문 폼이 없어 POST /checkout을 못 한 흐름은 완료로 세지 않고 실패한 흐름으로 셉니다.
+- --think-time은 요청 사이 평균 대기 시간(초)이며 0.5~1.5배 사이에서 무작위로 정합니다.
+"""
+import argparse
+import html
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from benchmarks.synthetic import synthetic_products  # noqa: E402
+from serve import PooledWSGIServer, warm_up  # noqa: E402
+
+PASSWORD = "loadtest-password"
+CHECKOUT_KEY = re.compile(r'name="idempotency_key" value="([^"]+)"')
+TOGGLE_ACTION = re.compile(r'action="/cart/toggle/(\d+)"')
+NEXT_LINK = re.compile(r'<link rel="next" href="([^"]+)"')
+DISCOVER_PAGES = 20
+PERCENTILES = (50, 95, 99)
+
+
+class WSGIClient:
+    """Flask test client로 앱을 직접 호출 (네트워크 없음). VU마다 하나씩 만들어 쿠키를 따로 가집니다."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self._client.open(path, method=method, data=data)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPClient:
+    """urllib HTTP 클라이언트. 리다이렉트는 따라가지 않고 (경로별로 따로 잼) 쿠키는 VU마다 따로 둡니다."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode("utf-8") if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as exc:
+            # 3xx (리다이렉트를 따라가지 않음) / 4xx / 5xx
+            return exc.code, exc.read().decode("utf-8", "replace")
+
+
+class Stats:
+    """경로별 지연 시간(초)과 오류 수. VU 스레드들이 함께 기록합니다."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.flows = 0
+        self.failed_flows = 0
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def flow_done(self):
+        with self._lock:
+            self.flows += 1
+
+    def flow_failed(self):
+        with self._lock:
+            self.failed_flows += 1
+
+    def summary(self, elapsed):
+        """{경로: {count, errors, rps, p50, p95, p99, max}} (지연 시간은 ms)."""
+        routes = {}
+        for route, values in self.latencies.items():
+            values = sorted(values)
+            row = {"count": len(values), "errors": self.errors.get(route, 0), "rps": len(values) / elapsed}
+            for p in PERCENTILES:
+                row[f"p{p}"] = percentile(values, p) * 1000
+            row["max"] = values[-1] * 1000
+            routes[route] = row
+        total = sum(row["count"] for row in routes.values())
+        return {
+            "elapsed": elapsed,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": total / elapsed,
+            "flows": self.flows,
+            "failed_flows": self.failed_flows,
+            "flows_per_second": self.flows / elapsed,
+            "routes": routes,
+        }
+
+
+def percentile(sorted_values, p):
+    """nearest-rank 백분위수."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def discover_product_ids(client, max_pages=DISCOVER_PAGES):
+    """서버의 상품 목록(GET /)을 rel="next"를 따라 읽으며 장바구니에 담을 수 있는 상품 ID를 모읍니다."""
+    ids = []
+    path = "/"
+    for _ in range(max_pages):
+        status, body = client.request("GET", path)
+        if status != 200:
+            break
+        ids.extend(int(pid) for pid in TOGGLE_ACTION.findall(body))
+        match = NEXT_LINK.search(body)
+        if not match:
+            break
+        path = html.unescape(match.group(1))
+    return list(dict.fromkeys(ids))
+
+
+class VirtualUser:
+    """쿠키를 따로 가진 가상 사용자 한 명. run()에서 쇼핑 흐름을 반복합니다."""
+
+    def __init__(self, username, client, stats, product_ids, think_time=0.0, seed=0):
+        self.username = username
+        self.client = client
+        self.stats = stats
+        self.product_ids = product_ids
+        self.think_time = think_time
+        self.random = random.Random(seed)
+
+    def call(self, route, method, path, data=None, expect=(200, 302, 303)):
+        started = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, data)
+        except OSError:
+            status, body = None, ""
+        self.stats.record(route, time.perf_counter() - started, status in expect)
+        return status, body
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.think_time * self.random.uniform(0.5, 1.5))
+
+    def register(self):
+        """--url 대상에서 계정을 만듭니다 (측정하지 않음, 이미 있으면 그대로 사용)."""
+        self.client.request("POST", "/register",
+                            {"username": self.username, "password": PASSWORD, "confirm": PASSWORD})
+
+    def flow(self):
+        pid = self.random.choice(self.product_ids)
+        self.call("POST /login", "POST", "/login", {"username": self.username, "password": PASSWORD}, expect=(302,))
+        self.think()
+        self.call("GET /", "GET", "/")
+        self.think()
+        self.call("POST /cart/toggle/<pid>", "POST", f"/cart/toggle/{pid}", {}, expect=(302,))
+        self.think()
+        self.call("GET /cart", "GET", "/cart")
+        self.think()
+        _, body = self.call("GET /checkout", "GET", "/checkout", expect=(200,))
+        match = CHECKOUT_KEY.search(body)
+        ordered = False
+        if match:
+            self.think()
+            status, _ = self.call("POST /checkout", "POST", "/checkout", {
+                "idempotency_key": match.group(1),
+                "name": self.username, "phone": "010-0000-0000", "address": "서울시 부하구 테스트로 1",
+            }, expect=(302,))
+            ordered = status == 302
+        self.client.request("GET", "/logout")
+        # 장바구니가 비어 주문 폼이 없었거나 주문이 실패한 흐름은 완료로 세지 않음
+        if ordered:
+            self.stats.flow_done()
+        else:
+            self.stats.flow_failed()
+
+    def run(self, iterations=None, deadline=None):
+        done = 0
+        while (iterations is None or done < iterations) and (deadline is None or time.monotonic() < deadline):
+            self.flow()
+            done += 1
+
+
+def prepare_app(catalog_size, users, config=None):
+    """합성 카탈로그와 사용자 계정을 채운 앱을 만듭니다 (--target wsgi / server)."""
+    # 같은 VU가 반복 로그인하므로 검증 캐시는 끄고 매번 해시 비용을 잼
+    app = create_app(dict({"INVENTORY_DEFAULT_STOCK": 10 ** 9, "PASSWORD_VERIFY_CACHE_SIZE": 0}, **(config or {})))
+    shop = app.extensions["shop"]
+    shop.catalog.reload(synthetic_products(catalog_size))
+    # 모든 VU가 같은 비밀번호를 쓰므로 해시는 한 번만 계산
+    encoded = shop.passwords.hash(PASSWORD)
+    for username in users:
+        shop.users[username] = {"password_hash": encoded}
+    return warm_up(app)
+
+
+def run(users=8, iterations=10, duration=None, think_time=0.0, catalog_size=1000, target="wsgi", url=None,
+        threads=16, ramp_up=0.0, seed=0, config=None, product_ids=None, discover_pages=DISCOVER_PAGES):
+    """
+    부하 테스트를 실행하고 Stats.summary() 결과를 반환합니다.
+    product_ids를 주지 않으면 wsgi / server는 합성 카탈로그의 1..catalog_size를, --url은 서버 목록에서 읽은 ID를 씁니다.
+    """
+    usernames = [f"load-user-{i}" for i in range(users)]
+    stats = Stats()
+    app = server = None
+    if url:
+        make_client = lambda: HTTPClient(url)  # noqa: E731
+        if not product_ids:
+            product_ids = discover_product_ids(make_client(), discover_pages)
+            if not product_ids:
+                raise SystemExit(f"{url} 의 상품 목록에서 상품 ID를 찾지 못했습니다 (--product-ids로 지정하세요).")
+    else:
+        product_ids = product_ids or list(range(1, catalog_size + 1))
+        app = prepare_app(catalog_size, usernames, config)
+        if target == "server":
+            logging.getLogger("werkzeug").setLevel(logging.WARNING)  # 요청마다 찍는 접근 로그 끔
+            server = PooledWSGIServer("127.0.0.1", 0, app, threads=threads)
+            threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            make_client = lambda: HTTPClient(base_url)  # noqa: E731
+        else:
+            make_client = lambda: WSGIClient(app)  # noqa: E731
+
+    vus = [
+        VirtualUser(username, make_client(), stats, product_ids, think_time=think_time, seed=seed + i)
+        for i, username in enumerate(usernames)
+    ]
+    if url:
+        for vu in vus:
+            vu.register()
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + duration if duration else None
+
+    def start(index, vu):
+        if ramp_up and users > 1:
+            time.sleep(ramp_up * index / (users - 1))
+        vu.run(iterations=None if duration else iterations, deadline=deadline)
+
+    vu_threads = [
+        threading.Thread(target=start, args=(i, vu), name=f"vu-{i}", daemon=True) for i, vu in enumerate(vus)
+    ]
+    try:
+        for thread in vu_threads:
+            thread.start()
+        for thread in vu_threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.executor.shutdown(wait=True)
+            server.server_close()
+        if app is not None:
+            app.extensions["shop"].shutdown()
+    return stats.summary(elapsed)
+
+
+def print_summary(summary):
+    print(f"{'route':<26}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for route, row in summary["routes"].items():
+        print(f"{route:<26}{row['count']:>8}{row['errors']:>8}{row['rps']:>10.1f}"
+              f"{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}")
+    print(f"\n총 {summary['requests']}건 / {summary['elapsed']:.2f}초 = {summary['rps']:.1f} req/s, "
+          f"오류 {summary['errors']}건, 완료한 흐름 {summary['flows']}회 ({summary['flows_per_second']:.1f}/s), "
+          f"실패한 흐름 {summary['failed_flows']}회")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8, help="동시 가상 사용자 수")
+    parser.add_argument("--iterations", type=int, default=10, help="VU당 흐름 반복 횟수 (--duration이 없을 때)")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간(초). 주면 --iterations 대신 사용")
+    parser.add_argument("--think-time", type=float, default=0.0, help="요청 사이 평균 대기 시간(초)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="VU를 이 시간(초)에 걸쳐 나눠 시작")
+    parser.add_argument("--catalog-size", type=int, default=1000, help="합성 상품 수 (wsgi / server)")
+    parser.add_argument("--target", choices=("wsgi", "server"), default="wsgi",
+                        help="wsgi: 프로세스 안에서 직접 호출, server: 로컬 HTTP 서버를 띄워서 호출")
+    parser.add_argument("--threads", type=int, default=16, help="--target server의 요청 스레드 수")
+    parser.add_argument("--url", default=None, help="이미 떠 있는 서버 주소 (--target 무시)")
+    parser.add_argument("--product-ids", type=int, nargs="+", default=None,
+                        help="장바구니에 담을 상품 ID (--url에서 주지 않으면 서버 상품 목록에서 읽음)")
+    parser.add_argument("--discover-pages", type=int, default=DISCOVER_PAGES,
+                        help="--url에서 상품 ID를 읽을 최대 목록 페이지 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="결과를 JSON 파일로도 저장")
+    args = parser.parse_args(argv)
+
+    summary = run(users=args.users, iterations=args.iterations, duration=args.duration, think_time=args.think_time,
+                  catalog_size=args.catalog_size, target=args.target, url=args.url, threads=args.threads,
+                  ramp_up=args.ramp_up, seed=args.seed, product_ids=args.product_ids,
+                  discover_pages=args.discover_pages)
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 1 if summary["errors"] or summary["failed_flows"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
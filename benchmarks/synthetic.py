@@ -0,0 +1,38 @@
+"""
+벤치마크 / 부하 테스트용 합성 상품 데이터.
+
+seed가 같으면 항상 같은 상품 목록을 만들므로, 실행 결과를 서로 비교할 수 있습니다.
+상품명은 실제 카탈로그처럼 한글 단어 조합이라 검색 색인(2-gram)도 비슷한 부하를 받습니다.
+"""
+import random
+
+BRANDS = (
+    "Resona Cat", "PlayLand", "Scratch&Joy", "LaserFun", "CatHerb", "FeedSmart", "PureFlow", "SoftNest",
+    "Groomy", "NightPlay", "MeowWorks", "PawPrint", "PurrFect", "WhiskerCo", "CozyTail", "TunaTime",
+)
+ADJECTIVES = ("프리미엄", "자동", "원목", "대형", "미니", "실리콘", "유기농", "무소음", "2단", "3단", "접이식", "LED")
+NOUNS = (
+    "캣타워", "스크래쳐", "급식기", "정수기", "장난감", "하우스", "쿠션", "브러쉬", "터널", "해먹",
+    "모래", "화장실", "사료", "간식", "캣닢", "낚싯대", "이동장", "방석",
+)
+FEATURES = (
+    "발톱 관리에 좋은", "스트레스 해소에 도움이 되는", "세척이 쉬운", "사냥 본능을 자극하는",
+    "겨울철에 따뜻한", "다묘 가정에 알맞은", "조용하게 작동하는", "튼튼한 구조의",
+)
+
+
+def synthetic_products(count, seed=0, start_id=1):
+    """id가 start_id부터 1씩 늘어나는 상품 dict count개."""
+    rng = random.Random(seed)
+    products = []
+    for pid in range(start_id, start_id + count):
+        adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+        products.append({
+            "id": pid,
+            "name": f"{adjective} {noun} {pid}",
+            "price": rng.randrange(5, 300) * 1000,
+            "brand": rng.choice(BRANDS),
+            "description": f"{rng.choice(FEATURES)} {adjective} {noun}. 모델 번호 RC-{pid:06d}.",
+            "image_url": f"https://images.example.com/products/{pid}.jpg",
+        })
+    return products
@@ -0,0 +1,238 @@
+"""
+서버 측 장바구니 저장소.
+
+- 쿠키 세션에는 짧은 장바구니 ID(_cid)만 두고, 장바구니 내용은 서버 저장소에 보관합니다.
+- 뷰/템플릿 코드는 지금처럼 session["cart"]를 그대로 쓰며,
+  CartSessionInterface가 읽을 때 저장소에서 불러오고 저장할 때 쿠키에서 빼냅니다.
+- 저장소 구현: 메모리(TTL 만료) / SQLite.
+"""
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SecureCookieSession, SecureCookieSessionInterface
+
+# 쿠키 대신 서버 저장소에 보관할 세션 키 (장바구니와 그 합계)
+SERVER_SIDE_KEYS = ("cart", "cart_summary")
+
+# 쿠키에 남는 장바구니 ID 키
+CART_ID_KEY = "_cid"
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+def new_cart_id():
+    return secrets.token_urlsafe(12)
+
+
+class MemoryCartStore:
+    """
+    프로세스 메모리 저장소.
+    마지막 저장 시각 순서로 보관하므로, 만료 정리는 앞에서부터 만료된 것만 지우면 됩니다.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # cid -> (만료 시각, data)
+        self._lock = threading.Lock()
+
+    def load(self, cid):
+        with self._lock:
+            entry = self._data.get(cid)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= self._clock():
+                del self._data[cid]
+                return None
+            return json.loads(data)
+
+    def save(self, cid, data):
+        # 요청 간에 같은 dict 객체를 공유하지 않도록 직렬화해서 보관
+        payload = json.dumps(data)
+        with self._lock:
+            now = self._clock()
+            self._data[cid] = (now + self.ttl, payload)
+            self._data.move_to_end(cid)
+            self._sweep(now)
+
+    def delete(self, cid):
+        with self._lock:
+            self._data.pop(cid, None)
+
+    def sweep(self):
+        with self._lock:
+            self._sweep(self._clock())
+
+    def _sweep(self, now):
+        while self._data:
+            cid, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[cid]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCartStore:
+    """
+    SQLite 저장소. 여러 워커 프로세스가 같은 파일을 공유할 수 있습니다.
+    만료된 행은 조회 시 무시하고, sweep_every번 저장할 때마다 한 번 지웁니다.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, sweep_every=256, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.sweep_every = sweep_every
+        self._clock = clock
+        self._writes = 0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS carts ("
+                " cid TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_carts_expires ON carts (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def load(self, cid):
+        row = self._connect().execute(
+            "SELECT data FROM carts WHERE cid = ? AND expires_at > ?", (cid, self._clock())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, cid, data):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO carts (cid, data, expires_at) VALUES (?, ?, ?)",
+                (cid, json.dumps(data), self._clock() + self.ttl),
+            )
+        self._writes += 1
+        if self._writes % self.sweep_every == 0:
+            self.sweep()
+
+    def delete(self, cid):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM carts WHERE cid = ?", (cid,))
+
+    def sweep(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM carts WHERE expires_at <= ?", (self._clock(),))
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM carts").fetchone()[0]
+
+
+def open_cart_store(url=None, ttl=DEFAULT_TTL):
+    """CART_STORE 설정값으로 저장소를 만듭니다. 비어 있거나 'memory'면 메모리, 그 외에는 SQLite 파일 경로."""
+    if not url or url == "memory":
+        return MemoryCartStore(ttl=ttl)
+    return SQLiteCartStore(url, ttl=ttl)
+
+
+class CartSession(SecureCookieSession):
+    """
+    서버 측 키(cart)를 처음 읽는 순간에만 저장소에서 불러오는 세션.
+    장바구니를 건드리지 않는 요청은 저장소를 조회하지 않습니다.
+    """
+
+    store = None
+
+    def __init__(self, initial=None):
+        super().__init__(initial)
+        self.loaded_cid = dict.get(self, CART_ID_KEY)
+        self._hydrated = False
+
+    def _hydrate(self, key):
+        if self._hydrated or key not in SERVER_SIDE_KEYS:
+            return
+        self._hydrated = True
+        cid = dict.get(self, CART_ID_KEY)
+        if not cid or self.store is None:
+            return
+        for name, value in (self.store.load(cid) or {}).items():
+            if not dict.__contains__(self, name):
+                dict.__setitem__(self, name, value)
+
+    def __getitem__(self, key):
+        self._hydrate(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._hydrate(key)
+        return super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        # 먼저 불러와 두어야 저장할 때 다른 서버 측 키가 빠지지 않음
+        self._hydrate(key)
+        super().__setitem__(key, value)
+
+    def get(self, key, default=None):
+        self._hydrate(key)
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self._hydrate(key)
+        return super().setdefault(key, default)
+
+    def pop(self, key, *default):
+        self._hydrate(key)
+        return super().pop(key, *default)
+
+
+class CartSessionInterface(SecureCookieSessionInterface):
+    """쿠키에는 장바구니 ID만 싣고, 장바구니 내용은 store에 저장하는 세션 인터페이스."""
+
+    session_class = CartSession
+
+    def __init__(self, store):
+        # store 대신 저장소를 돌려주는 함수를 넘기면 첫 요청 때 저장소를 만듭니다.
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store() if callable(self._store) else self._store
+
+    def open_session(self, app, request):
+        session = super().open_session(app, request)
+        if session is not None:
+            session.store = self.store
+        return session
+
+    def save_session(self, app, session, response):
+        # 서버 측 키는 잠시 빼 두고 쿠키를 직렬화한 뒤 다시 돌려놓음
+        server_data = {
+            key: dict.pop(session, key)
+            for key in SERVER_SIDE_KEYS
+            if dict.__contains__(session, key)
+        }
+        try:
+            if session.modified:
+                cid = dict.get(session, CART_ID_KEY)
+                if server_data:
+                    if not cid:
+                        cid = new_cart_id()
+                        dict.__setitem__(session, CART_ID_KEY, cid)
+                    self.store.save(cid, server_data)
+                elif session.loaded_cid and not cid:
+                    # session.clear() 등으로 장바구니 ID가 사라졌으면 저장소에서도 삭제
+                    self.store.delete(session.loaded_cid)
+            super().save_session(app, session, response)
+        finally:
+            dict.update(session, server_data)
@@ -0,0 +1,550 @@
+"""
+상품 카탈로그 인덱스.
+
+- 앱 시작 시 한 번 만들어 두고, 요청마다 PRODUCTS 리스트를 선형 탐색하지 않도록
+  id → 상품 해시 인덱스와 브랜드/가격 보조 인덱스를 유지합니다.
+- reload() 시에는 새 인덱스를 모두 만든 뒤 참조 하나만 교체하므로,
+  읽는 쪽은 항상 "이전 인덱스" 또는 "새 인덱스" 중 하나만 보게 됩니다.
+- 카탈로그가 메모리에 다 올리기 어려울 만큼 크면 SQLiteCatalog를 쓰고,
+  CachedCatalog로 감싸 워커별 read-through 캐시를 둡니다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from itertools import islice
+
+from cache import LRUCache
+
+PRODUCT_FIELDS = ("id", "name", "price", "brand", "description", "image_url")
+
+# SQLite 바인딩 변수 개수 제한(구버전 999)을 넘지 않도록 IN (...) 조회를 나눠서 실행
+IN_CHUNK_SIZE = 500
+
+# 상품 목록 정렬 방식: 등록순(id) / 낮은 가격순(price, id)
+SORT_ID = "id"
+SORT_PRICE = "price"
+SORT_OPTIONS = (SORT_ID, SORT_PRICE)
+
+
+def coerce_pid(pid):
+    """상품 ID를 int로 변환합니다. 변환할 수 없으면 None을 반환합니다."""
+    try:
+        return int(pid)
+    except (TypeError, ValueError):
+        return None
+
+
+def content_version(products):
+    """
+    상품 목록 내용의 해시. 프로세스마다 1부터 세는 카운터와 달리 재시작 / 재배포 후에도
+    내용이 같으면 같은 값, 내용이 바뀌면 다른 값이 되어 ETag와 캐시 키로 쓸 수 있습니다.
+    """
+    data = json.dumps(products, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(data.encode("ascii")).hexdigest()[:16]
+
+
+class _Indexes:
+    """한 시점의 카탈로그 스냅샷과 그 위에 만든 인덱스 묶음 (생성 후 변경하지 않음)."""
+
+    __slots__ = ("products", "by_id", "ids", "by_brand", "brand_ids", "brand_id_sets",
+                 "prices", "price_ids", "price_keys", "version")
+
+    def __init__(self, products):
+        products = list(products)
+        by_id = {}
+        by_brand = {}
+        for product in products:
+            by_id[product["id"]] = product
+            by_brand.setdefault(product["brand"], []).append(product)
+
+        # (가격, id) 순으로 정렬해 두고 범위 검색은 bisect로 처리
+        ordered = sorted(products, key=lambda p: (p["price"], p["id"]))
+
+        self.products = products
+        self.by_id = by_id
+        self.ids = sorted(by_id)
+        self.by_brand = by_brand
+        # 브랜드 facet: 브랜드 → 정렬된 id 배열 (목록 순회용) / id 집합 (개수 교집합용)
+        self.brand_ids = {brand: sorted(p["id"] for p in items) for brand, items in by_brand.items()}
+        self.brand_id_sets = {brand: frozenset(ids) for brand, ids in self.brand_ids.items()}
+        self.prices = [p["price"] for p in ordered]
+        self.price_ids = [p["id"] for p in ordered]
+        self.price_keys = [(p["price"], p["id"]) for p in ordered]
+        self.version = content_version(products)
+
+    def price_bounds(self, min_price=None, max_price=None):
+        """가격 정렬 배열에서 [min_price, max_price] 구간의 (시작, 끝) 위치."""
+        lo = 0 if min_price is None else bisect_left(self.prices, min_price)
+        hi = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+        return lo, max(lo, hi)
+
+
+class CatalogRepository(ABC):
+    """
+    카탈로그 저장소 공통 인터페이스.
+    구현체는 get / __iter__ / __len__ 을 반드시 구현하고 (빠지면 인스턴스를 만들 때 TypeError),
+    필요하면 get_many / by_brand / price_range / brands 와 version(카탈로그가 바뀌면 달라지는 값)을 제공합니다.
+    """
+
+    version = 0
+    # 카탈로그가 마지막으로 바뀐 시각 (epoch 초, 모르면 None)
+    updated_at = None
+
+    @abstractmethod
+    def get(self, pid):
+        """id로 상품 하나를 조회합니다. 없으면 None."""
+
+    def get_many(self, ids):
+        """여러 상품을 한 번에 조회합니다. {id: 상품} 형태로, 없는 ID는 빠집니다."""
+        found = {}
+        for pid in ids:
+            product = self.get(pid)
+            if product is not None:
+                found[product["id"]] = product
+        return found
+
+    def all(self):
+        return list(self)
+
+    def page(self, after=None, limit=20, offset=0):
+        """
+        id 오름차순으로 한 페이지를 반환합니다.
+        - after가 있으면 keyset 방식: id > after 인 상품부터 limit개
+        - 없으면 offset번째 상품부터 limit개
+        """
+        products = iter(self)
+        if after is not None:
+            products = (p for p in products if p["id"] > after)
+        return list(islice(products, offset, offset + limit))
+
+    def filter(self, brands=(), min_price=None, max_price=None, sort=SORT_ID, after=None, limit=20, offset=0):
+        """
+        브랜드(여러 개면 OR) / 가격 범위로 거른 상품을 sort 순서로 한 페이지 반환합니다.
+        - sort="id": after는 마지막 상품 id
+        - sort="price": after는 마지막 상품의 (가격, id)
+        """
+        brands = set(brands)
+        products = (
+            p for p in self
+            if (not brands or p["brand"] in brands)
+            and (min_price is None or p["price"] >= min_price)
+            and (max_price is None or p["price"] <= max_price)
+        )
+        key = (lambda p: (p["price"], p["id"])) if sort == SORT_PRICE else (lambda p: p["id"])
+        products = sorted(products, key=key)
+        if after is not None:
+            products = [p for p in products if key(p) > after]
+        return products[offset:offset + limit]
+
+    def facet_counts(self, brands=(), min_price=None, max_price=None):
+        """
+        (브랜드별 개수, 전체 결과 수)를 반환합니다.
+        브랜드별 개수는 가격 조건만 적용한 값이라, 다른 브랜드를 더 골랐을 때의 개수를 보여줄 수 있습니다.
+        """
+        counts = {}
+        for p in self:
+            if (min_price is None or p["price"] >= min_price) and (max_price is None or p["price"] <= max_price):
+                counts[p["brand"]] = counts.get(p["brand"], 0) + 1
+        total = sum(count for brand, count in counts.items() if not brands or brand in brands)
+        return dict(sorted(counts.items())), total
+
+    @abstractmethod
+    def __iter__(self):
+        """상품을 id 오름차순으로 순회합니다."""
+
+    @abstractmethod
+    def __len__(self):
+        """상품 수."""
+
+    def __contains__(self, pid):
+        return self.get(pid) is not None
+
+
+class Catalog(CatalogRepository):
+    """메모리 상주 상품 카탈로그."""
+
+    def __init__(self, products=()):
+        self._lock = threading.Lock()
+        self._indexes = _Indexes(products)
+        self.updated_at = time.time()
+
+    @property
+    def version(self):
+        """상품 내용의 해시 (content_version)."""
+        return self._indexes.version
+
+    def reload(self, products):
+        """
+        카탈로그 전체를 새 상품 목록으로 교체합니다.
+        인덱스는 잠금 밖에서 새로 만들고, 교체는 참조 대입 한 번으로 끝냅니다.
+        """
+        indexes = _Indexes(products)
+        with self._lock:
+            self._indexes = indexes
+            self.updated_at = time.time()
+
+    def get(self, pid):
+        """get_product와 같은 규칙: int 변환 실패 또는 미존재 시 None."""
+        pid = coerce_pid(pid)
+        if pid is None:
+            return None
+        return self._indexes.by_id.get(pid)
+
+    def get_many(self, ids):
+        by_id = self._indexes.by_id
+        found = {}
+        for pid in ids:
+            product = by_id.get(pid)
+            if product is not None:
+                found[pid] = product
+        return found
+
+    def page(self, after=None, limit=20, offset=0):
+        indexes = self._indexes
+        start = offset
+        if after is not None:
+            start += bisect_right(indexes.ids, after)
+        return [indexes.by_id[pid] for pid in indexes.ids[start:start + limit]]
+
+    def by_brand(self, brand):
+        return list(self._indexes.by_brand.get(brand, ()))
+
+    def brands(self):
+        return sorted(self._indexes.by_brand)
+
+    def price_range(self, min_price=None, max_price=None):
+        """min_price 이상 max_price 이하 상품을 가격 오름차순으로 반환합니다."""
+        indexes = self._indexes
+        lo, hi = indexes.price_bounds(min_price, max_price)
+        return [indexes.by_id[pid] for pid in indexes.price_ids[lo:hi]]
+
+    def filter(self, brands=(), min_price=None, max_price=None, sort=SORT_ID, after=None, limit=20, offset=0):
+        """
+        미리 만든 facet 인덱스로 거른 결과를 정렬 없이 순서대로 읽어 한 페이지만 만듭니다.
+        - sort="price": 가격 정렬 배열의 [min, max] 구간(bisect)을 앞에서부터 읽으며 브랜드 집합으로 거름
+        - sort="id": 고른 브랜드들의 정렬된 id 배열을 병합(또는 전체 id 배열)하며 가격으로 거름
+        필요한 개수(offset + limit)만큼만 읽고 멈춥니다.
+        """
+        indexes = self._indexes
+        by_id = indexes.by_id
+        brands = list(dict.fromkeys(brands))  # ?brand=A&brand=A 처럼 중복되면 병합 결과에 같은 id가 두 번 나옴
+        brand_sets = [indexes.brand_id_sets[b] for b in brands if b in indexes.brand_id_sets]
+        if brands and not brand_sets:
+            return []
+
+        if sort == SORT_PRICE:
+            lo, hi = indexes.price_bounds(min_price, max_price)
+            if after is not None:
+                lo = max(lo, bisect_right(indexes.price_keys, tuple(after)))
+            ids = islice(indexes.price_ids, lo, hi)
+            if brand_sets:
+                selected = brand_sets[0] if len(brand_sets) == 1 else frozenset().union(*brand_sets)
+                ids = (pid for pid in ids if pid in selected)
+        else:
+            if brand_sets:
+                arrays = [indexes.brand_ids[b] for b in brands if b in indexes.brand_ids]
+            else:
+                arrays = [indexes.ids]
+            if after is not None:
+                arrays = [array[bisect_right(array, after):] for array in arrays]
+            ids = arrays[0] if len(arrays) == 1 else merge(*arrays)
+            if min_price is not None or max_price is not None:
+                low = float("-inf") if min_price is None else min_price
+                high = float("inf") if max_price is None else max_price
+                ids = (pid for pid in ids if low <= by_id[pid]["price"] <= high)
+        return [by_id[pid] for pid in islice(ids, offset, offset + limit)]
+
+    def facet_counts(self, brands=(), min_price=None, max_price=None):
+        """브랜드별 개수는 브랜드 id 집합 ∩ 가격 구간 id 집합의 크기로 계산합니다."""
+        indexes = self._indexes
+        if min_price is None and max_price is None:
+            counts = {brand: len(ids) for brand, ids in indexes.brand_id_sets.items()}
+        else:
+            lo, hi = indexes.price_bounds(min_price, max_price)
+            in_range = frozenset(indexes.price_ids[lo:hi])
+            counts = {brand: len(ids & in_range) for brand, ids in indexes.brand_id_sets.items()}
+        total = sum(count for brand, count in counts.items() if not brands or brand in brands)
+        return {brand: count for brand, count in sorted(counts.items()) if count}, total
+
+    def all(self):
+        return list(self._indexes.products)
+
+    def __iter__(self):
+        return iter(self._indexes.products)
+
+    def __len__(self):
+        return len(self._indexes.products)
+
+
+class SQLiteCatalog(CatalogRepository):
+    """
+    SQLite에 저장된 카탈로그.
+    - 연결은 스레드(및 fork된 워커)마다 처음 조회할 때 엽니다.
+    - 조회는 모두 파라미터 바인딩 쿼리라 sqlite3의 statement 캐시를 재사용합니다.
+    - version은 PRAGMA user_version에 저장하고 load() 때마다 1씩 올립니다.
+    """
+
+    _COLUMNS = ", ".join(PRODUCT_FIELDS)
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                " id INTEGER PRIMARY KEY,"
+                " name TEXT NOT NULL,"
+                " price INTEGER NOT NULL,"
+                " brand TEXT NOT NULL,"
+                " description TEXT NOT NULL DEFAULT '',"
+                " image_url TEXT NOT NULL DEFAULT '')"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_brand ON products (brand, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_price ON products (price, id)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _query(self, sql, params=()):
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    @property
+    def version(self):
+        return self._connect().execute("PRAGMA user_version").fetchone()[0]
+
+    @property
+    def updated_at(self):
+        return os.path.getmtime(self.path)
+
+    def load(self, products):
+        """카탈로그 전체를 한 트랜잭션 안에서 교체합니다."""
+        conn = self._connect()
+        with conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute("DELETE FROM products")
+            conn.executemany(
+                f"INSERT INTO products ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                ([p.get(field, "") for field in PRODUCT_FIELDS] for p in products),
+            )
+            conn.execute(f"PRAGMA user_version = {int(version) + 1}")
+
+    reload = load
+
+    def get(self, pid):
+        pid = coerce_pid(pid)
+        if pid is None:
+            return None
+        rows = self._query(f"SELECT {self._COLUMNS} FROM products WHERE id = ?", (pid,))
+        return rows[0] if rows else None
+
+    def get_many(self, ids):
+        ids = list(ids)
+        found = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            for product in self._query(
+                f"SELECT {self._COLUMNS} FROM products WHERE id IN ({placeholders})", chunk
+            ):
+                found[product["id"]] = product
+        return found
+
+    def page(self, after=None, limit=20, offset=0):
+        if after is None:
+            return self._query(
+                f"SELECT {self._COLUMNS} FROM products ORDER BY id LIMIT ? OFFSET ?",
+                (limit, offset),
+            )
+        return self._query(
+            f"SELECT {self._COLUMNS} FROM products WHERE id > ? ORDER BY id LIMIT ? OFFSET ?",
+            (after, limit, offset),
+        )
+
+    def by_brand(self, brand):
+        return self._query(
+            f"SELECT {self._COLUMNS} FROM products WHERE brand = ? ORDER BY id", (brand,)
+        )
+
+    def brands(self):
+        return [row["brand"] for row in self._query("SELECT DISTINCT brand FROM products ORDER BY brand")]
+
+    def price_range(self, min_price=None, max_price=None):
+        lo = min_price if min_price is not None else -(1 << 62)
+        hi = max_price if max_price is not None else 1 << 62
+        return self._query(
+            f"SELECT {self._COLUMNS} FROM products WHERE price BETWEEN ? AND ? ORDER BY price, id",
+            (lo, hi),
+        )
+
+    @staticmethod
+    def _filter_clause(brands=(), min_price=None, max_price=None):
+        conditions, params = [], []
+        if brands:
+            conditions.append(f"brand IN ({', '.join('?' * len(brands))})")
+            params.extend(brands)
+        if min_price is not None:
+            conditions.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+        return conditions, params
+
+    def filter(self, brands=(), min_price=None, max_price=None, sort=SORT_ID, after=None, limit=20, offset=0):
+        """(brand, id) / (price, id) 인덱스를 타는 WHERE ... ORDER BY ... LIMIT 쿼리 한 번으로 처리합니다."""
+        brands = list(brands)
+        conditions, params = self._filter_clause(brands, min_price, max_price)
+        if sort == SORT_PRICE:
+            order = "price, id"
+            if after is not None:
+                conditions.append("(price, id) > (?, ?)")
+                params.extend(after)
+        else:
+            order = "id"
+            if after is not None:
+                conditions.append("id > ?")
+                params.append(after)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            f"SELECT {self._COLUMNS} FROM products{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+
+    def facet_counts(self, brands=(), min_price=None, max_price=None):
+        conditions, params = self._filter_clause((), min_price, max_price)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        counts = {
+            row["brand"]: row["count"]
+            for row in self._query(
+                f"SELECT brand, COUNT(*) AS count FROM products{where} GROUP BY brand ORDER BY brand", params
+            )
+        }
+        total = sum(count for brand, count in counts.items() if not brands or brand in brands)
+        return counts, total
+
+    def __iter__(self):
+        cursor = self._connect().execute(f"SELECT {self._COLUMNS} FROM products ORDER BY id")
+        for row in cursor:
+            yield dict(row)
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+class CachedCatalog(CatalogRepository):
+    """
+    워커별 read-through 캐시.
+    get / get_many 결과를 LRU에 보관하고, 원본 version이 바뀌면 캐시를 비웁니다.
+    version 확인은 매 요청이 아니라 check_interval초마다 한 번만 합니다.
+    """
+
+    def __init__(self, backend, maxsize=4096, check_interval=1.0):
+        self.backend = backend
+        self.check_interval = check_interval
+        self._cache = LRUCache(maxsize)
+        self._version = backend.version
+        self._checked_at = time.monotonic()
+
+    @property
+    def version(self):
+        self._check_version()
+        return self._version
+
+    @property
+    def updated_at(self):
+        return self.backend.updated_at
+
+    def _check_version(self):
+        """원본 version이 바뀌었으면 캐시를 비웁니다."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            version = self.backend.version
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+
+    def get(self, pid):
+        pid = coerce_pid(pid)
+        if pid is None:
+            return None
+        self._check_version()
+        product = self._cache.get(pid)
+        if product is None:
+            product = self.backend.get(pid)
+            if product is not None:
+                self._cache.set(pid, product)
+        return product
+
+    def get_many(self, ids):
+        self._check_version()
+        found = {}
+        missing = []
+        for pid in ids:
+            product = self._cache.get(pid)
+            if product is None:
+                missing.append(pid)
+            else:
+                found[pid] = product
+        if missing:
+            for pid, product in self.backend.get_many(missing).items():
+                self._cache.set(pid, product)
+                found[pid] = product
+        return found
+
+    def reload(self, products):
+        self.backend.reload(products)
+        self._cache.clear()
+        self._version = self.backend.version
+
+    def page(self, after=None, limit=20, offset=0):
+        return self.backend.page(after=after, limit=limit, offset=offset)
+
+    def by_brand(self, brand):
+        return self.backend.by_brand(brand)
+
+    def brands(self):
+        return self.backend.brands()
+
+    def price_range(self, min_price=None, max_price=None):
+        return self.backend.price_range(min_price, max_price)
+
+    def filter(self, **options):
+        return self.backend.filter(**options)
+
+    def facet_counts(self, brands=(), min_price=None, max_price=None):
+        return self.backend.facet_counts(brands, min_price, max_price)
+
+    def __iter__(self):
+        return iter(self.backend)
+
+    def __len__(self):
+        return len(self.backend)
+
+
+def open_catalog(seed_products, db_path=None, cache_size=4096):
+    """
+    설정에 맞는 카탈로그를 만듭니다.
+    - db_path가 없으면 seed_products로 메모리 카탈로그를 만듭니다.
+    - db_path가 있으면 SQLite 카탈로그를 열고(비어 있으면 seed_products로 채움)
+      read-through 캐시로 감싸서 반환합니다.
+    """
+    if not db_path:
+        return Catalog(seed_products)
+
+    store = SQLiteCatalog(db_path)
+    if len(store) == 0:
+        store.load(seed_products)
+    return CachedCatalog(store, maxsize=cache_size)
@@ -0,0 +1,112 @@
+"""
+앱 설정.
+
+create_app(config)은 다음 순서로 설정을 덮어씁니다.
+  1. Config 클래스 기본값
+  2. 같은 이름의 환경변수 (예: CATALOG_DB=/srv/shop/catalog.db, CATALOG_PAGE_SIZE=48)
+  3. create_app()에 넘긴 설정 클래스 또는 dict
+"""
+import os
+
+
+class Config:
+    SECRET_KEY = "dev-secret-key"
+    TESTING = False
+
+    # 저장소: 비어 있으면 프로세스 메모리, 값이 있으면 해당 SQLite 파일
+    # - CATALOG_DB가 비어 있으면 app.PRODUCTS로 메모리 인덱스(id / 브랜드 / 가격)를 만들고,
+    #   있으면 SQLite 카탈로그를 사용합니다 (비어 있으면 PRODUCTS로 채움)
+    CATALOG_DB = None
+    USER_DB = None
+    CART_STORE = None
+    CART_TTL = 31 * 24 * 60 * 60
+    CART_MAX_QUANTITY = 99
+    ORDER_DB = None
+    INVENTORY_DB = None
+
+    # 재고: 처음 보는 상품의 기본 재고, 장바구니 예약 유지 시간(초)
+    INVENTORY_DEFAULT_STOCK = 100
+    INVENTORY_HOLD_TTL = 15 * 60
+
+    # 주문 처리 파이프라인 (orders.OrderPipeline): 워커 프로세스당 스레드 수, 결제 스텁 지연(초)
+    ORDER_WORKERS = 2
+    ORDER_PAYMENT_DELAY = 0.0
+    # 큐에 넣은 주문의 임대 시간(초). 임대가 끝난 미완료 주문은 죽은 워커가 남긴 것으로 보고 다시 처리
+    # 살아 있는 워커는 ORDER_RECOVER_INTERVAL초마다 임대를 연장하고 임대가 끝난 주문을 찾음
+    ORDER_RECOVER_AFTER = 60.0
+    ORDER_RECOVER_INTERVAL = 15.0
+
+    # 메인 페이지 한 번에 보여줄 상품 수 (?limit= 으로 바꿀 수 있으나 MAX_PAGE_SIZE를 넘을 수 없음)
+    CATALOG_PAGE_SIZE = 24
+    CATALOG_MAX_PAGE_SIZE = 100
+    # SQLite 카탈로그 앞에 두는 워커별 read-through 캐시 크기
+    CATALOG_CACHE_SIZE = 4096
+    # 검색 결과 / 자동완성 최대 개수
+    SEARCH_RESULT_LIMIT = 48
+    SEARCH_SUGGEST_LIMIT = 8
+    # 상품 이미지 프록시 (/img/<pid>/<width>, images.py)
+    # - IMAGE_PROXY를 끄면 템플릿이 image_url을 그대로 씀
+    # - IMAGE_ORIGIN: 비우면 image_url, http(s) 주소면 그 서버, 디렉터리면 로컬 파일에서 원본을 가져옴
+    # - IMAGE_CACHE_DIR: 비우면 <instance 폴더>/image-cache
+    # - IMAGE_CACHE_MAX_BYTES: 캐시 디렉터리 크기 한도, 넘으면 오래 쓰지 않은 파일부터 지움 (0이면 제한 없음)
+    IMAGE_PROXY = True
+    IMAGE_ORIGIN = None
+    IMAGE_CACHE_DIR = None
+    IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    IMAGE_WIDTHS = (160, 320, 480, 640, 960)
+    # 정적 자산 빌드 결과 디렉터리 (assets.py build). 비우면 <static 폴더>/dist,
+    # manifest.json이 없으면 static/vendor에 커밋된 Bootstrap 사본을 사용
+    ASSET_BUILD_DIR = None
+    # 상품 카드 / 상세 HTML 조각 캐시 크기
+    FRAGMENT_CACHE_SIZE = 2048
+
+    # 비밀번호 해시 비용 (credentials.PasswordHasher)
+    PASSWORD_HASH_ALGORITHM = "scrypt"
+    PASSWORD_SCRYPT_N = 2 ** 14
+    PASSWORD_SCRYPT_R = 8
+    PASSWORD_SCRYPT_P = 1
+    PASSWORD_PBKDF2_ITERATIONS = 600_000
+    PASSWORD_HASH_WORKERS = 0  # 0이면 CPU 수
+    # 해시 풀 앞에서 기다릴 수 있는 요청 수. 넘으면 로그인 / 회원가입을 503으로 바로 거절
+    PASSWORD_HASH_MAX_PENDING = 64
+    # 검증에 성공한 (해시, 비밀번호)를 기억해 두는 캐시 (0이면 사용 안 함)
+    PASSWORD_VERIFY_CACHE_SIZE = 1024
+    PASSWORD_VERIFY_CACHE_TTL = 300.0
+
+    # (아이디, 클라이언트 주소)별 로그인 시도 제한
+    LOGIN_RATE_PER_MINUTE = 10.0
+    LOGIN_BURST = 10
+
+
+class TestingConfig(Config):
+    """테스트용: 모든 저장소를 메모리에 두고 해시 비용을 낮춥니다 (환경변수보다 우선)."""
+
+    TESTING = True
+    SECRET_KEY = "test-secret-key"
+    CATALOG_DB = None
+    USER_DB = None
+    CART_STORE = None
+    ORDER_DB = None
+    INVENTORY_DB = None
+    PASSWORD_SCRYPT_N = 2 ** 10
+    PASSWORD_PBKDF2_ITERATIONS = 1000
+
+
+def _convert(raw, default):
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, (int, float)):
+        return type(default)(raw)
+    if isinstance(default, tuple):
+        # 쉼표로 구분한 숫자 목록 (예: IMAGE_WIDTHS=320,640)
+        return tuple(int(value) for value in raw.split(",") if value.strip())
+    return raw or None
+
+
+def env_overrides(config_class=Config, environ=os.environ):
+    """config_class의 설정 중 환경변수로 지정된 값만, 기본값과 같은 타입으로 변환해 반환합니다."""
+    return {
+        key: _convert(environ[key], getattr(config_class, key))
+        for key in dir(config_class)
+        if key.isupper() and key in environ
+    }
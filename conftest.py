@@ -1,23 +1,50 @@
+import logging
 import os
+import threading
 import time
 import pytest
 
+from werkzeug.serving import make_server
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-# 💡 app.py에서 Flask 앱 인스턴스와 USERS 딕셔너리 가져오기
-from app import app, USERS 
+# 💡 테스트마다 독립된 Flask 앱 인스턴스를 만드는 팩토리와 테스트 설정
+from app import create_app, get_default_app
+from config import TestingConfig
+from serve import warm_up
+from tests.driver_resolver import DriverUnavailable, resolve_chromedriver
+
+log = logging.getLogger(__name__)
+CHROMEDRIVER_KEY = pytest.StashKey()
+
+# xdist 워커마다 따로 써야 하는 SQLite 저장소 설정 (환경변수로 지정한 경우)
+WORKER_LOCAL_STORES = ("CATALOG_DB", "USER_DB", "CART_STORE", "ORDER_DB", "INVENTORY_DB")
+
+
+def pytest_configure(config):
+    """
+    pytest-xdist 워커(gw0, gw1, ...)는 각자 자기 프로세스의 기본 app과 빈 포트의 live_server를 씁니다.
+    환경변수로 SQLite 파일 저장소를 지정했다면 워커 ID를 붙인 파일로 바꿔 워커끼리 공유하지 않게 합니다.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return
+    for key in WORKER_LOCAL_STORES:
+        path = os.environ.get(key)
+        if path:
+            stem, ext = os.path.splitext(path)
+            os.environ[key] = f"{stem}-{worker}{ext}"
+
 
 # Pytest 옵션 추가
 def pytest_addoption(parser):
     parser.addoption(
         "--base-url",
         action="store",
-        default="http://127.0.0.1:5000",
-        help="Target base URL"
+        default=None,
+        help="Target base URL (지정하지 않으면 테스트 프로세스 안에서 앱을 띄워 사용)"
     )
     parser.addoption(
         "--headless",
@@ -25,17 +52,89 @@ def pytest_addoption(parser):
         default=False,
         help="Run browser headless"
     )
+    parser.addoption(
+        "--chromedriver",
+        action="store",
+        default=None,
+        help="chromedriver 경로 (CHROMEDRIVER 환경변수보다 우선)"
+    )
+    parser.addoption(
+        "--driver-download",
+        action="store_true",
+        default=os.environ.get("CHROMEDRIVER_DOWNLOAD", "").lower() in ("1", "true", "yes", "on"),
+        help="로컬 / 캐시에 chromedriver가 없으면 네트워크로 받음 (CHROMEDRIVER_DOWNLOAD=1)"
+    )
+
+class LiveServer:
+    """
+    WSGI 앱을 테스트 프로세스의 백그라운드 스레드에서 실행하는 서버 (빈 포트를 OS가 골라 줌).
+    테스트 코드와 같은 프로세스라서 USERS 등 메모리 저장소를 그대로 공유합니다.
+    """
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.app = app
+        self._server = make_server(host, port, app, threaded=True)
+        self.host, self.port = host, self._server.server_port
+        self.url = f"http://{host}:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="live-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+        self.app.extensions["shop"].shutdown()
+
+
+@pytest.fixture(scope="session")
+def live_server():
+    """
+    기본 app(`from app import app, USERS`와 같은 인스턴스)을 띄운 서버.
+    템플릿 컴파일 / 카탈로그 / 검색 색인을 미리 만들어 두므로 첫 요청부터 바로 응답합니다.
+    """
+    server = LiveServer(warm_up(get_default_app())).start()
+    yield server
+    server.stop()
+
 
 # Base URL fixture
 @pytest.fixture(scope="session")
-def base_url(pytestconfig):
-    return pytestconfig.getoption("--base-url")
+def base_url(pytestconfig, request):
+    """--base-url을 주면 이미 떠 있는 서버를, 없으면 live_server를 사용합니다."""
+    url = pytestconfig.getoption("--base-url")
+    if url:
+        return url.rstrip("/")
+    return request.getfixturevalue("live_server").url
 
-# WebDriver fixture
 @pytest.fixture(scope="session")
-def browser(pytestconfig):
-    headless = pytestconfig.getoption("--headless")
+def chromedriver(pytestconfig):
+    """
+    chromedriver 경로 (tests/driver_resolver.py 순서로 찾음, 워커마다 한 번).
+    찾지 못하면 브라우저를 쓰는 테스트를 모두 skip합니다. 찾는 데 걸린 시간은 로그와 요약에 남깁니다.
+    """
+    try:
+        resolution = resolve_chromedriver(
+            explicit=pytestconfig.getoption("--chromedriver"),
+            allow_network=pytestconfig.getoption("--driver-download"),
+        )
+    except DriverUnavailable as exc:
+        pytest.skip(str(exc))
+    log.info(resolution.describe())
+    pytestconfig.stash[CHROMEDRIVER_KEY] = resolution
+    return resolution.path
+
 
+def pytest_terminal_summary(terminalreporter, config):
+    resolution = config.stash.get(CHROMEDRIVER_KEY, None)
+    if resolution is not None:
+        terminalreporter.write_line(resolution.describe())
+
+
+def make_driver(headless, driver_path):
+    """Chrome WebDriver를 하나 띄웁니다."""
     options = webdriver.ChromeOptions()
     if headless:
         options.add_argument("--headless=new")  # 최신 headless 모드
@@ -52,12 +151,88 @@ def browser(pytestconfig):
 
     options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
 
-    driver = webdriver.Chrome(
-        service=ChromeService(ChromeDriverManager().install()),
+    return webdriver.Chrome(
+        service=ChromeService(driver_path),
         options=options
     )
+
+
+class BrowserPool:
+    """
+    워커 프로세스 안에서 재사용하는 WebDriver 풀.
+    테스트가 끝나면 Chrome을 다시 띄우지 않고 쿠키 / storage만 지워서 다음 테스트에 넘겨줍니다.
+    초기화에 실패한(죽은) 브라우저는 버리고, 필요하면 새로 띄웁니다.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._idle = []
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        driver = self.factory()
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def release(self, driver):
+        try:
+            self.reset(driver)
+        except Exception:
+            self.discard(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    @staticmethod
+    def reset(driver):
+        # storage는 현재 origin 기준이므로 페이지를 떠나기 전에 지움
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def discard(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers, self._all, self._idle = self._all, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+@pytest.fixture(scope="session")
+def browser_pool(pytestconfig, chromedriver):
+    """
+    워커(xdist) 프로세스마다 하나씩 만들어지는 브라우저 풀.
+    세션이 끝날 때 띄운 브라우저를 모두 종료합니다.
+    """
+    headless = pytestconfig.getoption("--headless")
+    pool = BrowserPool(lambda: make_driver(headless, chromedriver))
+    yield pool
+    pool.close()
+
+
+# WebDriver fixture
+@pytest.fixture
+def browser(browser_pool):
+    """풀에서 빌린 브라우저. 테스트가 끝나면 쿠키 / storage를 지우고 풀에 돌려놓습니다."""
+    driver = browser_pool.acquire()
     yield driver
-    driver.quit()
+    browser_pool.release(driver)
 
 # WebDriverWait fixture
 @pytest.fixture
@@ -83,38 +258,35 @@ SELENIUM_TEST_PASSWORD = "password123"
 # ----------------------------------------------------
 
 @pytest.fixture
-def client():
+def app():
     """
-    모든 Flask Client 테스트를 위한 표준 클라이언트 Fixture.
-    테스트 시작 전 app.USERS를 백업하고, 종료 후 복원하여 테스트 간 격리를 보장합니다.
+    테스트마다 새로 만드는 Flask 앱 인스턴스 (TestingConfig: 메모리 저장소, 낮은 해시 비용).
+    사용자 / 장바구니 저장소가 인스턴스마다 따로 있어서, 다른 테스트와 USERS를 공유하지 않고
+    백업 / 복원 없이도 격리되며 병렬로 실행해도 서로 영향을 주지 않습니다.
+    테스트가 끝나면 주문 처리 워커와 비밀번호 해시 스레드 풀을 정리합니다.
     """
-    app.config['TESTING'] = True
-    app.config['SECRET_KEY'] = 'test-secret-key' # 세션 관리를 위해 필요
-    
-    # 💡 USERS 딕셔너리 백업
-    original_users = USERS.copy() 
+    app = create_app(TestingConfig)
+    yield app
+    app.extensions["shop"].shutdown()
 
+@pytest.fixture
+def client(app):
+    """
+    모든 Flask Client 테스트를 위한 표준 클라이언트 Fixture.
+    """
     with app.test_client() as client:
-        # 테스트 전 Flask 세션을 깨끗하게 시작합니다.
-        with client.session_transaction() as sess:
-            sess.clear() 
         yield client
-
-    # 💡 Teardown: USERS 딕셔너리 복원
-    USERS.clear()
-    USERS.update(original_users)
     
 
 @pytest.fixture
-def login_test_env(client):
+def login_test_env(app, client):
     """
     로그인 관련 테스트에 필요한 환경 및 데이터를 제공합니다.
-    (client Fixture의 USERS 백업/복원 기능에 의존)
+    (사용자는 이 테스트의 앱 인스턴스 저장소에만 등록됩니다)
     """
     test_username = "fixture_user_id"
     test_password = "fixture_password_123"
     
-    # client Fixture에 의해 USERS가 복원되므로, 여기에 사용자 등록
-    USERS[test_username] = {"password": test_password} 
+    app.extensions["shop"].users.add(test_username, {"password": test_password})
     
     return client, test_username, test_password
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+비밀번호 해시 / 검증.
+
+- 저장 형식: "scrypt$n$r$p$salt$hash" 또는 "pbkdf2_sha256$iterations$salt$hash" (salt/hash는 base64)
+- 비용 파라미터는 앱 설정으로 조정합니다 (PASSWORD_HASH_ALGORITHM, PASSWORD_SCRYPT_N,
+  PASSWORD_PBKDF2_ITERATIONS, PASSWORD_HASH_WORKERS; config.py 참고).
+- 해시 계산은 전용 스레드 풀에서 실행합니다. hashlib의 scrypt / pbkdf2는 계산 중 GIL을
+  놓기 때문에 여러 요청의 해시가 CPU 코어 수만큼 병렬로 돌고, 코어 수를 넘는 요청은
+  CPU를 나눠 쓰는 대신 풀 앞에서 순서를 기다립니다.
+  WSGI 요청은 동기식이라 요청 스레드는 결과를 받을 때까지 기다려야 하므로, 기다리는 요청이
+  max_pending개를 넘으면 HasherBusy로 바로 거절해 요청 스레드가 해시 대기열에 묶이지 않게 합니다.
+- 검증 캐시: 검증에 성공한 (저장된 해시, 비밀번호) 쌍을 프로세스 비밀 키의 HMAC으로만 기억해 두고
+  cache_ttl초 안에 같은 쌍이 다시 오면 해시 계산을 건너뜁니다. 실패한 시도는 캐시하지 않으며,
+  비밀번호를 바꾸면 저장된 해시가 바뀌므로 예전 항목은 더 이상 맞지 않습니다.
+- VerificationLimiter는 (아이디, 클라이언트 주소)별 검증 횟수를 토큰 버킷으로 제한합니다.
+  아이디만으로 제한하면 누구나 틀린 비밀번호를 보내 다른 사용자를 잠글 수 있기 때문입니다.
+  한 주소에서 여러 아이디로 시도하는 CPU 소모는 max_pending으로 막습니다.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+SCRYPT = "scrypt"
+PBKDF2 = "pbkdf2_sha256"
+
+DEFAULT_SCRYPT_N = 2 ** 14
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 300.0
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    # 필요한 메모리(128 * r * n 바이트)보다 여유 있게 maxmem 지정
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * n + 1024 * 1024, dklen=32)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password, algorithm=SCRYPT, scrypt_n=DEFAULT_SCRYPT_N, scrypt_r=DEFAULT_SCRYPT_R,
+                  scrypt_p=DEFAULT_SCRYPT_P, pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS):
+    """새 salt로 비밀번호를 해시해 저장 형식 문자열로 반환합니다."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    if algorithm == SCRYPT:
+        digest = _scrypt(password, salt, scrypt_n, scrypt_r, scrypt_p)
+        return f"{SCRYPT}${scrypt_n}${scrypt_r}${scrypt_p}${_b64encode(salt)}${_b64encode(digest)}"
+    if algorithm == PBKDF2:
+        digest = _pbkdf2(password, salt, pbkdf2_iterations)
+        return f"{PBKDF2}${pbkdf2_iterations}${_b64encode(salt)}${_b64encode(digest)}"
+    raise ValueError(f"지원하지 않는 해시 알고리즘: {algorithm}")
+
+
+def verify_password(password, encoded):
+    """저장된 해시와 비밀번호가 일치하는지 상수 시간 비교로 확인합니다."""
+    try:
+        algorithm, *fields = encoded.split("$")
+        if algorithm == SCRYPT:
+            n, r, p, salt, expected = fields
+            digest = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+        elif algorithm == PBKDF2:
+            iterations, salt, expected = fields
+            digest = _pbkdf2(password, _b64decode(salt), int(iterations))
+        else:
+            return False
+    except (ValueError, AttributeError):
+        return False
+    return hmac.compare_digest(digest, _b64decode(expected))
+
+
+class HasherBusy(Exception):
+    """해시 풀 앞에 기다리는 요청이 너무 많아 바로 거절할 때 발생합니다."""
+
+
+class PasswordHasher:
+    """비용 파라미터, 해시 전용 스레드 풀, 검증 캐시를 묶은 객체."""
+
+    def __init__(self, algorithm=SCRYPT, scrypt_n=DEFAULT_SCRYPT_N, scrypt_r=DEFAULT_SCRYPT_R,
+                 scrypt_p=DEFAULT_SCRYPT_P, pbkdf2_iterations=DEFAULT_PBKDF2_ITERATIONS, workers=None,
+                 max_pending=None, cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL,
+                 clock=time.monotonic):
+        self.params = {
+            "algorithm": algorithm,
+            "scrypt_n": scrypt_n,
+            "scrypt_r": scrypt_r,
+            "scrypt_p": scrypt_p,
+            "pbkdf2_iterations": pbkdf2_iterations,
+        }
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # 실행 중 + 대기 중인 해시 작업 수 제한 (None이면 제한 없음)
+        self._slots = None if max_pending is None else threading.BoundedSemaphore(self.workers + max_pending)
+        # 존재하지 않는 아이디도 같은 시간이 걸리도록 검증에 쓰는 더미 해시
+        self._dummy_hash = None
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._cache = OrderedDict()  # HMAC(비밀 키, 해시 + 비밀번호) -> 만료 시각
+        self._cache_lock = threading.Lock()
+        self._cache_secret = secrets.token_bytes(32)
+
+    @classmethod
+    def from_config(cls, config):
+        """app.config(또는 같은 키를 가진 매핑)의 PASSWORD_* 설정으로 만듭니다."""
+        return cls(
+            algorithm=config.get("PASSWORD_HASH_ALGORITHM", SCRYPT),
+            scrypt_n=int(config.get("PASSWORD_SCRYPT_N", DEFAULT_SCRYPT_N)),
+            scrypt_r=int(config.get("PASSWORD_SCRYPT_R", DEFAULT_SCRYPT_R)),
+            scrypt_p=int(config.get("PASSWORD_SCRYPT_P", DEFAULT_SCRYPT_P)),
+            pbkdf2_iterations=int(config.get("PASSWORD_PBKDF2_ITERATIONS", DEFAULT_PBKDF2_ITERATIONS)),
+            workers=int(config.get("PASSWORD_HASH_WORKERS", 0)) or None,
+            max_pending=config.get("PASSWORD_HASH_MAX_PENDING"),
+            cache_size=int(config.get("PASSWORD_VERIFY_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+            cache_ttl=float(config.get("PASSWORD_VERIFY_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        )
+
+    def _executor(self):
+        # fork된 워커 프로세스마다 자기 풀을 갖도록 처음 사용할 때 만듭니다.
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._pool
+
+    def _run(self, func, *args, **kwargs):
+        """풀에서 func를 실행하고 결과를 기다립니다. 대기 한도를 넘으면 기다리지 않고 HasherBusy."""
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            raise HasherBusy("비밀번호 확인 요청이 밀려 있습니다.")
+        try:
+            return self._executor().submit(func, *args, **kwargs).result()
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password, **self.params)
+
+    def verify(self, password, encoded):
+        if encoded is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = hash_password(secrets.token_hex(8), **self.params)
+            self._run(verify_password, password, self._dummy_hash)
+            return False
+        key = self._cache_key(password, encoded)
+        if self._cached(key):
+            return True
+        ok = self._run(verify_password, password, encoded)
+        if ok:
+            self._remember(key)
+        return ok
+
+    # ---- 검증 캐시 ----
+
+    def _cache_key(self, password, encoded):
+        return hmac.new(self._cache_secret, f"{encoded}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+
+    def _cached(self, key):
+        if not self.cache_size:
+            return False
+        with self._cache_lock:
+            expires_at = self._cache.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= self._clock():
+                del self._cache[key]
+                return False
+            self._cache.move_to_end(key)
+            return True
+
+    def _remember(self, key):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = self._clock() + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def needs_rehash(self, encoded):
+        """저장된 해시가 현재 알고리즘/비용 설정과 다르면 True."""
+        params = self.params
+        if params["algorithm"] == SCRYPT:
+            expected = f"{SCRYPT}${params['scrypt_n']}${params['scrypt_r']}${params['scrypt_p']}$"
+        else:
+            expected = f"{PBKDF2}${params['pbkdf2_iterations']}$"
+        return not encoded.startswith(expected)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+class VerificationLimiter:
+    """
+    키(로그인에서는 (아이디, 클라이언트 주소))별 토큰 버킷. burst회까지 바로 허용하고, 이후 초당 rate회씩 회복합니다.
+    키 테이블은 max_keys개로 제한하며 가장 오래 쓰지 않은 키부터 버립니다.
+    """
+
+    def __init__(self, rate=10 / 60, burst=10, max_keys=10_000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # key -> (남은 토큰, 마지막 갱신 시각)
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
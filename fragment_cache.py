@@ -0,0 +1,34 @@
+"""
+상품 카드 / 상품 상세 HTML 조각 캐시.
+
+- 조각은 (템플릿, 상품 ID, 카탈로그 version, 장바구니 포함 여부)로 캐시합니다.
+  사용자마다 달라지는 부분은 카트 버튼 하나뿐이라 상품당 변형은 2개면 충분합니다.
+- 내비게이션 바(사용자 이름, 카트 개수)와 플래시 메시지는 base.html에서 매 요청 렌더링합니다.
+- 카탈로그가 바뀌면 version이 달라져 이전 조각은 자연히 사용되지 않고 LRU로 밀려납니다.
+"""
+from markupsafe import Markup
+
+from cache import LRUCache
+
+
+class FragmentCache:
+    def __init__(self, jinja_env, maxsize=2048):
+        self.jinja_env = jinja_env
+        self._cache = LRUCache(maxsize)
+
+    def render(self, template_name, product, in_cart, version):
+        in_cart = bool(in_cart)
+        key = (template_name, product["id"], version, in_cart)
+        html = self._cache.get(key)
+        if html is None:
+            template = self.jinja_env.get_template(template_name)
+            html = Markup(template.render(product=product, in_cart=in_cart))
+            self._cache.set(key, html)
+        return html
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def stats(self):
+        return {"hits": self._cache.hits, "misses": self._cache.misses, "size": len(self._cache)}
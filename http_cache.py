@@ -0,0 +1,91 @@
+"""
+카탈로그 페이지용 조건부 GET (ETag / Last-Modified / 304) 도우미.
+
+- ETag는 카탈로그 version, 템플릿 버전, 요청 URL, 그리고 화면에 보이는 세션 상태
+  (로그인 사용자, 장바구니 내용)로 만든 강한 ETag입니다.
+- 플래시 메시지가 남아 있는 요청은 본문을 반드시 렌더링해야 하므로 304를 쓰지 않습니다.
+- Last-Modified / If-Modified-Since는 세션에 따라 달라지지 않는 비로그인 응답에만 사용합니다.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import Response, request, session
+from werkzeug.http import is_resource_modified
+
+# 비로그인 응답은 공용 캐시에 잠깐 둘 수 있고, 로그인 응답은 매번 재검증합니다.
+ANONYMOUS_CACHE_CONTROL = "public, max-age=60"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+NO_STORE_CACHE_CONTROL = "no-store"
+
+
+def templates_version(template_dir):
+    """템플릿 내용 해시와 마지막 수정 시각을 계산합니다 (앱 시작 시 한 번)."""
+    digest = hashlib.sha1()
+    latest = 0.0
+    for name in sorted(os.listdir(template_dir)):
+        path = os.path.join(template_dir, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                digest.update(name.encode("utf-8"))
+                digest.update(f.read())
+            latest = max(latest, os.path.getmtime(path))
+    return digest.hexdigest()[:12], latest
+
+
+def has_pending_flashes():
+    return bool(session.get("_flashes"))
+
+
+def page_etag(catalog_version, *parts):
+    """
+    현재 요청의 강한 ETag를 계산합니다.
+    플래시 메시지가 남아 있으면 None을 반환합니다 (조건부 응답 대상 아님).
+    """
+    if has_pending_flashes():
+        return None
+    cart = session.get("cart", {})
+    state = (
+        catalog_version,
+        request.full_path,
+        session.get("user_id"),
+        sorted(cart.items()),
+        parts,
+    )
+    return hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
+
+
+def last_modified_at(*timestamps):
+    """로그인하지 않은 요청에만 Last-Modified 시각을 반환합니다."""
+    if session.get("user_id") or not any(timestamps):
+        return None
+    return datetime.fromtimestamp(int(max(t or 0 for t in timestamps)), tz=timezone.utc)
+
+
+def is_not_modified(etag, last_modified=None):
+    """If-None-Match(우선) / If-Modified-Since 기준으로 클라이언트 캐시가 유효한지 판단합니다."""
+    if etag is None:
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def cache_control_for(etag):
+    if etag is None:
+        return NO_STORE_CACHE_CONTROL
+    if session.get("user_id"):
+        return PRIVATE_CACHE_CONTROL
+    return ANONYMOUS_CACHE_CONTROL
+
+
+def apply_cache_headers(response, etag, last_modified=None):
+    response.headers["Cache-Control"] = cache_control_for(etag)
+    if etag is not None:
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """본문 없이 304 응답을 만듭니다 (템플릿 렌더링 생략)."""
+    return apply_cache_headers(Response(status=304), etag, last_modified)
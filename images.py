@@ -0,0 +1,262 @@
+"""
+상품 이미지 프록시 / 썸네일 캐시.
+
+- /img/<pid>/<width> 요청이 오면 원본 이미지를 한 번만 가져와 디스크에 보관하고,
+  허용된 너비(IMAGE_WIDTHS)로 줄인 사본을 만들어 둡니다.
+- 원본을 가져오는 곳(IMAGE_ORIGIN)
+    비어 있음             : 상품의 image_url 그대로 (HTTP)
+    http(s)://host[/path] : image_url의 경로와 쿼리를 이 주소 아래에서 가져옴 (로컬 대체 서버 등)
+    그 외(디렉터리 경로)  : 해당 디렉터리에서 image_url의 파일 이름(없으면 <pid>.jpg)을 읽음 (오프라인)
+- 저장은 content-addressed: 파일 이름이 내용의 SHA-256이라 같은 이미지는 한 번만 저장되고,
+  이미 만든 파일은 바뀌지 않으므로 ETag / immutable 캐시에 그대로 쓸 수 있습니다.
+  (image_url, 너비) → 내용 해시 매핑은 refs/ 아래 작은 파일로 둡니다.
+- Pillow가 설치되어 있지 않으면 줄이지 않고 원본을 모든 너비에 사용합니다.
+  Pillow의 픽셀 수 제한을 넘는 원본(decompression bomb)은 변환하지 않고 ImageUnavailable로 처리합니다.
+- 캐시 크기는 max_bytes(IMAGE_CACHE_MAX_BYTES)로 제한합니다. 새로 쓴 양이 한도의 1/10을 넘을 때마다
+  objects/를 훑어, 한도를 넘었으면 가장 오래 쓰지 않은 파일부터 한도의 90%까지 지웁니다.
+  (캐시에서 꺼낼 때 수정 시각을 TOUCH_INTERVAL마다 갱신해 최근 사용 시각으로 씁니다.)
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from io import BytesIO
+
+try:
+    from PIL import Image
+    DecompressionBombError = Image.DecompressionBombError
+except ImportError:  # Pillow는 선택 의존성
+    Image = None
+    DecompressionBombError = ()
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 320, 480, 640, 960)
+MAX_ORIGINAL_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = 10
+JPEG_QUALITY = 82
+# 캐시 적중 시 수정 시각(최근 사용 시각)을 갱신하는 최소 간격(초)
+TOUCH_INTERVAL = 60 * 60
+
+ORIGINAL = "orig"
+
+
+class ImageUnavailable(Exception):
+    """원본 이미지를 가져오지 못했을 때 발생합니다."""
+
+
+def image_token(image_url):
+    """이미지 URL의 짧은 해시. 프록시 URL의 ?v= 값으로 써서 원본이 바뀌면 URL도 바뀌게 합니다."""
+    return hashlib.sha256((image_url or "").encode("utf-8")).hexdigest()[:12]
+
+
+def sniff_content_type(data):
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:4] == b"GIF8":
+        return "image/gif"
+    return "application/octet-stream"
+
+
+class ImageCache:
+    """디스크 기반 content-addressed 이미지 캐시 (여러 워커 프로세스가 같은 디렉터리를 공유해도 안전)."""
+
+    def __init__(self, cache_dir, origin=None, widths=DEFAULT_WIDTHS, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.origin = origin
+        self.widths = tuple(sorted(widths))
+        self.max_bytes = max_bytes or None
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._written = 0
+        self._prune_lock = threading.Lock()
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "refs"), exist_ok=True)
+
+    # ---- 저장소 ----
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    def _ref_path(self, image_url, variant):
+        key = hashlib.sha256(f"{image_url}|{variant}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "refs", key[:2], key)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        # 같은 디렉터리에 임시 파일로 쓴 뒤 rename해서, 읽는 쪽이 쓰다 만 파일을 보지 않게 함
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _store(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            self._write_atomic(path, data)
+            self._written += len(data)
+            if self.max_bytes and self._written >= self.max_bytes // 10:
+                self.prune()
+        return digest
+
+    def _lookup(self, image_url, variant):
+        try:
+            with open(self._ref_path(image_url, variant), encoding="ascii") as f:
+                digest = f.read().strip()
+            path = self.object_path(digest)
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        if self.max_bytes and time.time() - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+        return digest
+
+    def prune(self):
+        """
+        objects/ 합계가 max_bytes를 넘으면 수정 시각이 오래된 파일부터 90%까지 지우고 지운 바이트 수를 반환합니다.
+        지워진 파일을 가리키는 refs/는 _lookup에서 없는 것으로 보므로 다음 요청 때 다시 만듭니다.
+        """
+        if not self.max_bytes or not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._written = 0
+            entries = []
+            objects_dir = os.path.join(self.cache_dir, "objects")
+            for root, _, names in os.walk(objects_dir):
+                for name in names:
+                    if name.startswith(".tmp-"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            target = total - self.max_bytes * 9 // 10
+            for _, size, path in sorted(entries):
+                if removed >= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                removed += size
+            log.info("이미지 캐시 정리: %d바이트 삭제", removed)
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    # ---- 원본 가져오기 / 크기 변환 ----
+
+    def source_for(self, pid, image_url):
+        """IMAGE_ORIGIN 설정에 따라 원본을 가져올 URL 또는 파일 경로를 정합니다."""
+        if not self.origin:
+            return image_url
+        parsed = urllib.parse.urlsplit(image_url or "")
+        if self.origin.startswith(("http://", "https://")):
+            base = self.origin.rstrip("/")
+            return base + parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        name = os.path.basename(parsed.path) or f"{pid}.jpg"
+        return os.path.join(self.origin, name)
+
+    def fetch(self, source):
+        if not source:
+            raise ImageUnavailable("이미지 주소가 없습니다.")
+        try:
+            if source.startswith(("http://", "https://")):
+                request = urllib.request.Request(source, headers={"User-Agent": "resona-cat-shop-image-proxy"})
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                    data = response.read(MAX_ORIGINAL_BYTES + 1)
+            else:
+                with open(source, "rb") as f:
+                    data = f.read(MAX_ORIGINAL_BYTES + 1)
+        except (OSError, ValueError) as exc:
+            raise ImageUnavailable(str(exc)) from exc
+        if len(data) > MAX_ORIGINAL_BYTES:
+            raise ImageUnavailable("원본 이미지가 너무 큽니다.")
+        return data
+
+    @staticmethod
+    def resize(data, width):
+        """너비를 width 이하로 줄인 이미지 바이트. 이미 작거나 Pillow가 없으면 원본 그대로."""
+        if Image is None:
+            return data
+        with Image.open(BytesIO(data)) as image:
+            if image.width <= width:
+                return data
+            height = max(1, round(image.height * width / image.width))
+            image_format = image.format if image.format in ("JPEG", "PNG", "WEBP") else "JPEG"
+            resized = image.resize((width, height), Image.LANCZOS)
+            if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+            out = BytesIO()
+            options = {"quality": JPEG_QUALITY, "optimize": True} if image_format in ("JPEG", "WEBP") else {}
+            resized.save(out, format=image_format, **options)
+            return out.getvalue()
+
+    def nearest_width(self, width):
+        """요청한 너비 이상인 가장 작은 허용 너비 (모두 작으면 가장 큰 너비)."""
+        for allowed in self.widths:
+            if allowed >= width:
+                return allowed
+        return self.widths[-1]
+
+    def get(self, pid, image_url, width):
+        """
+        (내용 해시, 파일 경로)를 반환합니다. 처음 요청이면 원본을 가져와 변환 / 저장합니다.
+        같은 이미지를 동시에 요청해도 프로세스 안에서는 한 번만 가져옵니다.
+        """
+        variant = f"w{width}"
+        digest = self._lookup(image_url, variant)
+        if digest is None:
+            with self._lock((image_url, variant)):
+                digest = self._lookup(image_url, variant)
+                if digest is None:
+                    digest = self._build(pid, image_url, width)
+        return digest, self.object_path(digest)
+
+    def _build(self, pid, image_url, width):
+        with self._lock((image_url, ORIGINAL)):
+            original = self._lookup(image_url, ORIGINAL)
+            if original is None:
+                original = self._store(self.fetch(self.source_for(pid, image_url)))
+                self._write_atomic(self._ref_path(image_url, ORIGINAL), original.encode("ascii"))
+        with open(self.object_path(original), "rb") as f:
+            data = f.read()
+        try:
+            digest = self._store(self.resize(data, width))
+        except OSError:
+            # Pillow가 읽지 못하는 형식이면 원본을 그대로 사용
+            log.warning("이미지 변환 실패: %s", image_url)
+            digest = original
+        except DecompressionBombError as exc:
+            # 픽셀 수가 너무 많은 원본은 브라우저에도 보내지 않음 (라우트가 원래 image_url로 보냄)
+            raise ImageUnavailable(str(exc)) from exc
+        self._write_atomic(self._ref_path(image_url, f"w{width}"), digest.encode("ascii"))
+        return digest
@@ -0,0 +1,340 @@
+"""
+상품 재고와 장바구니 예약.
+
+- 재고(stock)는 아직 팔리지 않은 수량이고, 그중 장바구니에 담긴 만큼은 예약(reserved)으로 잡아 둡니다.
+  예약 가능한 수량 = stock - reserved (자기 자신의 기존 예약은 다시 쓸 수 있음)
+- 예약은 (holder, 상품 ID)마다 하나이며 TTL이 지나면 sweeper가 풀어 줍니다.
+  holder는 보통 로그인한 사용자 ID입니다.
+- consume()은 결제 시 holder의 예약을 판매로 바꿉니다 (여러 상품을 한꺼번에, 전부 또는 전혀).
+- 처음 보는 상품은 default_stock 개의 재고로 시작합니다.
+- INVENTORY_DB 설정이 없으면 프로세스 메모리(상품별 striped lock),
+  있으면 SQLite 파일(version 컬럼 compare-and-swap, 여러 워커 프로세스 공유)에 저장합니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STOCK = 100
+DEFAULT_HOLD_TTL = 15 * 60
+DEFAULT_SWEEP_INTERVAL = 60
+
+
+class InventoryConflict(Exception):
+    """CAS 재시도를 계속 실패했을 때 발생합니다 (같은 상품에 쓰기가 극단적으로 몰린 경우)."""
+
+
+class _Stock:
+    __slots__ = ("stock", "reserved", "holds")
+
+    def __init__(self, stock):
+        self.stock = stock
+        self.reserved = 0
+        self.holds = {}  # holder -> (수량, 만료 시각)
+
+
+class MemoryInventory:
+    """
+    프로세스 메모리 재고. 상품 ID로 고른 lock stripe 하나만 잡으므로,
+    서로 다른 상품의 예약은 대부분 서로 기다리지 않습니다.
+    """
+
+    def __init__(self, default_stock=DEFAULT_STOCK, ttl=DEFAULT_HOLD_TTL, stripes=64, clock=time.monotonic):
+        self.default_stock = default_stock
+        self.ttl = ttl
+        self._clock = clock
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._products = {}
+
+    def _lock(self, pid):
+        return self._stripes[pid % len(self._stripes)]
+
+    def _entry(self, pid, now):
+        # stripe lock을 잡은 상태에서 호출. 만료된 예약은 여기서 바로 정리합니다.
+        entry = self._products.get(pid)
+        if entry is None:
+            entry = self._products.setdefault(pid, _Stock(self.default_stock))
+        expired = [holder for holder, (_, expires_at) in entry.holds.items() if expires_at <= now]
+        for holder in expired:
+            entry.reserved -= entry.holds.pop(holder)[0]
+        return entry
+
+    def reserve(self, holder, pid, quantity=1):
+        """holder의 pid 예약을 quantity개로 맞춥니다. 재고가 모자라면 False (기존 예약은 유지)."""
+        if quantity <= 0:
+            self.release(holder, pid)
+            return True
+        now = self._clock()
+        with self._lock(pid):
+            entry = self._entry(pid, now)
+            held = entry.holds.get(holder, (0, 0))[0]
+            if entry.stock - entry.reserved + held < quantity:
+                return False
+            entry.reserved += quantity - held
+            entry.holds[holder] = (quantity, now + self.ttl)
+            return True
+
+    def release(self, holder, pid):
+        with self._lock(pid):
+            entry = self._entry(pid, self._clock())
+            held = entry.holds.pop(holder, None)
+            if held is not None:
+                entry.reserved -= held[0]
+
+    def consume(self, holder, items):
+        """
+        holder의 예약을 판매로 바꿉니다. items: {상품 ID: 수량}
+        예약이 없거나 만료됐으면 남은 재고에서 바로 가져옵니다.
+        하나라도 모자라면 아무것도 바꾸지 않고 모자란 상품 ID 목록을 반환합니다 (성공하면 빈 목록).
+        """
+        now = self._clock()
+        # 여러 stripe는 항상 같은 순서로 잡아 교착을 막음
+        locks = [self._stripes[i] for i in sorted({pid % len(self._stripes) for pid in items})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            entries = {pid: self._entry(pid, now) for pid in items}
+            short = [
+                pid for pid, quantity in items.items()
+                if entries[pid].stock - entries[pid].reserved + entries[pid].holds.get(holder, (0, 0))[0] < quantity
+            ]
+            if short:
+                return short
+            for pid, quantity in items.items():
+                entry = entries[pid]
+                held = entry.holds.pop(holder, (0, 0))[0]
+                entry.reserved -= held
+                entry.stock -= quantity
+            return []
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def restock(self, items):
+        """판매를 취소해 재고를 되돌립니다 (주문 처리 실패 시)."""
+        for pid, quantity in items.items():
+            with self._lock(pid):
+                self._entry(pid, self._clock()).stock += quantity
+
+    def set_stock(self, pid, stock):
+        with self._lock(pid):
+            self._entry(pid, self._clock()).stock = stock
+
+    def stock(self, pid):
+        with self._lock(pid):
+            entry = self._entry(pid, self._clock())
+            return entry.stock, entry.reserved
+
+    def available(self, pid):
+        stock, reserved = self.stock(pid)
+        return stock - reserved
+
+    def sweep(self):
+        """만료된 예약을 모두 풉니다."""
+        now = self._clock()
+        for pid in list(self._products):
+            with self._lock(pid):
+                self._entry(pid, now)
+
+
+class SQLiteInventory:
+    """
+    SQLite 재고. 잠금 대신 version 컬럼으로 compare-and-swap 합니다.
+      1. 트랜잭션 밖에서 (stock, reserved, version)과 자기 예약을 읽고 가능 여부를 계산
+      2. UPDATE ... WHERE version = <읽은 값> 으로 쓰고, 바뀐 행이 없으면(다른 요청이 먼저 씀) 다시 시도
+    예약을 바꾸는 모든 쓰기가 version을 올리므로, version이 같으면 1에서 읽은 예약도 그대로입니다.
+    """
+
+    MAX_RETRIES = 200
+
+    def __init__(self, path, default_stock=DEFAULT_STOCK, ttl=DEFAULT_HOLD_TTL,
+                 sweep_interval=DEFAULT_SWEEP_INTERVAL, clock=time.time):
+        self.path = path
+        self.default_stock = default_stock
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._next_sweep = 0
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS inventory ("
+            " product_id INTEGER PRIMARY KEY,"
+            " stock INTEGER NOT NULL,"
+            " reserved INTEGER NOT NULL DEFAULT 0,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS inventory_holds ("
+            " holder TEXT NOT NULL,"
+            " product_id INTEGER NOT NULL,"
+            " quantity INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (holder, product_id))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS inventory_holds_expires ON inventory_holds (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # 트랜잭션 경계를 직접 관리하기 위해 autocommit 모드로 연결
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, conn, holder, pid):
+        row = conn.execute(
+            "SELECT stock, reserved, version FROM inventory WHERE product_id = ?", (pid,)
+        ).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT OR IGNORE INTO inventory (product_id, stock) VALUES (?, ?)", (pid, self.default_stock)
+            )
+            row = conn.execute(
+                "SELECT stock, reserved, version FROM inventory WHERE product_id = ?", (pid,)
+            ).fetchone()
+        hold = conn.execute(
+            "SELECT quantity, expires_at FROM inventory_holds WHERE holder = ? AND product_id = ?", (holder, pid)
+        ).fetchone() if holder is not None else None
+        return row, hold
+
+    def _swap(self, conn, changes):
+        """
+        changes: [(pid, version, stock 변화량, reserved 변화량, 예약 쓰기 함수 또는 None)]
+        모두 version이 그대로일 때만 한 트랜잭션으로 반영하고 True, 아니면 롤백하고 False.
+        """
+        conn.execute("BEGIN")
+        try:
+            for pid, version, stock_delta, reserved_delta, write_hold in changes:
+                updated = conn.execute(
+                    "UPDATE inventory SET stock = stock + ?, reserved = reserved + ?, version = version + 1"
+                    " WHERE product_id = ? AND version = ?",
+                    (stock_delta, reserved_delta, pid, version),
+                ).rowcount
+                if not updated:
+                    conn.execute("ROLLBACK")
+                    return False
+                if write_hold is not None:
+                    write_hold()
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _retry(self, attempt):
+        for _ in range(self.MAX_RETRIES):
+            result = attempt()
+            if result is not None:
+                return result
+        raise InventoryConflict("재고 갱신이 계속 충돌합니다.")
+
+    def reserve(self, holder, pid, quantity=1):
+        if quantity <= 0:
+            self.release(holder, pid)
+            return True
+        self.maybe_sweep()
+        conn = self._connect()
+
+        def attempt():
+            (stock, reserved, version), hold = self._read(conn, holder, pid)
+            held = hold[0] if hold else 0
+            if stock - reserved + held < quantity:
+                return False
+
+            def write_hold():
+                conn.execute(
+                    "INSERT INTO inventory_holds (holder, product_id, quantity, expires_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (holder, product_id)"
+                    " DO UPDATE SET quantity = excluded.quantity, expires_at = excluded.expires_at",
+                    (holder, pid, quantity, self._clock() + self.ttl),
+                )
+            return True if self._swap(conn, [(pid, version, 0, quantity - held, write_hold)]) else None
+
+        return self._retry(attempt)
+
+    def _release(self, holder, pid, expired_before=None):
+        conn = self._connect()
+
+        def attempt():
+            (_, _, version), hold = self._read(conn, holder, pid)
+            if hold is None or (expired_before is not None and hold[1] > expired_before):
+                return True
+
+            def delete_hold():
+                conn.execute("DELETE FROM inventory_holds WHERE holder = ? AND product_id = ?", (holder, pid))
+            return True if self._swap(conn, [(pid, version, 0, -hold[0], delete_hold)]) else None
+
+        self._retry(attempt)
+
+    def release(self, holder, pid):
+        self._release(holder, pid)
+
+    def consume(self, holder, items):
+        conn = self._connect()
+
+        def attempt():
+            changes = []
+            short = []
+            for pid, quantity in items.items():
+                (stock, reserved, version), hold = self._read(conn, holder, pid)
+                held = hold[0] if hold else 0
+                if stock - reserved + held < quantity:
+                    short.append(pid)
+                    continue
+
+                def delete_hold(pid=pid):
+                    conn.execute("DELETE FROM inventory_holds WHERE holder = ? AND product_id = ?", (holder, pid))
+                changes.append((pid, version, -quantity, -held, delete_hold))
+            if short:
+                return short
+            return [] if self._swap(conn, changes) else None
+
+        return self._retry(attempt)
+
+    def restock(self, items):
+        conn = self._connect()
+        for pid, quantity in items.items():
+            def attempt(pid=pid, quantity=quantity):
+                (_, _, version), _ = self._read(conn, None, pid)
+                return True if self._swap(conn, [(pid, version, quantity, 0, None)]) else None
+            self._retry(attempt)
+
+    def set_stock(self, pid, stock):
+        conn = self._connect()
+        self._read(conn, None, pid)
+        conn.execute("UPDATE inventory SET stock = ?, version = version + 1 WHERE product_id = ?", (stock, pid))
+
+    def stock(self, pid):
+        (stock, reserved, _), _ = self._read(self._connect(), None, pid)
+        return stock, reserved
+
+    def available(self, pid):
+        stock, reserved = self.stock(pid)
+        return stock - reserved
+
+    def sweep(self):
+        now = self._clock()
+        expired = self._connect().execute(
+            "SELECT holder, product_id FROM inventory_holds WHERE expires_at <= ?", (now,)
+        ).fetchall()
+        for holder, pid in expired:
+            # 읽은 뒤 예약이 갱신됐을 수 있으므로 여전히 만료된 경우에만 풂
+            self._release(holder, pid, expired_before=now)
+        return len(expired)
+
+    def maybe_sweep(self):
+        """sweep_interval마다 한 번 만료된 예약을 정리합니다 (예약 요청이 sweeper 역할을 겸함)."""
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep()
+
+
+def open_inventory(db_path=None, default_stock=DEFAULT_STOCK, ttl=DEFAULT_HOLD_TTL):
+    if not db_path:
+        return MemoryInventory(default_stock=default_stock, ttl=ttl)
+    return SQLiteInventory(db_path, default_stock=default_stock, ttl=ttl)
@@ -0,0 +1,444 @@
+"""
+주문 저장소와 비동기 주문 처리 파이프라인.
+
+- POST /checkout 은 주문 레코드(status="pending")만 저장하고 파이프라인 큐에 넣은 뒤 바로
+  주문 상태 페이지로 보냅니다. 결제 / 재고 확보 / 주문 확정은 백그라운드 스레드에서 진행됩니다.
+- 주문은 (user_id, idempotency_key)로 유일합니다. 같은 주문서를 두 번 제출해도
+  (더블 클릭, 새로고침, 동시 요청) 주문은 하나만 만들어지고 처리도 한 번만 됩니다.
+- ORDER_DB 설정이 없으면 프로세스 메모리, 있으면 SQLite 파일에 저장합니다.
+  큐는 워커 프로세스마다 따로 있는 로컬 큐입니다.
+- 큐에 넣는 주문에는 소유자(owner)와 임대 만료 시각(lease_until)을 저장하고, 파이프라인이 주기적으로
+  자기가 가진 주문의 임대를 연장합니다. 워커가 죽거나 재시작되어 로컬 큐가 사라지면 임대가 끝난 주문을
+  다른 워커(또는 새 워커)의 주기 검사가 가져가 마지막으로 저장된 단계 다음부터 처리합니다.
+  임대가 살아 있는 주문은 다른 프로세스가 처리하지 않으므로 결제가 두 번 실행되지 않습니다.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+log = logging.getLogger(__name__)
+
+PENDING = "pending"
+PAID = "paid"
+RESERVED = "reserved"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+FINAL_STATUSES = (CONFIRMED, FAILED)
+
+STATUS_LABELS = {
+    PENDING: "주문 접수",
+    PAID: "결제 완료",
+    RESERVED: "재고 확보",
+    CONFIRMED: "주문 확정",
+    FAILED: "주문 실패",
+}
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+
+class OrderError(Exception):
+    """주문 처리 단계가 실패했을 때 발생시키는 예외 (메시지가 사용자에게 표시됩니다)."""
+
+
+def new_idempotency_key():
+    return uuid.uuid4().hex
+
+
+def item_quantities(order):
+    """주문 상품을 {상품 ID: 수량}으로 반환합니다."""
+    return {item["id"]: item["quantity"] for item in order["items"]}
+
+
+def new_order(user_id, idempotency_key, items, shipping, clock=time.time):
+    """
+    새 주문 레코드를 만듭니다.
+    items: [{"id", "name", "price", "quantity"}, ...]
+    """
+    now = clock()
+    return {
+        "id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "idempotency_key": idempotency_key,
+        "items": [dict(item) for item in items],
+        "total": sum(item["price"] * item["quantity"] for item in items),
+        "shipping": dict(shipping),
+        "status": PENDING,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class MemoryOrderStore:
+    def __init__(self, clock=time.time):
+        self._orders = {}
+        self._by_key = {}  # (user_id, idempotency_key) -> order id
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def create(self, order):
+        """주문을 저장합니다. 같은 키의 주문이 이미 있으면 (기존 주문, False)를 반환합니다."""
+        key = (order["user_id"], order["idempotency_key"])
+        with self._lock:
+            existing = self._by_key.get(key)
+            if existing is not None:
+                return dict(self._orders[existing]), False
+            self._orders[order["id"]] = dict(order)
+            self._by_key[key] = order["id"]
+            return dict(order), True
+
+    def get(self, order_id):
+        with self._lock:
+            order = self._orders.get(order_id)
+            return dict(order) if order else None
+
+    def find(self, user_id, idempotency_key):
+        with self._lock:
+            order_id = self._by_key.get((user_id, idempotency_key))
+            return dict(self._orders[order_id]) if order_id else None
+
+    def update(self, order_id, **fields):
+        with self._lock:
+            order = self._orders[order_id]
+            order.update(fields, updated_at=self._clock())
+            return dict(order)
+
+    def stalled(self, before, now):
+        """
+        끝나지 않았고 아무도 맡고 있지 않은 주문 ID (오래된 순).
+        임대가 now 전에 끝났거나, 임대 없이 before(epoch 초) 이후로 바뀌지 않은 주문입니다.
+        """
+        with self._lock:
+            orders = [o for o in self._orders.values() if o["status"] not in FINAL_STATUSES and _unowned(o, before, now)]
+        return [order["id"] for order in sorted(orders, key=lambda o: o["updated_at"])]
+
+    def claim(self, order_id, owner, now, until):
+        """
+        끝나지 않은 주문을 owner가 until까지 맡습니다. 임대가 없거나 now 전에 끝났거나 이미 owner의 것이면
+        True, 다른 소유자의 임대가 살아 있으면 False (여러 프로세스가 동시에 시도해도 한 곳만 성공).
+        """
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or not _claimable(order, owner, now):
+                return False
+            order.update(owner=owner, lease_until=until)
+            return True
+
+
+def _unowned(order, before, now):
+    lease_until = order.get("lease_until")
+    if lease_until is None:
+        return order["updated_at"] < before
+    return lease_until < now
+
+
+def _claimable(order, owner, now):
+    if order["status"] in FINAL_STATUSES:
+        return False
+    lease_until = order.get("lease_until")
+    return lease_until is None or lease_until < now or order.get("owner") == owner
+
+
+class SQLiteOrderStore:
+    """
+    SQLite 주문 저장소 (WAL). (user_id, idempotency_key) UNIQUE 제약으로
+    여러 워커 프로세스에서 동시에 같은 주문서를 제출해도 주문이 하나만 생깁니다.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS orders ("
+                " id TEXT PRIMARY KEY,"
+                " user_id TEXT NOT NULL,"
+                " idempotency_key TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " UNIQUE (user_id, idempotency_key))"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(self, order):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO orders (id, user_id, idempotency_key, data) VALUES (?, ?, ?, ?)",
+                    (order["id"], order["user_id"], order["idempotency_key"], json.dumps(order)),
+                )
+        except sqlite3.IntegrityError:
+            return self.find(order["user_id"], order["idempotency_key"]), False
+        return dict(order), True
+
+    def get(self, order_id):
+        row = self._connect().execute("SELECT data FROM orders WHERE id = ?", (order_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, user_id, idempotency_key):
+        row = self._connect().execute(
+            "SELECT data FROM orders WHERE user_id = ? AND idempotency_key = ?", (user_id, idempotency_key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, order_id, **fields):
+        conn = self._connect()
+        with conn:
+            # BEGIN IMMEDIATE로 읽기-수정-쓰기 사이에 다른 프로세스가 끼어들지 못하게 함
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM orders WHERE id = ?", (order_id,)).fetchone()
+            if row is None:
+                raise KeyError(order_id)
+            order = json.loads(row[0])
+            order.update(fields, updated_at=self._clock())
+            conn.execute("UPDATE orders SET data = ? WHERE id = ?", (json.dumps(order), order_id))
+        return order
+
+    def stalled(self, before, now):
+        placeholders = ", ".join("?" for _ in FINAL_STATUSES)
+        rows = self._connect().execute(
+            f"SELECT id FROM orders WHERE json_extract(data, '$.status') NOT IN ({placeholders})"
+            " AND (json_extract(data, '$.lease_until') < ?"
+            "      OR (json_extract(data, '$.lease_until') IS NULL AND json_extract(data, '$.updated_at') < ?))"
+            " ORDER BY json_extract(data, '$.updated_at')",
+            (*FINAL_STATUSES, now, before),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim(self, order_id, owner, now, until):
+        conn = self._connect()
+        with conn:
+            # 여러 워커 프로세스가 동시에 가져가려 해도 한 곳만 성공하도록 읽기-확인-쓰기를 한 트랜잭션에서
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM orders WHERE id = ?", (order_id,)).fetchone()
+            if row is None:
+                return False
+            order = json.loads(row[0])
+            if not _claimable(order, owner, now):
+                return False
+            order.update(owner=owner, lease_until=until)
+            conn.execute("UPDATE orders SET data = ? WHERE id = ?", (json.dumps(order), order_id))
+        return True
+
+
+def open_order_store(db_path=None):
+    if not db_path:
+        return MemoryOrderStore()
+    return SQLiteOrderStore(db_path)
+
+
+def charge_payment(delay=0.0):
+    """결제 단계 (실제 PG 연동 없이 결제 번호만 발급하는 스텁)."""
+    def step(order):
+        if delay:
+            time.sleep(delay)
+        return {"payment_ref": f"stub-{order['id'][:12]}"}
+    return step
+
+
+def check_catalog(catalog):
+    """재고 확보 단계: 주문한 상품이 아직 카탈로그에 있는지 확인합니다."""
+    def step(order):
+        found = catalog.get_many([item["id"] for item in order["items"]])
+        missing = [item["name"] for item in order["items"] if item["id"] not in found]
+        if missing:
+            raise OrderError(f"판매가 중단된 상품이 있습니다: {', '.join(missing)}")
+    return step
+
+
+def confirm_order(order):
+    """주문 확정 단계."""
+    return {"confirmed_at": time.time()}
+
+
+class OrderPipeline:
+    """
+    주문을 (상태, 처리 함수) 단계 순서대로 처리하는 백그라운드 워커.
+    - 처리 함수는 order dict를 받아 주문에 더할 필드(dict 또는 None)를 반환하고,
+      단계를 마칠 때마다 주문 상태를 그 단계의 상태로 저장합니다.
+    - OrderError(또는 다른 예외)가 나면 status="failed", error=메시지로 저장하고 멈춥니다.
+      on_failure가 있으면 실패한 주문으로 호출합니다 (재고 되돌리기 등).
+    - 워커 스레드는 start() 또는 처음 submit()할 때 시작합니다 (fork된 워커 프로세스마다 자기 스레드).
+    - submit() / recover()는 주문을 recover_after초 동안 임대한 뒤 큐에 넣습니다. 감시 스레드가
+      recover_interval초마다 가진 주문의 임대를 연장하고 recover()로 임대가 끝난 주문을 가져옵니다.
+      다른 프로세스의 임대가 살아 있는 주문은 submit / process 하지 않습니다.
+    - 이미 지난 단계(저장된 status까지)는 다시 실행하지 않습니다.
+    """
+
+    def __init__(self, store, steps, workers=1, on_failure=None, recover_after=60.0, recover_interval=None,
+                 clock=time.time):
+        self.store = store
+        self.steps = list(steps)
+        self.on_failure = on_failure
+        self.workers = max(1, workers)
+        self.recover_after = recover_after
+        if recover_interval is None and recover_after is not None:
+            recover_interval = recover_after / 4
+        self.recover_interval = recover_interval
+        self._clock = clock
+        self._queue = queue.Queue()
+        self._threads = []
+        self._stop = threading.Event()
+        self._pid = None
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._held = set()  # 이 프로세스가 임대해 큐에 넣었거나 처리 중인 주문 ID
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # fork 전에 만든 큐 / 스레드는 자식 프로세스에서 쓸 수 없으므로 새로 만듦
+            self._queue = queue.Queue()
+            self._stop = threading.Event()
+            self._held = set()
+            # 같은 pid가 재사용되어도 이전 프로세스의 임대와 섞이지 않도록 임의 토큰을 붙임
+            self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._threads = [
+                threading.Thread(target=self._run, name=f"order-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            if self.recover_interval:
+                self._threads.append(threading.Thread(target=self._watch, name="order-recovery", daemon=True))
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+        self.recover()
+
+    def start(self):
+        """워커 스레드를 시작하고 멈춘 주문을 복구합니다 (이미 시작했으면 아무것도 하지 않음)."""
+        self._ensure_started()
+
+    def _lease(self):
+        now = self._clock()
+        return now, now + (self.recover_after if self.recover_after is not None else 365 * 24 * 60 * 60)
+
+    def _claim(self, order_id):
+        now, until = self._lease()
+        if not self.store.claim(order_id, self._owner, now, until):
+            return False
+        with self._lock:
+            self._held.add(order_id)
+        return True
+
+    def submit(self, order_id):
+        """주문을 임대해 큐에 넣습니다. 다른 프로세스가 맡고 있으면 False."""
+        self._ensure_started()
+        if not self._claim(order_id):
+            return False
+        self._queue.put(order_id)
+        return True
+
+    def recover(self):
+        """
+        저장소에서 끝나지 않았고 임대가 끝난 주문(죽은 워커의 큐에 있던 주문 등)과 임대 없이
+        recover_after초 넘게 바뀌지 않은 주문을 가져와 큐에 넣고 ID 목록을 반환합니다.
+        다른 워커가 먼저 가져간 주문은 건너뜁니다.
+        """
+        if self.recover_after is None:
+            return []
+        now = self._clock()
+        with self._lock:
+            held = set(self._held)
+        recovered = [
+            order_id for order_id in self.store.stalled(now - self.recover_after, now)
+            if order_id not in held and self._claim(order_id)
+        ]
+        if recovered:
+            log.warning("멈춘 주문 %d건을 다시 처리합니다.", len(recovered))
+        for order_id in recovered:
+            self._queue.put(order_id)
+        return recovered
+
+    def _watch(self):
+        stop = self._stop
+        while not stop.wait(self.recover_interval):
+            try:
+                # 큐에서 오래 기다리는 주문도 다른 프로세스가 가져가지 않도록 임대를 연장
+                with self._lock:
+                    held = list(self._held)
+                for order_id in held:
+                    now, until = self._lease()
+                    if not self.store.claim(order_id, self._owner, now, until):
+                        with self._lock:
+                            self._held.discard(order_id)
+                self.recover()
+            except Exception:
+                log.exception("주문 임대 연장 / 복구 중 오류")
+
+    def _run(self):
+        while True:
+            order_id = self._queue.get()
+            try:
+                if order_id is None:
+                    return
+                self.process(order_id)
+            finally:
+                with self._lock:
+                    self._held.discard(order_id)
+                self._queue.task_done()
+
+    def process(self, order_id):
+        order = self.store.get(order_id)
+        if order is None or order["status"] in FINAL_STATUSES:
+            return order
+        # 큐에서 기다리는 동안 임대가 끝나 다른 프로세스가 가져갔으면 처리하지 않음
+        if not self._claim(order_id):
+            log.info("주문 %s는 다른 워커가 처리 중입니다.", order_id)
+            return order
+        statuses = [status for status, _ in self.steps]
+        start = statuses.index(order["status"]) + 1 if order["status"] in statuses else 0
+        for status, step in self.steps[start:]:
+            try:
+                fields = step(order) or {}
+            except Exception as exc:
+                if not isinstance(exc, OrderError):
+                    log.exception("주문 %s 처리 중 오류", order_id)
+                order = self.store.update(order_id, status=FAILED, error=str(exc) or "주문 처리 중 오류가 발생했습니다.")
+                if self.on_failure is not None:
+                    self.on_failure(order)
+                return order
+            order = self.store.update(order_id, status=status, **fields)
+        return order
+
+    def join(self):
+        """지금까지 넣은 주문을 모두 처리할 때까지 기다립니다 (테스트 / 종료용)."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def wait(self, order_id, timeout=5.0, interval=0.01):
+        """주문이 확정되거나 실패할 때까지 기다린 뒤 주문을 반환합니다."""
+        deadline = time.monotonic() + timeout
+        order = self.store.get(order_id)
+        while order and order["status"] not in FINAL_STATUSES and time.monotonic() < deadline:
+            time.sleep(interval)
+            order = self.store.get(order_id)
+        return order
+
+    def shutdown(self):
+        """큐에 남은 주문을 마저 처리하고 워커 스레드를 종료합니다."""
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            self._threads = []
+            self._pid = None
@@ -0,0 +1,188 @@
+"""
+상품 검색 (프로세스 내 역색인).
+
+- name / brand / description을 토큰으로 나눠 term → {상품 ID: 가중 빈도} 역색인을 만듭니다.
+  한글은 띄어쓰기 없이 붙여 쓰는 경우가 많아 글자 2-gram으로, 영문/숫자는 단어 단위로 나눕니다.
+  ("캣타워" → 캣타, 타워 / "자동 급식기" → 자동, 급식, 식기)
+- 순위는 BM25. 상품명과 브랜드는 설명보다 가중치를 높게 둡니다.
+- 자동완성은 상품명 / 브랜드의 단어를 정렬해 두고 bisect로 접두어 범위를 찾습니다.
+- 색인은 한 번 만든 뒤, 카탈로그 version이 바뀌면 sync()에서 바뀐 상품만 다시 색인합니다.
+"""
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+# BM25 파라미터
+K1 = 1.2
+B = 0.75
+
+# 필드별 가중치 (토큰 빈도에 곱함)
+FIELD_WEIGHTS = (("name", 3), ("brand", 2), ("description", 1))
+
+_HANGUL_OR_WORD = re.compile(r"[가-힣]+|[a-z0-9]+")
+_SUGGEST_WORD = re.compile(r"[가-힣a-z0-9&]+")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text):
+    """검색용 토큰 목록. 한글은 2-gram(한 글자 단어는 그대로), 영문/숫자는 단어 그대로."""
+    tokens = []
+    for run in _HANGUL_OR_WORD.findall(normalize(text)):
+        if "가" <= run[0] <= "힣" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def suggest_words(product):
+    """자동완성 후보 단어 (상품명과 브랜드의 띄어쓰기 단위 단어)."""
+    return set(_SUGGEST_WORD.findall(normalize(f"{product['name']} {product['brand']}")))
+
+
+def _indexed_fields(product):
+    return tuple(product.get(field) or "" for field, _ in FIELD_WEIGHTS)
+
+
+class SearchIndex:
+    """
+    BM25 역색인. 조회와 갱신은 같은 잠금 안에서 하며, 조회는 질의어의 posting만 읽습니다.
+    """
+
+    def __init__(self, products=()):
+        self._lock = threading.RLock()
+        self._postings = {}      # term -> {pid: tf}
+        self._doc_len = {}       # pid -> 문서 길이(가중 토큰 수)
+        self._doc_terms = {}     # pid -> Counter(term -> tf), 갱신 시 이전 posting 제거용
+        self._doc_fields = {}    # pid -> 색인한 필드 값 (바뀌었는지 비교용)
+        self._doc_words = {}     # pid -> 자동완성 단어 set
+        self._total_len = 0
+        self._norms = None       # pid -> BM25 길이 보정값 (색인이 바뀌면 다음 조회 때 다시 계산)
+        self._words = []         # 정렬된 자동완성 단어
+        self._word_df = Counter()
+        self.version = None
+        for product in products:
+            self.update(product)
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def __contains__(self, pid):
+        return pid in self._doc_len
+
+    # ---- 색인 갱신 ----
+
+    def update(self, product):
+        """상품 하나를 (다시) 색인합니다. 색인할 필드가 그대로면 아무것도 하지 않습니다."""
+        pid = product["id"]
+        fields = _indexed_fields(product)
+        with self._lock:
+            if self._doc_fields.get(pid) == fields:
+                return False
+            self.remove(pid)
+            terms = Counter()
+            for (field, weight), value in zip(FIELD_WEIGHTS, fields):
+                for token in tokenize(value):
+                    terms[token] += weight
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[pid] = tf
+            length = sum(terms.values())
+            self._doc_len[pid] = length
+            self._total_len += length
+            self._doc_terms[pid] = terms
+            self._doc_fields[pid] = fields
+            self._norms = None
+
+            words = suggest_words(product)
+            for word in words:
+                if self._word_df[word] == 0:
+                    insort(self._words, word)
+                self._word_df[word] += 1
+            self._doc_words[pid] = words
+            return True
+
+    def remove(self, pid):
+        with self._lock:
+            terms = self._doc_terms.pop(pid, None)
+            if terms is None:
+                return False
+            for term in terms:
+                posting = self._postings[term]
+                del posting[pid]
+                if not posting:
+                    del self._postings[term]
+            self._total_len -= self._doc_len.pop(pid)
+            del self._doc_fields[pid]
+            self._norms = None
+            for word in self._doc_words.pop(pid):
+                self._word_df[word] -= 1
+                if self._word_df[word] == 0:
+                    del self._word_df[word]
+                    del self._words[bisect_left(self._words, word)]
+            return True
+
+    def sync(self, catalog):
+        """
+        카탈로그 version이 색인한 시점과 다르면, 바뀐 / 새 상품만 다시 색인하고 사라진 상품은 뺍니다.
+        (카탈로그를 한 번 훑지만 토큰화는 바뀐 상품에만 합니다.)
+        """
+        version = catalog.version
+        if version == self.version:
+            return 0
+        with self._lock:
+            if version == self.version:
+                return 0
+            seen = set()
+            changed = 0
+            for product in catalog:
+                seen.add(product["id"])
+                changed += self.update(product)
+            for pid in [pid for pid in self._doc_len if pid not in seen]:
+                changed += self.remove(pid)
+            self.version = version
+            return changed
+
+    # ---- 조회 ----
+
+    def search(self, query, limit=20):
+        """BM25 점수 순으로 (상품 ID, 점수) 목록을 반환합니다. 점수가 같으면 ID 오름차순."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._doc_len)
+            if not terms or not n:
+                return []
+            norms = self._norms
+            if norms is None:
+                avgdl = self._total_len / n
+                norms = self._norms = {
+                    pid: K1 * (1 - B + B * length / avgdl) for pid, length in self._doc_len.items()
+                }
+            scores = {}
+            get_score = scores.get
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5)) * (K1 + 1)
+                for pid, tf in posting.items():
+                    scores[pid] = get_score(pid, 0.0) + idf * tf / (tf + norms[pid])
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def suggest(self, prefix, limit=8):
+        """prefix로 시작하는 단어를 많이 쓰인 순(같으면 가나다순)으로 반환합니다."""
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        with self._lock:
+            start = bisect_left(self._words, prefix)
+            # prefix 뒤에 가장 큰 BMP 문자를 붙인 값 전까지가 접두어 범위
+            end = bisect_left(self._words, prefix + "\uffff", lo=start)
+            matches = [(self._word_df[word], word) for word in self._words[start:end]]
+        return [word for _, word in heapq.nsmallest(limit, matches, key=lambda item: (-item[0], item[1]))]
@@ -0,0 +1,218 @@
+"""
+운영용 실행 스크립트 (prefork 멀티 프로세스 서버).
+
+    python serve.py --bind 0.0.0.0:8000 --workers 4 --threads 8
+
+- 마스터 프로세스가 create_app()으로 앱을 만들고 템플릿 컴파일 / 카탈로그 인덱스 생성을
+  한 번 끝낸 뒤 워커를 fork합니다. 워커들은 이 메모리를 copy-on-write로 공유합니다.
+- 워커마다 스레드 풀(--threads) 크기만큼 요청을 동시에 처리합니다.
+- SIGHUP: graceful reload. 마스터가 앱을 새로 만들고(카탈로그/템플릿 다시 읽기)
+  새 워커를 띄운 다음, 이전 워커는 처리 중인 요청을 끝내고 종료합니다.
+- SIGTERM / SIGINT: 모든 워커를 graceful하게 종료합니다.
+- fork를 지원하지 않는 OS(Windows)에서는 단일 프로세스 스레드 서버로 실행합니다.
+
+여러 워커가 사용자/장바구니를 공유하려면 USER_DB, CART_STORE에 SQLite 파일을 지정하세요.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, run_simple
+
+from app import create_app
+
+log = logging.getLogger("serve")
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """요청을 고정 크기 스레드 풀에서 처리하는 Werkzeug WSGI 서버."""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd=None, multiprocess=False):
+        super().__init__(host, port, app, fd=fd)
+        self.multiprocess = multiprocess
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def warm_up(app):
+    """
+    fork 전에 템플릿 컴파일, 카탈로그 인덱스 생성 등 공유할 준비 작업을 마칩니다.
+    (저장소는 처음 사용할 때 만들어지므로, 워커가 공유할 것만 여기서 미리 만듭니다.)
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    shop = app.extensions["shop"]
+    len(shop.catalog)
+    shop.template_stamp
+    shop.search
+    shop.assets
+    return app
+
+
+def warn_process_local_stores(app, workers):
+    if workers > 1:
+        for key in ("USER_DB", "CART_STORE"):
+            if not app.config.get(key):
+                log.warning("%s가 설정되지 않아 워커마다 별도의 메모리 저장소를 사용합니다.", key)
+
+
+def run_worker(app, listener, threads, multiprocess):
+    """fork된 워커: SIGTERM을 받으면 새 연결 수락을 멈추고 처리 중인 요청을 마친 뒤 종료."""
+    host, port = listener.getsockname()[:2]
+    server = PooledWSGIServer(host, port, app, threads, fd=listener.fileno(), multiprocess=multiprocess)
+    # 여러 워커가 같은 소켓을 select하므로, 연결을 다른 워커가 먼저 가져가도
+    # accept()에서 멈춰 있지 않도록(종료 신호를 놓치지 않도록) non-blocking으로 둡니다.
+    server.socket.setblocking(False)
+
+    def stop(signum, frame):
+        # serve_forever가 도는 메인 스레드에서 shutdown()을 부르면 교착되므로 별도 스레드에서 호출
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if app.config["ORDER_DB"]:
+        # 죽은 / 이전 워커가 남긴 주문은 새 주문을 기다리지 않고 바로 복구
+        app.extensions["shop"].order_pipeline.start()
+    try:
+        server.serve_forever()
+    finally:
+        # 처리 중인 요청과 큐에 남은 주문을 끝까지 마친 뒤 소켓을 닫음
+        server.executor.shutdown(wait=True)
+        app.extensions["shop"].shutdown()
+        server.server_close()
+
+
+class Arbiter:
+    """워커 프로세스를 fork하고 감시하는 마스터."""
+
+    def __init__(self, app_factory, listener, workers, threads, graceful_timeout=30):
+        self.app_factory = app_factory
+        self.listener = listener
+        self.workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.children = set()
+        self.app = None
+        self._reload = False
+        self._stop = False
+
+    def spawn_generation(self):
+        self.app = warm_up(self.app_factory())
+        # 지금까지 만든 객체를 GC 추적 대상에서 빼서, 워커에서 GC가 돌 때 공유 페이지를 건드리지 않게 함
+        gc.freeze()
+        return {self.spawn() for _ in range(self.workers)}
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.app, self.listener, self.threads, multiprocess=self.workers > 1)
+            except BaseException:
+                log.exception("워커 비정상 종료")
+                status = 1
+            finally:
+                os._exit(status)
+        self.children.add(pid)
+        return pid
+
+    def stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while pids & self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in pids & self.children:
+            os.kill(pid, signal.SIGKILL)
+        self.reap()
+
+    def reap(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        current = self.spawn_generation()
+        warn_process_local_stores(self.app, self.workers)
+        log.info("워커 %d개 x 스레드 %d개로 시작 (pid %s)", self.workers, self.threads, sorted(current))
+        while not self._stop:
+            time.sleep(0.5)
+            if self._reload:
+                self._reload = False
+                gc.unfreeze()
+                previous, current = current, self.spawn_generation()
+                log.info("reload: 새 워커 %s, 이전 워커 종료 중 %s", sorted(current), sorted(previous))
+                self.stop_workers(previous)
+                continue
+            # 비정상 종료한 워커는 다시 띄움
+            self.reap()
+            for pid in current - self.children:
+                current.discard(pid)
+                current.add(self.spawn())
+        self.stop_workers(set(self.children))
+
+
+def parse_bind(value):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resona Cat Shop 운영 서버")
+    parser.add_argument("--bind", default=os.environ.get("BIND", "127.0.0.1:8000"))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("WEB_THREADS", 8)))
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(message)s")
+
+    host, port = parse_bind(args.bind)
+    if not hasattr(os, "fork"):
+        log.info("fork를 지원하지 않는 환경이라 단일 프로세스로 실행합니다.")
+        run_simple(host, port, warm_up(create_app()), threaded=True)
+        return
+
+    listener = socket.create_server((host, port), backlog=2048, reuse_port=False)
+    listener.set_inheritable(True)
+    log.info("http://%s:%d 에서 대기 중", host, port)
+
+    arbiter = Arbiter(create_app, listener, args.workers, args.threads, args.graceful_timeout)
+    arbiter.run()
+    listener.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Selenium 테스트용 chromedriver 찾기 (네트워크 없이 먼저 찾아봄).
+
+찾는 순서
+  1. --chromedriver 옵션 또는 CHROMEDRIVER 환경변수로 지정한 경로
+  2. 버전별 디스크 캐시: <CHROMEDRIVER_CACHE_DIR>/<Chrome 메이저 버전>/chromedriver
+     (기본 ~/.cache/resona-cat-shop/chromedriver, Chrome 버전을 모르면 가장 높은 버전)
+  3. PATH에 있는 chromedriver
+  4. 네트워크 다운로드 (webdriver-manager) — --driver-download 또는 CHROMEDRIVER_DOWNLOAD=1일 때만.
+     받은 드라이버는 2의 캐시에 복사해 두므로 다음부터는 오프라인으로 찾습니다.
+모두 실패하면 DriverUnavailable을 발생시킵니다 (conftest에서 UI 테스트를 skip).
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DRIVER_NAME = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "resona-cat-shop", "chromedriver")
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+_VERSION = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+
+
+class DriverUnavailable(Exception):
+    """사용할 수 있는 chromedriver를 찾지 못했을 때 발생합니다."""
+
+
+class DriverResolution:
+    """찾은 드라이버 경로, 찾은 곳("option", "env", "cache", "path", "download"), 걸린 시간(초)."""
+
+    def __init__(self, path, source, seconds):
+        self.path = path
+        self.source = source
+        self.seconds = seconds
+
+    def describe(self):
+        return f"chromedriver: {self.path} ({self.source}, {self.seconds * 1000:.1f} ms)"
+
+
+def chrome_major_version(binaries=CHROME_BINARIES):
+    """설치된 Chrome의 메이저 버전 (찾지 못하면 None). 네트워크를 쓰지 않습니다."""
+    for binary in binaries:
+        executable = shutil.which(binary)
+        if not executable:
+            continue
+        try:
+            output = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = _VERSION.search(output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def cached_driver(cache_dir, major=None):
+    """캐시에서 메이저 버전에 맞는 드라이버 (버전을 모르면 가장 높은 버전)."""
+    if major is not None:
+        path = os.path.join(cache_dir, str(major), DRIVER_NAME)
+        return path if _is_executable(path) else None
+    try:
+        versions = sorted((entry for entry in os.listdir(cache_dir) if entry.isdigit()), key=int, reverse=True)
+    except FileNotFoundError:
+        return None
+    for version in versions:
+        path = os.path.join(cache_dir, version, DRIVER_NAME)
+        if _is_executable(path):
+            return path
+    return None
+
+
+def store_in_cache(cache_dir, major, driver_path):
+    """받은 드라이버를 캐시에 복사합니다 (여러 워커가 동시에 복사해도 임시 파일 + rename으로 안전)."""
+    target_dir = os.path.join(cache_dir, str(major))
+    os.makedirs(target_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copyfile(driver_path, tmp_path)
+        os.chmod(tmp_path, 0o755)
+        target = os.path.join(target_dir, DRIVER_NAME)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return target
+
+
+def download_driver():
+    """webdriver-manager로 드라이버를 받습니다 (네트워크 사용)."""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver(explicit=None, cache_dir=None, allow_network=False, major=None,
+                         environ=os.environ, downloader=download_driver):
+    """
+    위의 순서대로 chromedriver를 찾아 DriverResolution을 반환합니다.
+    major를 주지 않으면 설치된 Chrome에서 읽습니다.
+    """
+    started = time.perf_counter()
+
+    def found(path, source):
+        return DriverResolution(path, source, time.perf_counter() - started)
+
+    for path, source in ((explicit, "option"), (environ.get("CHROMEDRIVER"), "env")):
+        if path:
+            if not _is_executable(path):
+                raise DriverUnavailable(f"지정한 chromedriver를 실행할 수 없습니다: {path}")
+            return found(path, source)
+
+    cache_dir = cache_dir or environ.get("CHROMEDRIVER_CACHE_DIR") or DEFAULT_CACHE_DIR
+    if major is None:
+        major = chrome_major_version()
+    path = cached_driver(cache_dir, major)
+    if path:
+        return found(path, "cache")
+
+    path = shutil.which(DRIVER_NAME)
+    if path:
+        return found(path, "path")
+
+    if not allow_network:
+        raise DriverUnavailable(
+            "chromedriver를 찾지 못했습니다. --chromedriver / CHROMEDRIVER로 경로를 지정하거나 "
+            f"{cache_dir}/<Chrome 버전>/{DRIVER_NAME}에 두세요 (다운로드 허용: --driver-download)."
+        )
+    try:
+        path = downloader()
+    except Exception as exc:
+        raise DriverUnavailable(f"chromedriver 다운로드 실패: {exc}") from exc
+    if major is not None:
+        path = store_in_cache(cache_dir, major, path)
+    return found(path, "download")
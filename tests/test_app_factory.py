@@ -0,0 +1,83 @@
+import http.cookiejar
+import subprocess
+import sys
+import threading
+import urllib.parse
+import urllib.request
+
+from app import create_app
+from config import Config, TestingConfig, env_overrides
+from serve import PooledWSGIServer, warm_up
+
+
+def test_create_app_applies_config():
+    """create_app(config)으로 넘긴 설정이 적용된 독립 앱 인스턴스를 만듭니다."""
+    app = create_app({"TESTING": True, "CATALOG_PAGE_SIZE": 2})
+    response = app.test_client().get('/')
+
+    assert response.status_code == 200
+    assert response.headers['Link'] == '</?after=2>; rel="next"'
+
+
+def test_import_has_no_side_effects():
+    """app 모듈을 import해도 기본 앱과 저장소는 처음 참조할 때까지 만들지 않습니다."""
+    code = "import app; assert app._default_app is None; app.USERS; assert app._default_app is not None"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_services_built_lazily():
+    """저장소와 캐시는 create_app()이 아니라 처음 사용할 때 만들어집니다."""
+    app = create_app(TestingConfig)
+    shop = app.extensions["shop"]
+    assert shop.built() == []
+
+    app.test_client().get('/product/1')
+    assert "catalog" in shop.built()
+    assert "users" not in shop.built()
+
+
+def test_instances_do_not_share_users():
+    """앱 인스턴스마다 사용자 저장소가 따로 있습니다."""
+    first, second = create_app(TestingConfig), create_app(TestingConfig)
+    first.extensions["shop"].users.add("only_first", {"password": "pw"})
+
+    assert "only_first" in first.extensions["shop"].users
+    assert "only_first" not in second.extensions["shop"].users
+
+
+def test_env_overrides_typed():
+    """환경변수 값은 기본값과 같은 타입으로 변환되고, 설정 클래스에 없는 키는 무시합니다."""
+    environ = {"CATALOG_PAGE_SIZE": "48", "LOGIN_RATE_PER_MINUTE": "2.5", "TESTING": "true",
+               "CATALOG_DB": "", "UNRELATED": "x"}
+    assert env_overrides(Config, environ) == {
+        "CATALOG_PAGE_SIZE": 48, "LOGIN_RATE_PER_MINUTE": 2.5, "TESTING": True, "CATALOG_DB": None,
+    }
+
+
+def test_pooled_server_serves_preloaded_app():
+    """미리 준비(warm_up)한 앱을 스레드 풀 WSGI 서버로 서비스합니다."""
+    app = warm_up(create_app({"TESTING": True}))
+    server = PooledWSGIServer("127.0.0.1", 0, app, threads=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/product/1") as response:
+            assert response.status == 200
+            assert "프리미엄 캣타워" in response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.executor.shutdown(wait=True)
+        server.server_close()
+
+
+def test_live_server_shares_default_app_state(live_server):
+    """live_server는 기본 app을 띄우므로, 테스트에서 USERS에 추가한 계정으로 바로 로그인됩니다."""
+    from app import USERS  # 기본 app은 처음 참조할 때 만들어지므로 함수 안에서 import
+
+    USERS.add("live_user", {"password": "live-password"})
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    form = urllib.parse.urlencode({"username": "live_user", "password": "live-password"}).encode("ascii")
+    with opener.open(f"{live_server.url}/login", data=form) as response:
+        assert response.status == 200
+        assert "집사, live_user님" in response.read().decode("utf-8")
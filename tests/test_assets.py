@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from app import create_app
+from assets import (
+    IMMUTABLE_CACHE_CONTROL, VENDOR, VENDOR_DIR, AssetError, AssetManifest, build, clean, purge_css, sri_hash,
+    template_classes, vendor,
+)
+from config import TestingConfig
+
+CSS = (
+    '@charset "UTF-8";/*! license */:root{--bs-blue:#0d6efd}body{margin:0}'
+    ".btn,.btn-unused{padding:1px}.card .card-body{padding:2px}.unused{color:red}"
+    '.alert-danger{color:red}.form-select{background:url("data:image/svg+xml,{}")}'
+    "@media (min-width:576px){.container{max-width:540px}.unused{color:blue}}"
+    "@media print{.only-unused{display:none}}"
+    "@keyframes spin{to{transform:rotate(360deg)}}"
+    ":not(.btn-check)+.btn:active{color:green}"
+    "/*# sourceMappingURL=bootstrap.min.css.map */"
+)
+
+
+def write_vendor(directory, css=CSS):
+    directory.mkdir(exist_ok=True)
+    (directory / "bootstrap.min.css").write_text(css * 20, encoding="utf-8")
+    (directory / "bootstrap.bundle.min.js").write_text("console.log('bootstrap');" * 40, encoding="utf-8")
+    return directory
+
+
+def test_purge_keeps_only_used_classes():
+    purged = purge_css(CSS, {"btn", "card", "card-body", "container", "form-select"}, prefixes=("alert-",))
+
+    assert purged.startswith('@charset "UTF-8";/*! license */:root{--bs-blue:#0d6efd}body{margin:0}')
+    assert ".btn{padding:1px}" in purged
+    assert ".card .card-body{padding:2px}" in purged
+    assert ".alert-danger{color:red}" in purged
+    assert '.form-select{background:url("data:image/svg+xml,{}")}' in purged
+    assert "@media (min-width:576px){.container{max-width:540px}}" in purged
+    assert "@keyframes spin{to{transform:rotate(360deg)}}" in purged
+    # :not() 안의 class는 쓰지 않아도 규칙을 남김
+    assert ":not(.btn-check)+.btn:active{color:green}" in purged
+    assert "unused" not in purged
+    assert "@media print" not in purged
+    assert "sourceMappingURL" not in purged
+
+
+def test_template_classes_reads_jinja_prefixes(tmp_path):
+    (tmp_path / "page.html").write_text(
+        '<div class="alert alert-{{ category }} mb-2"></div>'
+        "<a class=\"nav-link {{ 'active' if current }}\">x</a>",
+        encoding="utf-8",
+    )
+    used, prefixes = template_classes(str(tmp_path))
+    assert {"alert", "mb-2", "nav-link", "active"} <= used
+    assert prefixes == ("alert-",)
+
+
+def test_vendor_verifies_sri(tmp_path):
+    source = write_vendor(tmp_path / "download")
+    with pytest.raises(AssetError):
+        vendor(str(tmp_path / "vendor"), source_dir=str(source))
+    assert sri_hash(b"") == "sha384-OLBgp1GsljhM2TJ+sbHjaiH9txEUvgdDTAzHv2P24donTt6/529l+9Ua0vFImLlb"
+
+
+def test_build_fingerprints_and_precompresses(tmp_path):
+    source = write_vendor(tmp_path / "vendor")
+    dist = tmp_path / "dist"
+
+    manifest = build(str(source), str(dist))
+    assert set(manifest) == set(VENDOR)
+    css_path = dist / manifest["bootstrap.min.css"]
+    assert css_path.name == "bootstrap.min.css"
+    assert gzip.decompress((dist / (manifest["bootstrap.min.css"] + ".gz")).read_bytes()) == css_path.read_bytes()
+    assert json.loads((dist / "manifest.json").read_text(encoding="utf-8")) == manifest
+
+    # 내용이 같으면 경로도 같고, 바뀌면 경로도 바뀜
+    assert build(str(source), str(dist)) == manifest
+    write_vendor(source, css=CSS.replace("0d6efd", "123456"))
+    changed = build(str(source), str(dist))
+    assert changed["bootstrap.min.css"] != manifest["bootstrap.min.css"]
+    assert changed["bootstrap.bundle.min.js"] == manifest["bootstrap.bundle.min.js"]
+
+    purged = build(str(source), str(dist), purge=True)
+    assert (dist / purged["bootstrap.min.css"]).stat().st_size < css_path.stat().st_size
+
+
+def test_build_requires_vendored_files(tmp_path):
+    with pytest.raises(AssetError):
+        build(str(tmp_path / "vendor"), str(tmp_path / "dist"))
+
+
+def test_committed_vendor_files_match_sri():
+    """저장소에 커밋한 static/vendor 파일은 VENDOR에 적힌 SRI 해시와 같습니다."""
+    for name, (_, integrity) in VENDOR.items():
+        with open(os.path.join(VENDOR_DIR, name), "rb") as f:
+            assert sri_hash(f.read()) == integrity, name
+
+
+def test_pages_use_vendored_files_without_build(tmp_path):
+    client = create_app(dict(vars(TestingConfig), ASSET_BUILD_DIR=str(tmp_path / "dist"))).test_client()
+    html = client.get("/").get_data(as_text=True)
+    assert '<link href="/static/vendor/bootstrap.min.css" rel="stylesheet">' in html
+    assert '<script src="/static/vendor/bootstrap.bundle.min.js"></script>' in html
+    assert "cdn.jsdelivr.net" not in html
+    assert client.get("/static/vendor/bootstrap.min.css").status_code == 200
+
+
+def test_cdn_only_when_nothing_is_vendored(tmp_path):
+    manifest = AssetManifest(str(tmp_path / "dist"), vendor_dir=str(tmp_path / "vendor"))
+    url, integrity = VENDOR["bootstrap.min.css"]
+    assert manifest.tag("bootstrap.min.css", str, str) == (
+        f'<link href="{url}" rel="stylesheet" integrity="{integrity}" crossorigin="anonymous">'
+    )
+    assert manifest.digest != AssetManifest(str(tmp_path / "dist")).digest
+
+
+def test_rebuild_changes_page_etag(tmp_path):
+    """재빌드 + clean 후에는 manifest를 다시 읽고 ETag도 바뀌어, 지워진 지문 경로를 가리키는 304가 나가지 않습니다."""
+    source = write_vendor(tmp_path / "vendor")
+    dist = tmp_path / "dist"
+    old = build(str(source), str(dist))
+    client = create_app(dict(vars(TestingConfig), ASSET_BUILD_DIR=str(dist))).test_client()
+    etag = client.get("/").headers["ETag"]
+
+    write_vendor(source, css=CSS.replace("0d6efd", "654321"))
+    new = build(str(source), str(dist))
+    clean(str(dist), new)
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    html = response.get_data(as_text=True)
+    assert f"/static/dist/{new['bootstrap.min.css']}" in html
+    assert old["bootstrap.min.css"] not in html
+    assert client.get(f"/static/dist/{new['bootstrap.min.css']}").status_code == 200
+
+
+def test_built_assets_are_served_precompressed_and_immutable(tmp_path):
+    dist = tmp_path / "dist"
+    manifest = build(str(write_vendor(tmp_path / "vendor")), str(dist))
+    client = create_app(dict(vars(TestingConfig), ASSET_BUILD_DIR=str(dist))).test_client()
+
+    html = client.get("/").get_data(as_text=True)
+    css_url = f"/static/dist/{manifest['bootstrap.min.css']}"
+    assert f'<link href="{css_url}" rel="stylesheet">' in html
+    assert f'<script src="/static/dist/{manifest["bootstrap.bundle.min.js"]}"></script>' in html
+    assert "cdn.jsdelivr.net" not in html
+
+    plain = client.get(css_url, headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert plain.mimetype == "text/css"
+    assert plain.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert "Content-Encoding" not in plain.headers
+
+    compressed = client.get(css_url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.mimetype == "text/css"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers["ETag"] != plain.headers["ETag"]
+
+    assert client.get(css_url, headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+    assert client.get("/static/dist/0000/bootstrap.min.css").status_code == 404
+    assert client.get("/static/dist/manifest.json").status_code == 404
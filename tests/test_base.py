@@ -112,7 +112,33 @@ def test_flash_messages_rendering(client):
 # --- D. 스크립트 로딩 테스트 ---
 
 def test_bootstrap_js_loads(client):
-    """Bootstrap JavaScript 번들 CDN이 올바르게 포함되었는지 확인합니다."""
+    """Bootstrap JavaScript 번들(static/vendor 사본 또는 빌드 결과)이 올바르게 포함되었는지 확인합니다."""
     response = client.get('/')
-    # Bootstrap JS CDN 링크 확인
-    assert b'bootstrap.bundle.min.js' in response.data
\ No newline at end of file
+    # Bootstrap JS 번들 스크립트 태그 확인
+    assert b'bootstrap.bundle.min.js' in response.data
+
+# --- E. 지연 계산되는 템플릿 전역 값 테스트 ---
+
+def test_template_globals_are_lazy(client, monkeypatch):
+    """장바구니는 템플릿이 cart 관련 값을 처음 사용할 때 한 번만 저장소에서 읽습니다."""
+    from flask import render_template_string
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'testuser'
+        sess['cart'] = {"1": 1, "2": 1}
+    cookie = client.get_cookie(app.config["SESSION_COOKIE_NAME"])
+
+    store = app.session_interface.store
+    loads = []
+    original_load = store.load
+    monkeypatch.setattr(store, "load", lambda cid: loads.append(cid) or original_load(cid))
+
+    headers = {"Cookie": f"{cookie.key}={cookie.value}"}
+    with app.test_request_context('/', headers=headers):
+        assert render_template_string("{{ current_user }}") == "testuser"
+        assert loads == []
+
+    with app.test_request_context('/', headers=headers):
+        html = render_template_string("{{ cart_count }}/{{ cart_count }}/{{ 1 in in_cart_ids }}")
+        assert html == "2/2/True"
+        assert len(loads) == 1
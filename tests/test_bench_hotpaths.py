@@ -0,0 +1,47 @@
+from benchmarks.bench_hotpaths import compare, run_suite
+
+
+def result(**best):
+    return {"results": {name: {"best_us": value, "median_us": value, "loops": 1} for name, value in best.items()}}
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    baseline = result(a=10.0, b=10.0, c=10.0, gone=1.0)
+    current = result(a=12.0, b=13.0, c=5.0, new=99.0)
+
+    gone = ("gone", 1.0, None, None)
+    assert compare(baseline, current, threshold=0.25) == [("b", 10.0, 13.0, 13.0 / 10.0 - 1), gone]
+    assert compare(baseline, current, threshold=0.1) == [
+        ("a", 10.0, 12.0, 12.0 / 10.0 - 1), ("b", 10.0, 13.0, 13.0 / 10.0 - 1), gone,
+    ]
+    assert compare(baseline, result(a=10.0, b=10.0, c=10.0, gone=1.0)) == []
+
+
+def test_compare_skips_cases_outside_current_selection():
+    """--sizes / --carts / --only로 고르지 않은 기준 항목은 없어도 실패가 아닙니다."""
+    baseline = result(**{
+        "get_product[catalog=10]": 1.0, "get_product[catalog=1000]": 1.0,
+        "cart_total[catalog=10,cart=1]": 1.0, "cart_total[catalog=10,cart=500]": 1.0,
+    })
+    current = result(**{"get_product[catalog=10]": 1.0, "cart_total[catalog=10,cart=1]": 1.0})
+    current["meta"] = {"sizes": [10], "carts": [1], "only": []}
+    assert compare(baseline, current) == []
+
+    current["meta"]["carts"] = [1, 500]
+    assert compare(baseline, current) == [("cart_total[catalog=10,cart=500]", 1.0, None, None)]
+    current["meta"]["only"] = ["get_product"]
+    assert compare(baseline, current) == []
+
+
+def test_suite_measures_every_hot_path():
+    suite = run_suite(sizes=[10], carts=[1, 20], repeat=1, min_time=0.0)
+
+    assert set(suite["results"]) == {
+        "get_product[catalog=10]",
+        "product_in_cart[catalog=10,cart=1]", "product_in_cart[catalog=10,cart=20]",
+        "cart_total[catalog=10,cart=1]", "cart_total[catalog=10,cart=20]",
+        "render_index[catalog=10]",
+        "render_cart[catalog=10,cart=1]", "render_cart[catalog=10,cart=20]",
+    }
+    assert all(row["best_us"] > 0 for row in suite["results"].values())
+    assert compare(suite, suite) == []
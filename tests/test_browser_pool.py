@@ -0,0 +1,53 @@
+from conftest import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.cookies = {"session": "x"}
+        self.url = "http://127.0.0.1/cart"
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if self.broken:
+            raise RuntimeError("chrome not reachable")
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_pool_reuses_browser_after_reset():
+    """돌려받은 브라우저는 쿠키를 지운 뒤 다음 테스트에 다시 빌려줍니다 (Chrome을 새로 띄우지 않음)."""
+    launched = []
+    pool = BrowserPool(lambda: launched.append(FakeDriver()) or launched[-1])
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert len(launched) == 1
+    assert first.cookies == {}
+    assert first.url == "about:blank"
+
+    pool.release(second)
+    pool.close()
+    assert first.quit_called
+
+
+def test_pool_discards_broken_browser():
+    """초기화에 실패한 브라우저는 종료하고, 다음 요청에는 새 브라우저를 띄웁니다."""
+    launched = []
+    pool = BrowserPool(lambda: launched.append(FakeDriver(broken=not launched)) or launched[-1])
+
+    broken = pool.acquire()
+    pool.release(broken)
+    assert broken.quit_called
+
+    assert pool.acquire() is launched[1]
@@ -0,0 +1,88 @@
+import pytest
+
+from cart_store import CART_ID_KEY, MemoryCartStore, SQLiteCartStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# ----------------------------------------------------
+# 1. 저장소 단위 테스트
+# ----------------------------------------------------
+
+def test_memory_store_ttl_eviction():
+    """TTL이 지난 장바구니는 조회되지 않고, 다음 저장 시 정리됩니다."""
+    clock = FakeClock()
+    store = MemoryCartStore(ttl=60, clock=clock)
+    store.save("a", {"cart": {"1": 1}})
+    clock.now += 30
+    store.save("b", {"cart": {"2": 1}})
+
+    assert store.load("a") == {"cart": {"1": 1}}
+
+    clock.now += 40  # a 만료, b는 유효
+    assert store.load("a") is None
+    store.save("c", {"cart": {}})
+    assert len(store) == 2
+    assert store.load("b") == {"cart": {"2": 1}}
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    """SQLite 저장소 저장/조회/삭제 및 만료 처리 확인"""
+    clock = FakeClock()
+    store = SQLiteCartStore(str(tmp_path / "carts.db"), ttl=60, clock=clock)
+    store.save("a", {"cart": {"1": 1, "3": 1}})
+    assert store.load("a") == {"cart": {"1": 1, "3": 1}}
+
+    store.delete("a")
+    assert store.load("a") is None
+
+    store.save("b", {"cart": {"2": 1}})
+    clock.now += 61
+    assert store.load("b") is None
+    store.sweep()
+    assert len(store) == 0
+
+
+# ----------------------------------------------------
+# 2. 세션 연동 테스트
+# ----------------------------------------------------
+
+def read_cookie_payload(app, client):
+    """클라이언트 쿠키에 실린 세션 데이터를 디코딩합니다."""
+    cookie = client.get_cookie(app.config["SESSION_COOKIE_NAME"])
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.loads(cookie.value)
+
+
+def test_cart_kept_server_side(app, login_test_env):
+    """장바구니 내용은 쿠키에 실리지 않고, session['cart']로는 그대로 읽힙니다."""
+    client, username, password = login_test_env
+    client.post('/login', data={"username": username, "password": password})
+    client.post('/cart/toggle/1')
+    client.post('/cart/toggle/2')
+
+    payload = read_cookie_payload(app, client)
+    assert "cart" not in payload
+    assert CART_ID_KEY in payload
+
+    with client.session_transaction() as sess:
+        assert sess['cart'] == {"1": 1, "2": 1}
+    assert "Cart (2)" in client.get('/').data.decode('utf-8')
+
+
+def test_logout_deletes_server_cart(app, login_test_env):
+    """로그아웃하면 서버 저장소의 장바구니도 삭제됩니다."""
+    client, username, password = login_test_env
+    client.post('/login', data={"username": username, "password": password})
+    client.post('/cart/toggle/1')
+    cid = read_cookie_payload(app, client)[CART_ID_KEY]
+
+    client.get('/logout')
+
+    assert app.session_interface.store.load(cid) is None
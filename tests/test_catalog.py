@@ -0,0 +1,168 @@
+import pytest
+
+from catalog import Catalog, CatalogRepository, open_catalog
+
+
+PRODUCTS = [
+    {"id": 1, "name": "캣타워", "price": 129000, "brand": "Resona Cat", "description": "", "image_url": ""},
+    {"id": 2, "name": "터널", "price": 39000, "brand": "PlayLand", "description": "", "image_url": ""},
+    {"id": 3, "name": "스크래쳐", "price": 19000, "brand": "Resona Cat", "description": "", "image_url": ""},
+    {"id": 4, "name": "쿠션", "price": 39000, "brand": "SoftNest", "description": "", "image_url": ""},
+]
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(PRODUCTS)
+
+
+def test_get_coerces_id(catalog):
+    """get_product와 같은 규칙으로 문자열 ID도 찾고, 잘못된 입력은 None을 반환합니다."""
+    assert catalog.get(1)["name"] == "캣타워"
+    assert catalog.get("2")["name"] == "터널"
+    assert catalog.get("abc") is None
+    assert catalog.get(None) is None
+    assert catalog.get(999) is None
+
+
+def test_brand_and_price_indexes(catalog):
+    """브랜드 인덱스와 가격 범위 검색 확인"""
+    assert [p["id"] for p in catalog.by_brand("Resona Cat")] == [1, 3]
+    assert catalog.by_brand("없는 브랜드") == []
+    assert [p["id"] for p in catalog.price_range(30000, 40000)] == [2, 4]
+    assert [p["id"] for p in catalog.price_range(max_price=39000)] == [3, 2, 4]
+
+
+def test_reload_swaps_all_indexes(catalog):
+    """reload 후에는 모든 인덱스가 새 목록 기준으로 바뀌고 version도 바뀝니다."""
+    version = catalog.version
+    catalog.reload(PRODUCTS[:1])
+
+    assert catalog.version != version
+    assert len(catalog) == 1
+    assert catalog.get(2) is None
+    assert catalog.by_brand("PlayLand") == []
+    assert [p["id"] for p in catalog.price_range()] == [1]
+
+
+def test_version_is_content_hash(catalog):
+    """version은 내용으로 정해지므로 재시작해도 같은 내용이면 같고, 상품 하나만 바뀌어도 달라집니다."""
+    assert Catalog(PRODUCTS).version == catalog.version
+
+    changed = [dict(PRODUCTS[0], price=99000)] + PRODUCTS[1:]
+    assert Catalog(changed).version != catalog.version
+
+    version = catalog.version
+    catalog.reload(changed)
+    catalog.reload(PRODUCTS)
+    assert catalog.version == version
+
+
+# ----------------------------------------------------
+# SQLite 카탈로그 + read-through 캐시
+# ----------------------------------------------------
+
+@pytest.fixture
+def sqlite_catalog(tmp_path):
+    return open_catalog(PRODUCTS, db_path=str(tmp_path / "catalog.db"))
+
+
+def test_sqlite_catalog_lookups(sqlite_catalog):
+    """SQLite 카탈로그도 메모리 카탈로그와 같은 조회 결과를 돌려줍니다."""
+    assert sqlite_catalog.get("1")["name"] == "캣타워"
+    assert sqlite_catalog.get("abc") is None
+    assert sorted(sqlite_catalog.get_many([1, 3, 999])) == [1, 3]
+    assert [p["id"] for p in sqlite_catalog.by_brand("Resona Cat")] == [1, 3]
+    assert [p["id"] for p in sqlite_catalog.price_range(30000, 40000)] == [2, 4]
+    assert len(sqlite_catalog) == 4
+
+
+def test_sqlite_catalog_cache_invalidated_on_reload(sqlite_catalog):
+    """reload 후에는 캐시된 상품 대신 새 데이터가 조회됩니다."""
+    assert sqlite_catalog.get(1)["price"] == 129000
+    version = sqlite_catalog.version
+
+    sqlite_catalog.reload([dict(PRODUCTS[0], price=99000)])
+
+    assert sqlite_catalog.version > version
+    assert sqlite_catalog.get(1)["price"] == 99000
+    assert sqlite_catalog.get(2) is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_page_keyset_and_offset(backend, tmp_path):
+    """keyset(after) / offset 페이지 조회는 두 저장소에서 같은 결과를 냅니다."""
+    db_path = str(tmp_path / "catalog.db") if backend == "sqlite" else None
+    catalog = open_catalog(PRODUCTS, db_path=db_path)
+
+    assert [p["id"] for p in catalog.page(limit=2)] == [1, 2]
+    assert [p["id"] for p in catalog.page(after=2, limit=5)] == [3, 4]
+    assert [p["id"] for p in catalog.page(offset=3, limit=2)] == [4]
+    assert catalog.page(after=4, limit=2) == []
+
+
+# ----------------------------------------------------
+# facet 필터 / 정렬
+# ----------------------------------------------------
+
+class ScanCatalog(CatalogRepository):
+    """인덱스 없이 전체를 훑는 기준 구현 (CatalogRepository 기본 filter / facet_counts)."""
+
+    def __init__(self, products):
+        self.products = list(products)
+
+    def get(self, pid):
+        return next((p for p in self.products if p["id"] == int(pid)), None)
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+
+FACET_QUERIES = [
+    {},
+    {"brands": ["Resona Cat"]},
+    {"brands": ["Resona Cat", "SoftNest"], "sort": "price"},
+    {"min_price": 30000, "max_price": 40000},
+    {"min_price": 30000, "sort": "price", "limit": 2},
+    {"brands": ["PlayLand", "SoftNest"], "max_price": 39000, "sort": "price", "after": (39000, 2)},
+    {"brands": ["Resona Cat"], "after": 1},
+    {"brands": ["없는 브랜드"]},
+    {"brands": ["Resona Cat", "Resona Cat"]},
+    {"brands": ["PlayLand", "SoftNest", "PlayLand"], "sort": "price"},
+]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+@pytest.mark.parametrize("query", FACET_QUERIES)
+def test_filter_matches_scan(backend, query, tmp_path):
+    """facet 인덱스 / SQL 결과가 전체를 훑어 거르고 정렬한 결과와 같습니다."""
+    db_path = str(tmp_path / "catalog.db") if backend == "sqlite" else None
+    catalog = open_catalog(PRODUCTS, db_path=db_path)
+    expected = ScanCatalog(PRODUCTS)
+
+    assert catalog.filter(**query) == expected.filter(**query)
+    counts = {key: value for key, value in query.items() if key in ("brands", "min_price", "max_price")}
+    assert catalog.facet_counts(**counts) == expected.facet_counts(**counts)
+
+
+def test_facet_counts_ignore_own_brand_selection(catalog):
+    """브랜드별 개수는 가격 조건만 반영하고, 전체 수는 선택한 브랜드까지 반영합니다."""
+    counts, total = catalog.facet_counts(brands=["PlayLand"], min_price=30000)
+    assert counts == {"PlayLand": 1, "Resona Cat": 1, "SoftNest": 1}
+    assert total == 1
+
+
+def test_incomplete_repository_fails_on_creation():
+    """필수 메서드가 빠진 저장소 구현은 처음 쓸 때가 아니라 만들 때 실패합니다."""
+    class NoGet(CatalogRepository):
+        def __iter__(self):
+            return iter(())
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match="get"):
+        NoGet()
@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+from credentials import (
+    PBKDF2, SCRYPT, HasherBusy, PasswordHasher, VerificationLimiter, hash_password, verify_password,
+)
+
+# 테스트에서는 비용을 낮춰 빠르게 실행
+FAST = {"scrypt_n": 2 ** 10, "pbkdf2_iterations": 1000}
+
+
+@pytest.mark.parametrize("algorithm", [SCRYPT, PBKDF2])
+def test_hash_and_verify(algorithm):
+    """해시는 매번 다른 salt를 쓰고, 올바른 비밀번호만 검증을 통과합니다."""
+    first = hash_password("password123", algorithm=algorithm, **FAST)
+    second = hash_password("password123", algorithm=algorithm, **FAST)
+
+    assert first.startswith(algorithm + "$")
+    assert first != second
+    assert verify_password("password123", first)
+    assert not verify_password("wrong", first)
+    assert not verify_password("password123", "garbage")
+
+
+def test_needs_rehash_when_cost_changes():
+    """비용 설정이 바뀌면 기존 해시는 재해시 대상이 됩니다."""
+    old = PasswordHasher(scrypt_n=2 ** 10)
+    new = PasswordHasher(scrypt_n=2 ** 11)
+    encoded = old.hash("pw")
+
+    assert not old.needs_rehash(encoded)
+    assert new.needs_rehash(encoded)
+    assert new.verify("pw", encoded)
+    assert not new.verify("pw", None)
+
+
+def test_verification_cache_skips_repeated_hashes(monkeypatch):
+    """성공한 (해시, 비밀번호)는 TTL 동안 다시 계산하지 않고, 실패한 시도나 다른 해시는 캐시되지 않습니다."""
+    now = [0.0]
+    hasher = PasswordHasher(cache_size=2, cache_ttl=60, clock=lambda: now[0], **FAST)
+    encoded = hasher.hash("pw")
+    calls = []
+    monkeypatch.setattr(hasher, "_run", lambda func, *args, **kwargs: calls.append(args) or func(*args, **kwargs))
+
+    assert hasher.verify("pw", encoded) and hasher.verify("pw", encoded)
+    assert len(calls) == 1
+    assert not hasher.verify("wrong", encoded) and not hasher.verify("wrong", encoded)
+    assert len(calls) == 3
+    assert hasher.verify("pw", hasher.hash("pw"))          # 비밀번호를 다시 해시하면 새 항목
+    now[0] += 61
+    assert hasher.verify("pw", encoded)                     # 만료 후에는 다시 계산
+    assert len(calls) == 6
+    hasher.shutdown()
+
+
+def test_hasher_rejects_when_backlog_is_full():
+    """풀 앞에 기다리는 요청이 max_pending을 넘으면 기다리지 않고 HasherBusy로 거절합니다."""
+    hasher = PasswordHasher(workers=1, max_pending=0, **FAST)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    assert started.wait(5)
+    with pytest.raises(HasherBusy):
+        hasher.hash("pw")
+    release.set()
+    worker.join()
+    assert verify_password("pw", hasher.hash("pw"))
+    hasher.shutdown()
+
+
+def test_limiter_burst_and_refill():
+    """burst만큼 허용 후 차단되고, 시간이 지나면 다시 허용됩니다."""
+    now = [0.0]
+    limiter = VerificationLimiter(rate=1.0, burst=2, max_keys=2, clock=lambda: now[0])
+
+    assert limiter.allow("a") and limiter.allow("a")
+    assert not limiter.allow("a")
+    now[0] += 1.0
+    assert limiter.allow("a")
+
+    limiter.allow("b")
+    limiter.allow("c")  # 키 테이블 크기 제한으로 가장 오래된 키(a)는 버려짐
+    assert limiter.allow("a") and limiter.allow("a")
+
+
+# ----------------------------------------------------
+# 로그인 / 회원가입 연동
+# ----------------------------------------------------
+
+def test_register_stores_hash_and_legacy_login_upgrades(app, client):
+    """회원가입은 해시만 저장하고, 평문 레코드는 로그인 성공 시 해시로 바뀝니다."""
+    USERS = app.extensions["shop"].users
+    client.post('/register', data={"username": "hash_user", "password": "pw1234", "confirm": "pw1234"})
+    assert "password" not in USERS["hash_user"]
+    assert verify_password("pw1234", USERS["hash_user"]["password_hash"])
+
+    USERS["legacy_user"] = {"password": "plain123"}
+    response = client.post('/login', data={"username": "legacy_user", "password": "plain123"}, follow_redirects=True)
+    assert "로그인 성공!".encode('utf-8') in response.data
+    assert USERS["legacy_user"].keys() == {"password_hash"}
+
+
+def test_login_rate_limited(app, client):
+    """같은 아이디로 짧은 시간에 너무 많이 시도하면 429로 거절합니다."""
+    LOGIN_LIMITER = app.extensions["shop"].login_limiter
+    for _ in range(LOGIN_LIMITER.burst):
+        client.post('/login', data={"username": "brute", "password": "x"})
+
+    response = client.post('/login', data={"username": "brute", "password": "x"})
+    assert response.status_code == 429
+    assert "로그인 시도가 너무 많습니다.".encode('utf-8') in response.data
+
+
+def test_login_limit_is_per_client_address(app, client):
+    """다른 주소에서 틀린 비밀번호를 반복해도 실제 사용자는 자기 주소에서 계속 로그인할 수 있습니다."""
+    USERS = app.extensions["shop"].users
+    USERS["victim"] = {"password_hash": app.extensions["shop"].passwords.hash("right-pw")}
+    attacker = {"REMOTE_ADDR": "203.0.113.9"}
+    for _ in range(app.extensions["shop"].login_limiter.burst):
+        client.post('/login', data={"username": "victim", "password": "x"}, environ_base=attacker)
+    assert client.post('/login', data={"username": "victim", "password": "x"},
+                       environ_base=attacker).status_code == 429
+
+    response = client.post('/login', data={"username": "victim", "password": "right-pw"},
+                           environ_base={"REMOTE_ADDR": "198.51.100.7"})
+    assert response.status_code == 302
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from tests.driver_resolver import DRIVER_NAME, DriverUnavailable, resolve_chromedriver
+
+
+def fake_driver(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n", encoding="utf-8")
+    path.chmod(0o755)
+    return str(path)
+
+
+def no_download():
+    raise AssertionError("네트워크를 쓰면 안 됩니다.")
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """PATH에 chromedriver가 없는 환경."""
+    monkeypatch.setenv("PATH", "")
+
+
+def test_explicit_path_wins(tmp_path, offline):
+    option = fake_driver(tmp_path / "option" / DRIVER_NAME)
+    env = fake_driver(tmp_path / "env" / DRIVER_NAME)
+
+    resolution = resolve_chromedriver(explicit=option, environ={"CHROMEDRIVER": env}, downloader=no_download)
+    assert (resolution.path, resolution.source) == (option, "option")
+    assert resolve_chromedriver(environ={"CHROMEDRIVER": env}, downloader=no_download).source == "env"
+
+    with pytest.raises(DriverUnavailable):
+        resolve_chromedriver(explicit=str(tmp_path / "missing"), environ={})
+
+
+def test_cache_is_keyed_by_chrome_major_version(tmp_path, offline):
+    cache = tmp_path / "cache"
+    v126 = fake_driver(cache / "126" / DRIVER_NAME)
+    v127 = fake_driver(cache / "127" / DRIVER_NAME)
+
+    resolution = resolve_chromedriver(cache_dir=str(cache), major="126", environ={}, downloader=no_download)
+    assert (resolution.path, resolution.source) == (v126, "cache")
+    assert resolution.seconds < 1
+    # Chrome 버전을 모르면(PATH에 Chrome 없음) 가장 높은 버전
+    assert resolve_chromedriver(cache_dir=str(cache), environ={}, downloader=no_download).path == v127
+
+
+def test_network_only_when_allowed(tmp_path, offline):
+    cache = tmp_path / "cache"
+    with pytest.raises(DriverUnavailable):
+        resolve_chromedriver(cache_dir=str(cache), major="126", environ={}, downloader=no_download)
+
+    downloaded = fake_driver(tmp_path / "wdm" / DRIVER_NAME)
+    resolution = resolve_chromedriver(cache_dir=str(cache), major="126", environ={}, allow_network=True,
+                                      downloader=lambda: downloaded)
+    assert resolution.source == "download"
+    assert resolution.path == os.path.join(str(cache), "126", DRIVER_NAME)
+
+    # 받은 드라이버는 캐시에 남아 다음부터는 오프라인으로 찾음
+    assert resolve_chromedriver(cache_dir=str(cache), major="126", environ={}, downloader=no_download).source == "cache"
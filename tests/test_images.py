@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from app import PRODUCTS, create_app
+from config import TestingConfig
+from images import ImageCache, image_token
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def write_png(path, width, height):
+    PIL.new("RGB", (width, height), (200, 120, 40)).save(path, format="PNG")
+
+
+@pytest.fixture
+def origin_dir(tmp_path):
+    """오프라인 원본 디렉터리: image_url의 파일 이름으로 원본 이미지를 둡니다."""
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    for product in PRODUCTS[:2]:
+        write_png(origin / os.path.basename(product["image_url"].split("?")[0]), 1200, 800)
+    return origin
+
+
+@pytest.fixture
+def image_app(tmp_path, origin_dir):
+    return create_app(dict(vars(TestingConfig), IMAGE_ORIGIN=str(origin_dir), IMAGE_CACHE_DIR=str(tmp_path / "cache")))
+
+
+def test_cache_resizes_once_and_is_content_addressed(tmp_path, origin_dir):
+    """원본은 한 번만 가져오고, 변환 결과는 내용 해시 이름으로 저장됩니다."""
+    cache = ImageCache(str(tmp_path / "cache"), origin=str(origin_dir))
+    url = PRODUCTS[0]["image_url"]
+
+    digest, path = cache.get(1, url, 320)
+    with PIL.open(path) as image:
+        assert image.size == (320, 213)
+    assert os.path.basename(path) == digest
+
+    os.remove(origin_dir / os.path.basename(url.split("?")[0]))
+    assert cache.get(1, url, 320) == (digest, path)           # 캐시에서 바로
+    assert cache.get(1, url, 640)[0] != digest                # 원본 캐시로 새 너비 생성
+    assert cache.nearest_width(500) == 640
+
+
+def test_cache_prunes_least_recently_used(tmp_path, origin_dir):
+    """캐시가 max_bytes를 넘으면 가장 오래 쓰지 않은 파일부터 한도의 90%까지 지우고, 지워진 너비는 다시 만듭니다."""
+    cache = ImageCache(str(tmp_path / "cache"), origin=str(origin_dir))
+    url = PRODUCTS[0]["image_url"]
+    paths = {width: cache.get(1, url, width)[1] for width in (160, 320, 640)}
+    original = cache.object_path(cache._lookup(url, "orig"))
+    for mtime, path in enumerate([*paths.values(), original], start=1):
+        os.utime(path, (0, 1000 * mtime))                      # 160이 가장 오래됨, 원본이 가장 최근
+    total = sum(os.path.getsize(path) for path in [*paths.values(), original])
+
+    cache.max_bytes = total
+    assert cache.prune() == 0
+    cache.max_bytes = total - 1
+    removed = cache.prune()
+    assert total - removed <= cache.max_bytes * 0.9
+    assert not os.path.exists(paths[160])
+    assert os.path.exists(paths[640]) and os.path.exists(original)
+    assert cache._lookup(url, "w160") is None
+    assert cache.get(1, url, 160)[1] == paths[160]
+
+
+def test_decompression_bomb_falls_back_to_original_url(image_app, origin_dir, monkeypatch):
+    """픽셀 수 제한을 넘는 원본은 500 대신 원래 image_url로 보냅니다."""
+    monkeypatch.setattr(PIL, "MAX_IMAGE_PIXELS", 1000)
+
+    response = image_app.test_client().get("/img/1/320")
+    assert response.status_code == 302
+    assert response.headers["Location"] == PRODUCTS[0]["image_url"]
+
+
+def test_image_endpoint_headers(image_app):
+    """현재 ?v= 와 맞으면 immutable로, 아니면 짧게 캐시하고 ETag 재검증을 지원합니다."""
+    client = image_app.test_client()
+    url = f"/img/1/480?v={image_token(PRODUCTS[0]['image_url'])}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert client.get(url, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    assert client.get("/img/1/480?v=old").headers["Cache-Control"] == "public, max-age=300"
+    assert client.get("/img/999/480").status_code == 404
+
+
+def test_image_redirect_keeps_only_cache_buster(image_app):
+    """허용되지 않은 너비는 가까운 너비로 임시 리다이렉트하고, 쿼리 문자열은 ?v= 만 넘깁니다."""
+    client = image_app.test_client()
+
+    response = client.get("/img/1/500")
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/img/1/640"
+    assert client.get("/img/1/500?v=abc").headers["Location"] == "/img/1/640?v=abc"
+
+    for query in ("width=3", "pid=2", "_external=1&_scheme=javascript", "_anchor=x&v=abc&extra=1"):
+        response = client.get(f"/img/1/500?{query}")
+        assert response.status_code == 302, query
+        assert response.headers["Location"].split("?")[0] == "/img/1/640", query
+        assert "_" not in response.headers["Location"] and "#" not in response.headers["Location"], query
+
+
+def test_templates_use_proxy_srcset(image_app):
+    """상품 카드와 상세 페이지는 프록시 주소와 srcset을 사용합니다."""
+    html = image_app.test_client().get('/product/1').data.decode('utf-8')
+    token = image_token(PRODUCTS[0]["image_url"])
+    assert f'src="/img/1/640?v={token}"' in html
+    assert f'/img/1/160?v={token} 160w' in html
+    assert "images.pexels.com" not in html
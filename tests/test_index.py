@@ -113,4 +113,176 @@ def mock_product_in_cart(pid):
     
     # 3. 상세보기 링크 검증
     assert f'<a href="{app.url_for("product_detail", pid=1)}" class="btn' in response_data
-    assert f'<a href="{app.url_for("product_detail", pid=2)}" class="btn' in response_data
\ No newline at end of file
+    assert f'<a href="{app.url_for("product_detail", pid=2)}" class="btn' in response_data
+
+# ----------------------------------------------------
+# 📄 페이지네이션
+# ----------------------------------------------------
+
+@pytest.fixture
+def small_pages():
+    """한 페이지에 4개씩 보이도록 설정을 잠시 바꿉니다."""
+    original = app.config["CATALOG_PAGE_SIZE"]
+    app.config["CATALOG_PAGE_SIZE"] = 4
+    yield
+    app.config["CATALOG_PAGE_SIZE"] = original
+
+
+def test_first_page_has_next_link(client, small_pages):
+    """첫 페이지는 4개만 보여주고, keyset 방식의 다음 페이지 링크를 제공합니다."""
+    response = client.get('/')
+    html = response.data.decode('utf-8')
+
+    assert "자동 레이저 장난감" in html      # id 4
+    assert "캣닢 봉제 인형 세트" not in html  # id 5
+    assert response.headers['Link'] == '</?after=4>; rel="next"'
+    assert 'href="/?after=4" class="btn btn-outline-primary" rel="next"' in html
+
+
+def test_keyset_cursor_page(client, small_pages):
+    """?after=<id>&limit= 으로 다음 상품부터 limit개를 가져옵니다."""
+    response = client.get('/?after=4&limit=3')
+    html = response.data.decode('utf-8')
+
+    assert "캣닢 봉제 인형 세트" in html      # id 5
+    assert "고양이 정수기" in html            # id 7
+    assert "캣 하우스 쿠션" not in html       # id 8
+    assert response.headers['Link'] == '</?after=7&limit=3>; rel="next"'
+
+
+def test_page_number_and_last_page(client, small_pages):
+    """?page=3 은 마지막 페이지이므로 다음 페이지 링크가 없습니다."""
+    response = client.get('/?page=3')
+    html = response.data.decode('utf-8')
+
+    assert "LED 깃털 막대 장난감" in html     # id 10
+    assert "프리미엄 캣타워" not in html
+    assert 'Link' not in response.headers
+    assert "다음 페이지" not in html
+    assert "처음으로" in html
+
+
+# ----------------------------------------------------
+# 🧩 상품 카드 조각 캐시
+# ----------------------------------------------------
+
+def test_product_cards_served_from_fragment_cache(client):
+    """두 번째 요청부터는 캐시된 카드 조각을 사용합니다."""
+    from app import FRAGMENTS
+    FRAGMENTS.clear()
+
+    client.get('/')
+    misses = FRAGMENTS.stats["misses"]
+    client.get('/')
+
+    assert FRAGMENTS.stats["misses"] == misses
+    assert FRAGMENTS.stats["hits"] >= 10
+
+
+def test_cached_card_reflects_cart_state(client):
+    """같은 상품이라도 장바구니 포함 여부에 따라 다른 카드 조각이 렌더링됩니다."""
+    client.get('/')  # 카트 비어 있는 상태의 조각을 먼저 캐시
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'testuser'
+        sess['cart'] = {"1": 1}
+    html = client.get('/').data.decode('utf-8')
+
+    card_1 = html.split('/cart/toggle/1')[1].split('</form>')[0]
+    card_2 = html.split('/cart/toggle/2')[1].split('</form>')[0]
+    assert '카트에서 제거</button>' in card_1
+    assert '카트에 담기</button>' in card_2
+
+
+# ----------------------------------------------------
+# 🔁 조건부 GET (ETag / 304)
+# ----------------------------------------------------
+
+def test_repeat_visit_gets_304(client):
+    """같은 ETag로 다시 요청하면 본문 없이 304를 반환합니다."""
+    first = client.get('/')
+    etag = first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'public, max-age=60'
+    assert 'Last-Modified' in first.headers
+
+    second = client.get('/', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+
+def test_etag_changes_with_session_state(client):
+    """로그인/장바구니 상태가 바뀌면 ETag가 달라지고, 로그인 응답은 private으로 표시됩니다."""
+    etag = client.get('/').headers['ETag']
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'testuser'
+    logged_in = client.get('/', headers={'If-None-Match': etag})
+    assert logged_in.status_code == 200
+    assert logged_in.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Last-Modified' not in logged_in.headers
+
+    with client.session_transaction() as sess:
+        sess['cart'] = {"1": 1}
+    in_cart = client.get('/', headers={'If-None-Match': logged_in.headers['ETag']})
+    assert in_cart.status_code == 200
+
+
+def test_pending_flash_is_never_304(client):
+    """플래시 메시지가 남아 있으면 ETag가 일치해도 본문을 렌더링합니다."""
+    etag = client.get('/').headers['ETag']
+    with client.session_transaction() as sess:
+        sess['_flashes'] = [('info', '로그아웃되었습니다.')]
+
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert '로그아웃되었습니다.' in response.data.decode('utf-8')
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+# ----------------------------------------------------
+# 🛒 장바구니 포함 여부 (in_cart_ids)
+# ----------------------------------------------------
+
+def test_cart_product_ids_and_product_in_cart():
+    """in_cart_ids는 int ID 집합이고, product_in_cart와 같은 판정을 합니다."""
+    from app import cart_product_ids
+    cart = {"1": 1, "7": 1, "bad": 1}
+    ids = cart_product_ids(cart)
+
+    assert ids == frozenset({1, 7})
+    for pid in (1, 2, 7):
+        assert (pid in ids) == product_in_cart(pid, cart)
+
+
+# ----------------------------------------------------
+# 🔎 브랜드 / 가격 필터와 정렬
+# ----------------------------------------------------
+
+def test_price_sort_with_range_and_cursor(client, small_pages):
+    """가격 범위 안의 상품을 낮은 가격순으로 보여주고, (가격, id) 커서로 다음 페이지를 잇습니다."""
+    response = client.get('/?sort=price&min_price=15000&max_price=40000')
+    html = response.data.decode('utf-8')
+
+    assert html.index("캣닢 봉제 인형 세트") < html.index("LED 깃털 막대 장난감") < html.index("터널 놀이 텐트")
+    assert "캣 하우스 쿠션" not in html        # 같은 39000원이지만 id가 더 큼 → 다음 페이지
+    assert "상품 5개" in html
+    next_url = '/?min_price=15000&max_price=40000&after=2&sort=price&after_price=39000'
+    assert response.headers['Link'] == f'<{next_url}>; rel="next"'
+
+    html = client.get(next_url).data.decode('utf-8')
+    assert "캣 하우스 쿠션" in html
+    assert "터널 놀이 텐트" not in html
+
+
+def test_brand_facets(client):
+    """여러 브랜드를 고르면 합집합을 보여주고, 브랜드별 개수를 함께 표시합니다."""
+    html = client.get('/?brand=PlayLand&brand=SoftNest').data.decode('utf-8')
+
+    assert "터널 놀이 텐트" in html
+    assert "캣 하우스 쿠션" in html
+    assert "프리미엄 캣타워" not in html
+    assert "상품 2개" in html
+    assert "PlayLand (1)" in html
+    assert 'value="PlayLand" id="brand-' in html
+
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from inventory import MemoryInventory, SQLiteInventory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_inventory(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemoryInventory(**kwargs)
+        return SQLiteInventory(str(tmp_path / "inventory.db"), **kwargs)
+    return make
+
+
+# ----------------------------------------------------
+# 예약 / 해제 / 판매
+# ----------------------------------------------------
+
+def test_reserve_respects_stock(make_inventory):
+    """예약 가능한 수량을 넘으면 거절하고, 자기 예약은 수량을 바꿔 다시 잡을 수 있습니다."""
+    inventory = make_inventory(default_stock=3)
+
+    assert inventory.reserve("alice", 1, 2)
+    assert not inventory.reserve("bob", 1, 2)
+    assert inventory.reserve("bob", 1, 1)
+    assert inventory.reserve("alice", 1, 1)      # 2개 → 1개로 줄임
+    assert inventory.available(1) == 1
+
+    inventory.release("bob", 1)
+    assert inventory.stock(1) == (3, 1)
+
+
+def test_consume_all_or_nothing(make_inventory):
+    """하나라도 모자라면 아무것도 팔지 않고 모자란 상품을 알려줍니다."""
+    inventory = make_inventory(default_stock=2)
+    inventory.set_stock(2, 0)
+    inventory.reserve("alice", 1, 2)
+
+    assert inventory.consume("alice", {1: 2, 2: 1}) == [2]
+    assert inventory.stock(1) == (2, 2)
+
+    assert inventory.consume("alice", {1: 2}) == []
+    assert inventory.stock(1) == (0, 0)
+    inventory.restock({1: 2})
+    assert inventory.available(1) == 2
+
+
+def test_expired_holds_released_by_sweep(make_inventory):
+    """TTL이 지난 예약은 sweep()이 풀어 다른 사람이 살 수 있게 됩니다."""
+    clock = FakeClock()
+    inventory = make_inventory(default_stock=1, ttl=60, clock=clock)
+    assert inventory.reserve("alice", 1)
+    assert not inventory.reserve("bob", 1)
+
+    clock.now += 61
+    inventory.sweep()
+    assert inventory.available(1) == 1
+    assert inventory.reserve("bob", 1)
+
+
+# ----------------------------------------------------
+# 동시성: 많은 스레드가 동시에 담고 결제해도 초과 판매가 없어야 함
+# ----------------------------------------------------
+
+@pytest.mark.parametrize("threads, attempts", [(16, 40)])
+def test_no_oversell_under_concurrency(make_inventory, threads, attempts):
+    stock = 25
+    inventory = make_inventory(default_stock=stock)
+    sold = []
+    barrier = threading.Barrier(threads)
+
+    def buyer(n):
+        barrier.wait()
+        for i in range(attempts):
+            holder = f"user-{n}-{i}"
+            if not inventory.reserve(holder, 7):
+                continue
+            if i % 3 == 0:
+                inventory.release(holder, 7)      # 담았다가 빼는 사용자
+            elif inventory.consume(holder, {7: 1}) == []:
+                sold.append(holder)
+
+    workers = [threading.Thread(target=buyer, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    remaining, reserved = inventory.stock(7)
+    assert len(sold) == stock
+    assert remaining == 0 and reserved == 0
+
+
+# ----------------------------------------------------
+# 장바구니 / 결제 연동
+# ----------------------------------------------------
+
+def test_cart_reserves_and_checkout_consumes(app, login_test_env):
+    """장바구니에 담으면 예약되고, 결제하면 판매되며, 재고가 없으면 담을 수 없습니다."""
+    client, username, password = login_test_env
+    inventory = app.extensions["shop"].inventory
+    inventory.set_stock(1, 1)
+    inventory.set_stock(2, 0)
+    client.post('/login', data={"username": username, "password": password})
+
+    client.post('/cart/toggle/1')
+    assert inventory.stock(1) == (1, 1)
+    response = client.post('/cart/toggle/2', follow_redirects=True)
+    assert "재고가 부족합니다.".encode('utf-8') in response.data
+
+    client.post('/checkout', data={"name": "홍길동", "phone": "010", "address": "서울"})
+    assert inventory.stock(1) == (0, 0)
@@ -0,0 +1,68 @@
+import threading
+
+from app import create_app
+from benchmarks.loadtest import HTTPClient, discover_product_ids, percentile, run
+from benchmarks.synthetic import synthetic_products
+from config import TestingConfig
+from serve import PooledWSGIServer
+
+FAST_HASH = {"PASSWORD_SCRYPT_N": 2 ** 10}
+
+
+def test_synthetic_products_are_deterministic():
+    products = synthetic_products(50, seed=3)
+    assert [p["id"] for p in products] == list(range(1, 51))
+    assert products == synthetic_products(50, seed=3)
+    assert products != synthetic_products(50, seed=4)
+
+
+def test_percentile_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert percentile([0.2], 95) == 0.2
+
+
+def test_load_run_covers_whole_flow():
+    """가상 사용자마다 쿠키를 따로 가지고 로그인부터 주문까지 오류 없이 마칩니다."""
+    summary = run(users=3, iterations=2, catalog_size=40, config=FAST_HASH)
+
+    assert summary["errors"] == 0
+    assert summary["flows"] == 6
+    assert set(summary["routes"]) == {
+        "POST /login", "GET /", "POST /cart/toggle/<pid>", "GET /cart", "GET /checkout", "POST /checkout",
+    }
+    for row in summary["routes"].values():
+        assert row["count"] == 6
+        assert row["p50"] <= row["p95"] <= row["p99"] <= row["max"]
+
+
+def test_url_mode_uses_server_product_ids():
+    """--url 모드는 서버 상품 목록(여러 쪽)에서 읽은 ID로 장바구니를 채워 주문까지 마칩니다."""
+    app = create_app(dict(vars(TestingConfig), CATALOG_PAGE_SIZE=4))
+    app.extensions["shop"].catalog.reload(synthetic_products(10, start_id=501))
+    server = PooledWSGIServer("127.0.0.1", 0, app, threads=4)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert discover_product_ids(HTTPClient(url)) == list(range(501, 511))
+        assert discover_product_ids(HTTPClient(url), max_pages=1) == list(range(501, 505))
+
+        summary = run(users=2, iterations=3, url=url)
+    finally:
+        server.shutdown()
+        server.executor.shutdown(wait=True)
+        server.server_close()
+        app.extensions["shop"].shutdown()
+
+    assert summary["errors"] == 0
+    assert (summary["flows"], summary["failed_flows"]) == (6, 0)
+    assert summary["routes"]["POST /checkout"]["count"] == 6
+
+
+def test_skipped_checkout_counts_as_failed_flow():
+    """장바구니에 담지 못해 주문 폼이 없으면 그 흐름은 완료가 아니라 실패로 셉니다."""
+    summary = run(users=1, iterations=2, catalog_size=5, product_ids=[999], config=FAST_HASH)
+
+    assert (summary["flows"], summary["failed_flows"]) == (0, 2)
+    assert "POST /checkout" not in summary["routes"]
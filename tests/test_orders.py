@@ -0,0 +1,203 @@
+import re
+import threading
+import time
+
+import pytest
+
+from orders import (
+    CONFIRMED, FAILED, PAID, PENDING, MemoryOrderStore, OrderError, OrderPipeline, SQLiteOrderStore,
+    new_order,
+)
+
+ITEMS = [{"id": 1, "name": "프리미엄 캣타워", "price": 129000, "quantity": 1}]
+SHIPPING = {"name": "홍길동", "phone": "010-0000-0000", "address": "서울"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryOrderStore()
+    return SQLiteOrderStore(str(tmp_path / "orders.db"))
+
+
+# ----------------------------------------------------
+# 주문 저장소 / 파이프라인
+# ----------------------------------------------------
+
+def test_create_is_idempotent(store):
+    """같은 (사용자, 키)로 다시 만들면 처음 주문을 그대로 돌려줍니다."""
+    first, created = store.create(new_order("alice", "key-1", ITEMS, SHIPPING))
+    again, created_again = store.create(new_order("alice", "key-1", ITEMS, SHIPPING))
+    other, created_other = store.create(new_order("bob", "key-1", ITEMS, SHIPPING))
+
+    assert created and not created_again and created_other
+    assert again["id"] == first["id"] != other["id"]
+    assert first["total"] == 129000 and first["status"] == PENDING
+
+
+def test_concurrent_create_single_order(store):
+    """동시에 같은 주문서를 제출해도 주문은 하나만 만들어집니다."""
+    results = []
+    barrier = threading.Barrier(8)
+
+    def submit():
+        barrier.wait()
+        results.append(store.create(new_order("alice", "dup", ITEMS, SHIPPING)))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(created for _, created in results) == 1
+    assert len({order["id"] for order, _ in results}) == 1
+
+
+def test_pipeline_runs_steps_in_background(store):
+    """파이프라인은 단계마다 상태를 저장하고, 실패하면 failed와 메시지를 남깁니다."""
+    def reject(order):
+        raise OrderError("재고가 부족합니다.")
+
+    ok, _ = store.create(new_order("alice", "ok", ITEMS, SHIPPING))
+    bad, _ = store.create(new_order("alice", "bad", ITEMS, SHIPPING))
+    pipeline = OrderPipeline(store, [(PAID, lambda order: {"payment_ref": "p-1"}), (CONFIRMED, lambda order: None)])
+    pipeline.submit(ok["id"])
+    pipeline.join()
+
+    done = store.get(ok["id"])
+    assert done["status"] == CONFIRMED and done["payment_ref"] == "p-1"
+
+    pipeline.steps.insert(1, (PAID, reject))
+    pipeline.submit(bad["id"])
+    failed = pipeline.wait(bad["id"])
+    assert failed["status"] == FAILED and failed["error"] == "재고가 부족합니다."
+    pipeline.shutdown()
+
+
+def test_pipeline_recovers_stalled_orders(store):
+    """재시작한 파이프라인은 저장소에 멈춰 있던 미완료 주문을 저장된 단계 다음부터 다시 처리합니다."""
+    calls = []
+
+    def step(name, status):
+        def run(order):
+            calls.append((name, order["idempotency_key"]))
+        return status, run
+
+    steps = [step("pay", PAID), step("confirm", CONFIRMED)]
+    pending, _ = store.create(new_order("alice", "pending", ITEMS, SHIPPING))
+    paid, _ = store.create(new_order("alice", "paid", ITEMS, SHIPPING))
+    store.update(paid["id"], status=PAID)
+    done, _ = store.create(new_order("alice", "done", ITEMS, SHIPPING))
+    store.update(done["id"], status=CONFIRMED)
+
+    # 방금 바뀐 주문은 다른 워커가 처리 중일 수 있으므로 건드리지 않음
+    assert OrderPipeline(store, steps, recover_after=60).recover() == []
+
+    later = OrderPipeline(store, steps, recover_after=60, clock=lambda: time.time() + 120)
+    later.start()
+    later.join()
+    assert store.get(pending["id"])["status"] == store.get(paid["id"])["status"] == CONFIRMED
+    assert sorted(calls) == [("confirm", "paid"), ("confirm", "pending"), ("pay", "pending")]
+    # 이미 가져간 주문은 다시 복구하지 않음
+    assert later.recover() == []
+    later.shutdown()
+
+
+def test_stalled_order_is_claimed_once(store):
+    """여러 워커가 동시에 복구해도 멈춘 주문은 한 곳에서만 가져가고, 임대가 끝나야 다시 가져갈 수 있습니다."""
+    order, _ = store.create(new_order("alice", "stuck", ITEMS, SHIPPING))
+    now = time.time()
+    assert store.stalled(now - 60, now) == []
+    assert store.stalled(now + 1, now) == [order["id"]]
+    assert store.claim(order["id"], "worker-a", now, now + 60)
+    assert not store.claim(order["id"], "worker-b", now, now + 60)
+    assert store.claim(order["id"], "worker-a", now, now + 60)       # 자기 임대는 연장
+    assert store.stalled(now + 1, now) == []
+    assert store.stalled(now + 1, now + 61) == [order["id"]]
+    assert store.claim(order["id"], "worker-b", now + 61, now + 121)
+
+
+def test_pipeline_picks_up_expired_lease_without_restart(store):
+    """워커가 죽어 임대가 끝나면 살아 있는 파이프라인의 주기 검사가 재시작 없이 가져가 처리합니다."""
+    order, _ = store.create(new_order("alice", "orphan", ITEMS, SHIPPING))
+    now = time.time()
+    store.claim(order["id"], "dead-worker", now, now + 0.2)
+    pipeline = OrderPipeline(store, [(CONFIRMED, lambda order: None)], recover_after=0.2, recover_interval=0.02)
+    pipeline.start()
+
+    assert pipeline.wait(order["id"])["status"] == CONFIRMED
+    pipeline.shutdown()
+
+
+def test_pipeline_skips_orders_leased_by_live_worker(store):
+    """다른 프로세스의 임대가 살아 있는 주문은 submit / process 해도 단계를 실행하지 않습니다."""
+    charged = []
+    order, _ = store.create(new_order("alice", "busy", ITEMS, SHIPPING))
+    now = time.time()
+    store.claim(order["id"], "other-worker", now, now + 60)
+    pipeline = OrderPipeline(store, [(PAID, charged.append), (CONFIRMED, lambda order: None)])
+
+    assert not pipeline.submit(order["id"])
+    assert pipeline.process(order["id"])["status"] == PENDING
+    assert charged == []
+    pipeline.shutdown()
+
+
+def test_queued_orders_keep_their_lease(store):
+    """큐에서 오래 기다리는 주문도 임대를 연장하므로 다른 파이프라인이 가져가지 않습니다."""
+    release = threading.Event()
+    first, _ = store.create(new_order("alice", "slow", ITEMS, SHIPPING))
+    second, _ = store.create(new_order("alice", "queued", ITEMS, SHIPPING))
+    busy = OrderPipeline(store, [(CONFIRMED, lambda order: release.wait(5))], recover_after=0.2, recover_interval=0.02)
+    busy.submit(first["id"])
+    busy.submit(second["id"])
+    time.sleep(0.5)
+
+    assert OrderPipeline(store, [], recover_after=0.2).recover() == []
+    release.set()
+    busy.join()
+    assert store.get(second["id"])["status"] == CONFIRMED
+    busy.shutdown()
+
+
+# ----------------------------------------------------
+# /checkout → /orders/<id>
+# ----------------------------------------------------
+
+def checkout_form(client):
+    html = client.get('/checkout').data.decode('utf-8')
+    key = re.search(r'name="idempotency_key" value="([0-9a-f]+)"', html).group(1)
+    return dict(SHIPPING, idempotency_key=key)
+
+
+def test_checkout_double_submit_creates_one_order(app, login_test_env):
+    """같은 주문서를 두 번 제출해도 같은 주문 상태 페이지로 이동하고 주문은 하나입니다."""
+    client, username, password = login_test_env
+    client.post('/login', data={"username": username, "password": password})
+    client.post('/cart/toggle/1')
+    form = checkout_form(client)
+
+    first = client.post('/checkout', data=form)
+    second = client.post('/checkout', data=form)
+    assert first.status_code == second.status_code == 302
+    assert first.headers['Location'] == second.headers['Location']
+    with client.session_transaction() as sess:
+        assert sess['cart'] == {}
+
+    order_id = first.headers['Location'].rsplit('/', 1)[1]
+    shop = app.extensions["shop"]
+    assert shop.order_pipeline.wait(order_id)["status"] == CONFIRMED
+
+    page = client.get(first.headers['Location']).data.decode('utf-8')
+    assert "주문 확정" in page
+    assert "129,000원" in page
+
+
+def test_order_status_hidden_from_other_users(app, client):
+    """다른 사용자의 주문은 404로 보이지 않습니다."""
+    order, _ = app.extensions["shop"].orders.create(new_order("someone_else", "k", ITEMS, SHIPPING))
+    with client.session_transaction() as sess:
+        sess['user_id'] = "fixture_user_id"
+
+    assert client.get(f'/orders/{order["id"]}').status_code == 404
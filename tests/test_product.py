@@ -2,7 +2,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
-from app import app, USERS, get_product
+from app import app, USERS, get_product, get_products
 import time
 import pytest
 
@@ -94,4 +94,72 @@ def test_toggle_cart_remove_success(login_test_env):
 
     with client.session_transaction() as sess:
         assert str(test_pid) not in sess['cart']
-        assert len(sess['cart']) == 0
\ No newline at end of file
+        assert len(sess['cart']) == 0
+
+
+# --- 카트 일괄 조회 ---
+
+def test_get_products_batch():
+    """문자열 ID도 한 번에 조회하며, 잘못된 ID는 건너뛰고 합계를 함께 반환합니다."""
+    items, total = get_products(["3", "1", "abc", "999"])
+    assert [p["id"] for p in items] == [3, 1]
+    assert total == get_product(3)["price"] + get_product(1)["price"]
+
+
+def test_cart_page_total(client):
+    """카트 페이지는 일괄 조회 결과로 상품 목록과 총 합계를 보여줍니다."""
+    with client.session_transaction() as sess:
+        sess['cart'] = {"1": 1, "2": 1}
+    response = client.get('/cart')
+    html = response.data.decode('utf-8')
+    assert "프리미엄 캣타워" in html
+    assert "터널 놀이 텐트" in html
+    assert "168,000원" in html
+
+
+def test_product_detail_conditional_get(client):
+    """상품 상세 페이지도 ETag가 일치하면 304를 반환합니다."""
+    etag = client.get('/product/1').headers['ETag']
+    assert client.get('/product/1', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/product/2', headers={'If-None-Match': etag}).status_code == 200
+
+
+# --- 카트 수량 ---
+
+def test_cart_quantity_updates_summary(login_test_env):
+    """수량을 늘리고 줄이고 지정하면 합계와 네비게이션 개수가 변화량만큼 갱신됩니다."""
+    client, username, password = login_test_env
+    client.post('/login', data={"username": username, "password": password})
+    client.post('/cart/toggle/1')
+    client.post('/cart/increment/1')
+    client.post('/cart/increment/2')
+    client.post('/cart/set/3', data={"quantity": "3"})
+    client.post('/cart/decrement/3')
+
+    with client.session_transaction() as sess:
+        assert sess['cart'] == {"1": 2, "2": 1, "3": 2}
+        summary = sess['cart_summary']
+    assert summary["count"] == 5
+    assert summary["subtotal"] == 129000 * 2 + 39000 + 19000 * 2
+
+    html = client.get('/cart').data.decode('utf-8')
+    assert "Cart (5)" in html
+    assert "335,000원" in html
+
+    client.post('/cart/set/2', data={"quantity": "0"})
+    client.post('/cart/decrement/3')
+    client.post('/cart/decrement/3')
+    with client.session_transaction() as sess:
+        assert sess['cart'] == {"1": 2}
+        assert sess['cart_summary']["subtotal"] == 258000
+
+
+def test_cart_summary_recomputed_after_catalog_change(login_test_env):
+    """카탈로그 version이 바뀌면(가격 변경 가능) 저장된 합계 대신 다시 계산합니다."""
+    client, username, password = login_test_env
+    client.post('/login', data={"username": username, "password": password})
+    client.post('/cart/set/1', data={"quantity": "2"})
+    with client.session_transaction() as sess:
+        sess['cart_summary'] = dict(sess['cart_summary'], subtotal=1, version=-1)
+
+    assert "258,000원" in client.get('/cart').data.decode('utf-8')
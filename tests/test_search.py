@@ -0,0 +1,59 @@
+import pytest
+
+from app import PRODUCTS
+from catalog import Catalog
+from search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(PRODUCTS)
+
+
+def test_tokenize_hangul_bigrams():
+    """한글은 2-gram, 영문은 단어 단위로 나누고 소문자로 맞춥니다."""
+    assert tokenize("캣타워") == ["캣타", "타워"]
+    assert tokenize("LED 깃털 막대") == ["led", "깃털", "막대"]
+    assert tokenize("빗") == ["빗"]
+
+
+def test_search_ranks_name_matches_first(catalog):
+    """띄어쓰기가 달라도 찾고, 상품명에 나온 상품이 설명에만 나온 상품보다 먼저 옵니다."""
+    index = SearchIndex(catalog)
+    assert index.search("캣 타워")[0][0] == 1
+    assert index.search("캣타워")[0][0] == 1
+    assert [pid for pid, _ in index.search("laserfun")] == [4]
+    assert [pid for pid, _ in index.search("급식")][0] == 6
+    assert index.search("존재하지않는검색어") == []
+
+
+def test_sync_reindexes_only_changed_products(catalog):
+    """카탈로그가 바뀌면 바뀐 상품만 다시 색인하고, 사라진 상품은 결과에서 빠집니다."""
+    index = SearchIndex()
+    assert index.sync(catalog) == len(PRODUCTS)
+    assert index.sync(catalog) == 0
+
+    products = [dict(p) for p in PRODUCTS if p["id"] != 4]
+    products[0]["name"] = "원목 캣타워"
+    catalog.reload(products)
+    assert index.sync(catalog) == 2           # 이름이 바뀐 1번, 삭제된 4번
+    assert index.search("원목")[0][0] == 1
+    assert index.search("laserfun") == []
+
+
+def test_suggest_prefix(catalog):
+    """접두어로 시작하는 상품명 / 브랜드 단어를 돌려줍니다."""
+    index = SearchIndex(catalog)
+    assert index.suggest("캣") == ["캣", "캣닢", "캣타워"]
+    assert index.suggest("Scr") == ["scratch&joy"]
+    assert index.suggest("") == []
+
+
+def test_search_endpoints(client):
+    """/search는 결과 카드를, /search/suggest는 자동완성 단어를 반환합니다."""
+    html = client.get('/search?q=정수기').data.decode('utf-8')
+    assert "검색 결과 1개" in html
+    assert "고양이 정수기" in html
+    assert "검색 결과가 없습니다." in client.get('/search?q=zzz').data.decode('utf-8')
+
+    assert client.get('/search/suggest?q=자동').get_json() == ["자동"]
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from users import InMemoryUserRepository, SQLiteUserRepository, UserRepository, open_user_repository
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def users(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryUserRepository({"testuser": {"password": "password123"}})
+    return open_user_repository(str(tmp_path / "users.db"), seed={"testuser": {"password": "password123"}})
+
+
+def test_dict_compatible_api(users):
+    """기존 USERS dict처럼 조회/추가/백업/복원이 동작합니다."""
+    backup = users.copy()
+    users["cat"] = {"password_hash": "x"}
+
+    assert "cat" in users
+    assert users.get("cat") == {"password_hash": "x"}
+    assert users.get("nobody") is None
+    assert sorted(users) == ["cat", "testuser"]
+
+    users.clear()
+    users.update(backup)
+    assert users.copy() == {"testuser": {"password": "password123"}}
+
+
+def test_add_rejects_duplicate(users):
+    """이미 있는 아이디는 add()로 다시 등록할 수 없습니다."""
+    assert users.add("new_cat", {"password_hash": "a"})
+    assert not users.add("new_cat", {"password_hash": "b"})
+    assert users["new_cat"] == {"password_hash": "a"}
+
+
+def test_sqlite_concurrent_signup_single_winner(tmp_path):
+    """여러 스레드가 같은 아이디로 동시에 가입해도 한 번만 성공합니다."""
+    path = str(tmp_path / "users.db")
+    SQLiteUserRepository(path)
+    results = []
+
+    def signup(i):
+        # 워커마다 별도 저장소 객체(= 별도 연결)를 쓰는 상황을 흉내냄
+        results.append(SQLiteUserRepository(path).add("same_name", {"n": i}))
+
+    threads = [threading.Thread(target=signup, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 1
+    assert SQLiteUserRepository(path)._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_repository_without_add_fails_on_creation():
+    """add가 빠진 사용자 저장소는 만들 때 TypeError로 실패합니다."""
+    class NoAdd(UserRepository):
+        __getitem__ = __setitem__ = __delitem__ = __iter__ = __len__ = None
+
+    with pytest.raises(TypeError, match="add"):
+        NoAdd()
@@ -0,0 +1,164 @@
+"""
+사용자 저장소.
+
+- USERS는 username → 사용자 레코드(dict) 매핑이며, 기존 dict 사용 코드
+  (USERS.get / USERS[name] = {...} / in / copy / clear / update)가 그대로 동작합니다.
+- USER_DB 환경변수가 없으면 프로세스 메모리, 있으면 SQLite 파일에 저장합니다.
+  SQLite는 WAL 모드라 여러 워커 프로세스가 동시에 읽고 쓸 수 있습니다.
+- 회원가입은 add()로 처리해 같은 아이디 동시 가입을 DB UNIQUE 제약으로 막습니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import abstractmethod
+from collections.abc import MutableMapping
+
+
+class UserRepository(MutableMapping):
+    """사용자 저장소 공통 인터페이스 (add와 MutableMapping 메서드가 빠진 구현은 만들 때 TypeError)."""
+
+    @abstractmethod
+    def add(self, username, record):
+        """새 사용자를 등록합니다. 이미 있는 아이디면 False를 반환합니다."""
+
+    def copy(self):
+        return dict(self.items())
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self, users=None):
+        self._users = dict(users or {})
+        self._lock = threading.Lock()
+
+    def add(self, username, record):
+        with self._lock:
+            if username in self._users:
+                return False
+            self._users[username] = dict(record)
+            return True
+
+    def __getitem__(self, username):
+        return self._users[username]
+
+    def __setitem__(self, username, record):
+        self._users[username] = dict(record)
+
+    def __delitem__(self, username):
+        del self._users[username]
+
+    def __iter__(self):
+        return iter(list(self._users))
+
+    def __len__(self):
+        return len(self._users)
+
+    def copy(self):
+        return {username: dict(record) for username, record in self._users.items()}
+
+
+class SQLiteUserRepository(UserRepository):
+    """
+    SQLite 사용자 저장소.
+    - username에 UNIQUE 인덱스, WAL 저널 모드
+    - 연결은 워커 프로세스 × 스레드마다 하나씩 만들어 재사용합니다 (fork 후에는 새로 연결).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " id INTEGER PRIMARY KEY,"
+                " username TEXT NOT NULL UNIQUE,"
+                " data TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, username, record):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO users (username, data) VALUES (?, ?)", (username, json.dumps(record)))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def get(self, username, default=None):
+        row = self._connect().execute("SELECT data FROM users WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __getitem__(self, username):
+        record = self.get(username)
+        if record is None:
+            raise KeyError(username)
+        return record
+
+    def __contains__(self, username):
+        return self._connect().execute(
+            "SELECT 1 FROM users WHERE username = ?", (username,)
+        ).fetchone() is not None
+
+    def __setitem__(self, username, record):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO users (username, data) VALUES (?, ?)"
+                " ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                (username, json.dumps(record)),
+            )
+
+    def __delitem__(self, username):
+        conn = self._connect()
+        with conn:
+            deleted = conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount
+        if not deleted:
+            raise KeyError(username)
+
+    def __iter__(self):
+        return iter([row[0] for row in self._connect().execute("SELECT username FROM users ORDER BY id")])
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def copy(self):
+        return {
+            username: json.loads(data)
+            for username, data in self._connect().execute("SELECT username, data FROM users ORDER BY id")
+        }
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM users")
+
+    def update(self, other=(), **kwargs):
+        items = list(dict(other, **kwargs).items())
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO users (username, data) VALUES (?, ?)"
+                " ON CONFLICT(username) DO UPDATE SET data = excluded.data",
+                [(username, json.dumps(record)) for username, record in items],
+            )
+
+
+def open_user_repository(db_path=None, seed=None):
+    """설정에 맞는 사용자 저장소를 만들고, 없는 기본 사용자(seed)만 등록합니다."""
+    if not db_path:
+        return InMemoryUserRepository(seed)
+
+    users = SQLiteUserRepository(db_path)
+    for username, record in (seed or {}).items():
+        users.add(username, record)
+    return users